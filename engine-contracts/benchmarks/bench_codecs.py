@@ -0,0 +1,58 @@
+"""Compare the artifact codecs by size and encode/decode time.
+
+Run from ``engine-contracts/``::
+
+    python benchmarks/bench_codecs.py --clips 2000 --song-seconds 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any
+
+# generators puts engine-contracts/src on sys.path, so it is imported first.
+from generators import make_clip_analysis, make_music_analysis
+
+from engine_contracts.codecs import CODECS, decode, encode
+
+
+def _report(title: str, payload: Any, repeat: int) -> None:
+    print(title)
+    print(f"  {'codec':<14} {'KiB':>10} {'encode ms':>10} {'decode ms':>10}")
+    variants = [("json indent=2", "json", 2)] + [(codec, codec, None) for codec in CODECS]
+    for label, codec, indent in variants:
+        data = encode(payload, codec, indent)
+        encode_s = min(
+            timeit.repeat(lambda: encode(payload, codec, indent), number=1, repeat=repeat)
+        )
+        decode_s = min(timeit.repeat(lambda: decode(data), number=1, repeat=repeat))
+        print(
+            f"  {label:<14} {len(data) / 1024:10.1f} "
+            f"{encode_s * 1000:10.2f} {decode_s * 1000:10.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=2000)
+    parser.add_argument("--segments", type=int, default=40, help="Segments per clip.")
+    parser.add_argument("--song-seconds", type=float, default=600.0)
+    parser.add_argument("--beats-per-minute", type=float, default=174.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    _report(
+        f"clip analysis ({args.clips} x {args.segments} segments)",
+        make_clip_analysis(args.clips, args.segments),
+        args.repeat,
+    )
+    _report(
+        f"music analysis ({args.song_seconds:g}s at {args.beats_per_minute:g} bpm)",
+        make_music_analysis(args.song_seconds, args.beats_per_minute),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
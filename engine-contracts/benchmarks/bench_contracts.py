@@ -0,0 +1,240 @@
+"""Benchmark the engine_contracts models and validators at a given scale.
+
+Run from ``engine-contracts/``::
+
+    python benchmarks/bench_contracts.py --scale production
+    python benchmarks/bench_contracts.py --scale production --update-baseline
+
+Each operation is timed (best and median of ``--repeat`` runs) and its peak
+traced allocation is measured in a separate run under ``tracemalloc``.
+Results are compared with ``baselines.json``: an operation that is more
+than ``--threshold`` slower, or allocates that much more at peak, is
+reported as a regression and the script exits with status 1. Times are
+scaled by a fixed pure-Python calibration loop timed in the same run, so a
+slower or busier machine does not read as a regression.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+# generators puts engine-contracts/src on sys.path, so it is imported first.
+from generators import make_clip_analysis, make_music_analysis, make_timeline
+
+from engine_contracts import ClipAnalysis, MusicAnalysis, TimelinePlan
+from engine_contracts.validators import (
+    validate_clip_analysis_payload,
+    validate_music_analysis_payload,
+    validate_timeline_payload,
+)
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+SCALES: dict[str, dict[str, float]] = {
+    "smoke": {
+        "clips": 20,
+        "segments_per_clip": 10,
+        "song_seconds": 180.0,
+        "beats_per_minute": 128.0,
+        "timeline_entries": 200,
+    },
+    "production": {
+        "clips": 2000,
+        "segments_per_clip": 40,
+        "song_seconds": 600.0,
+        "beats_per_minute": 174.0,
+        "timeline_entries": 5000,
+    },
+}
+
+# Differences below this are timer noise, whatever the relative change.
+NOISE_FLOOR_S = 0.001
+NOISE_FLOOR_KIB = 64.0
+
+
+def build_operations(params: dict[str, float]) -> dict[str, Callable[[], Any]]:
+    clips = make_clip_analysis(int(params["clips"]), int(params["segments_per_clip"]))
+    legacy_clips = make_clip_analysis(
+        int(params["clips"]), int(params["segments_per_clip"]), legacy=True
+    )
+    music = make_music_analysis(params["song_seconds"], params["beats_per_minute"])
+    legacy_music = make_music_analysis(
+        params["song_seconds"], params["beats_per_minute"], legacy=True
+    )
+    timeline = make_timeline(int(params["timeline_entries"]))
+    legacy_timeline = make_timeline(int(params["timeline_entries"]), legacy=True)
+
+    clip_models = [ClipAnalysis.from_dict(item) for item in clips]
+    music_model = MusicAnalysis.from_dict(music)
+
+    return {
+        "ClipAnalysis.from_dict": lambda: [ClipAnalysis.from_dict(item) for item in clips],
+        "ClipAnalysis.to_dict": lambda: [model.to_dict() for model in clip_models],
+        "ClipAnalysis.from_dicts": lambda: ClipAnalysis.from_dicts(clips),
+        "ClipAnalysis.to_dicts": lambda: ClipAnalysis.to_dicts(clip_models),
+        "MusicAnalysis.from_dict": lambda: MusicAnalysis.from_dict(music),
+        "MusicAnalysis.to_dict": lambda: music_model.to_dict(),
+        "TimelinePlan.round_trip": lambda: TimelinePlan.from_dict(timeline).to_dict(),
+        "validate_clip_analysis.strict": lambda: validate_clip_analysis_payload(
+            clips, strict=True
+        ),
+        "validate_clip_analysis.compat": lambda: validate_clip_analysis_payload(
+            legacy_clips, strict=False
+        ),
+        "validate_music_analysis.strict": lambda: validate_music_analysis_payload(
+            music, strict=True
+        ),
+        "validate_music_analysis.compat": lambda: validate_music_analysis_payload(
+            legacy_music, strict=False
+        ),
+        "validate_timeline.strict": lambda: validate_timeline_payload(timeline, strict=True),
+        "validate_timeline.compat": lambda: validate_timeline_payload(
+            legacy_timeline, strict=False
+        ),
+    }
+
+
+def _calibration_loop() -> int:
+    total = 0
+    for idx in range(200_000):
+        total += idx * idx % 7
+    return total
+
+
+def calibrate(repeat: int) -> float:
+    return min(timeit.repeat(_calibration_loop, number=1, repeat=max(3, repeat)))
+
+
+def measure(operation: Callable[[], Any], repeat: int) -> dict[str, float]:
+    times = timeit.repeat(operation, number=1, repeat=max(1, repeat))
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "best_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    speed_ratio: float = 1.0,
+) -> list[str]:
+    """Describe every operation that regressed by more than ``threshold`` (0.25 = 25%).
+
+    ``speed_ratio`` is the baseline calibration time over this run's; current
+    times are multiplied by it before comparing.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key, floor, unit in (
+            ("best_s", NOISE_FLOOR_S, "s"),
+            ("peak_kib", NOISE_FLOOR_KIB, "KiB"),
+        ):
+            before, after = previous[key], current[key]
+            if key == "best_s":
+                after = round(after * speed_ratio, 6)
+            if after > before * (1.0 + threshold) and after - before > floor:
+                change = (after / before - 1.0) * 100 if before else float("inf")
+                regressions.append(
+                    f"{name} {key}: {before}{unit} -> {after}{unit} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark engine_contracts models and validators."
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="production")
+    parser.add_argument("--clips", type=int, help="Override the scale's clip count.")
+    parser.add_argument("--segments-per-clip", type=int)
+    parser.add_argument("--song-seconds", type=float)
+    parser.add_argument("--beats-per-minute", type=float, help="Beat density of the song.")
+    parser.add_argument("--timeline-entries", type=int)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)."
+    )
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store these results as the baseline for this scale instead of comparing.",
+    )
+    parser.add_argument("--output", help="Also write the results as JSON to this path.")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        override = getattr(args, key)
+        if override is not None:
+            params[key] = override
+
+    calibration_s = calibrate(args.repeat)
+    results = {
+        name: measure(operation, args.repeat)
+        for name, operation in build_operations(params).items()
+    }
+    print(f"scale={args.scale} " + " ".join(f"{key}={value:g}" for key, value in params.items()))
+    print(f"{'operation':<34} {'best ms':>10} {'median ms':>10} {'peak KiB':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<34} {result['best_s'] * 1000:10.2f} "
+            f"{result['median_s'] * 1000:10.2f} {result['peak_kib']:10.1f}"
+        )
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(
+                {"params": params, "calibration_s": calibration_s, "results": results}, indent=2
+            ),
+            encoding="utf-8",
+        )
+
+    baseline_path = Path(args.baseline)
+    baselines = (
+        json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    )
+    if args.update_baseline:
+        baselines[args.scale] = {
+            "params": params,
+            "python": platform.python_version(),
+            "calibration_s": round(calibration_s, 6),
+            "results": results,
+        }
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline for {args.scale!r} written to {baseline_path}")
+        return 0
+
+    stored = baselines.get(args.scale)
+    if stored is None or stored["params"] != params:
+        print(f"No baseline for {args.scale!r} with these parameters; nothing to compare.")
+        return 0
+    speed_ratio = stored["calibration_s"] / calibration_s
+    print(f"Comparing with baseline (times scaled by {speed_ratio:.2f} for machine speed).")
+    regressions = compare(results, stored["results"], args.threshold, speed_ratio)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
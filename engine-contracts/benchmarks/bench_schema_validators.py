@@ -0,0 +1,71 @@
+"""Time the compiled schema validators against the other validation paths.
+
+Run from ``engine-contracts/``::
+
+    python benchmarks/bench_schema_validators.py --entries 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any, Callable
+
+# generators puts engine-contracts/src on sys.path, so it is imported first.
+from generators import make_clip_analysis, make_timeline
+
+from engine_contracts.validators import (
+    clip_analysis_schema,
+    schema_errors,
+    timeline_schema,
+    validate_clip_analysis_payload,
+    validate_timeline_payload,
+)
+
+
+def _time(label: str, func: Callable[[], Any], repeat: int) -> None:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"  {label:<28} {best * 1000:10.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000, help="Timeline entries.")
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--segments", type=int, default=50, help="Segments per clip.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+
+    cases = [
+        (
+            f"timeline ({args.entries} entries)",
+            "timeline",
+            make_timeline(args.entries),
+            lambda payload: validate_timeline_payload(payload, strict=True),
+            timeline_schema(),
+        ),
+        (
+            f"clip analysis ({args.clips} x {args.segments} segments)",
+            "clip_analysis",
+            make_clip_analysis(args.clips, args.segments),
+            lambda payload: validate_clip_analysis_payload(payload, strict=True),
+            clip_analysis_schema(),
+        ),
+    ]
+    for title, name, payload, hand_written, schema in cases:
+        assert not schema_errors(name, payload)
+        print(title)
+        _time("validate_*_payload (keys)", lambda: hand_written(payload), args.repeat)
+        _time("compiled schema (types)", lambda: schema_errors(name, payload), args.repeat)
+        if jsonschema is not None:
+            validator = jsonschema.Draft202012Validator(schema)
+            _time("jsonschema", lambda: validator.validate(payload), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic contract payloads at configurable scale.
+
+Every generator is deterministic for a given ``seed``. ``legacy=True``
+produces the alias-keyed payloads that only compat-mode validation accepts.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from engine_contracts import SCHEMA_VERSION  # noqa: E402
+
+
+def make_clip_analysis(
+    clips: int, segments_per_clip: int, seed: int = 0, legacy: bool = False
+) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    payload = []
+    for idx in range(clips):
+        duration = 30.0 + rng.random() * 90.0
+        segments = []
+        for _ in range(segments_per_clip):
+            start = rng.random() * (duration - 2.0)
+            segments.append(
+                {
+                    "start": round(start, 3),
+                    "end": round(start + 0.5 + rng.random() * 1.5, 3),
+                    "intensity_score": round(rng.random(), 4),
+                    "spike_count": rng.randint(0, 12),
+                    "cluster_density": round(rng.random(), 4),
+                    "ding_hit_count": rng.randint(0, 3),
+                    "max_ding_confidence": round(rng.random(), 4),
+                }
+            )
+        item: dict[str, Any] = {"duration": round(duration, 3), "intensity_segments": segments}
+        if legacy:
+            item["clip"] = f"clip_{idx:05d}.mp4"
+        else:
+            item.update(schema_version=SCHEMA_VERSION, clip_id=f"clip_{idx:05d}.mp4")
+        payload.append(item)
+    return payload
+
+
+def make_music_analysis(
+    song_seconds: float, beats_per_minute: float, seed: int = 0, legacy: bool = False
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    interval = 60.0 / beats_per_minute
+    beats = [round(idx * interval, 4) for idx in range(int(song_seconds / interval))]
+    drops = []
+    cursor = 20.0
+    while cursor + 10.0 < song_seconds:
+        drops.append(
+            {"start": cursor, "end": cursor + 8.0, "energy_score": round(rng.random(), 4)}
+        )
+        cursor += 30.0 + rng.random() * 30.0
+    if legacy:
+        return {
+            "song": "song.mp3",
+            "duration": song_seconds,
+            "bpm": beats_per_minute,
+            "beat_count": len(beats),
+            "beats": beats,
+            "high_energy_sections": drops,
+        }
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "song": "song.mp3",
+        "song_duration": song_seconds,
+        "tempo": beats_per_minute,
+        "beat_count": len(beats),
+        "beats": beats,
+        "beat_strength": [{"time": beat, "strength": round(rng.random(), 4)} for beat in beats],
+        "drop_sections": drops,
+    }
+
+
+def make_timeline(
+    entries: int, clips: int = 50, seed: int = 0, legacy: bool = False
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    timeline = []
+    song_cursor = 0.0
+    for idx in range(entries):
+        length = round(0.5 + rng.random() * 2.0, 3)
+        clip_start = round(rng.random() * 20.0, 3)
+        timeline.append(
+            {
+                "clip_id": f"clip_{idx % clips:05d}.mp4",
+                "clip_start": clip_start,
+                "clip_end": round(clip_start + length, 3),
+                "song_start": round(song_cursor, 3),
+                "song_end": round(song_cursor + length, 3),
+            }
+        )
+        song_cursor += length
+    payload: dict[str, Any] = {"timeline": timeline, "total_duration": round(song_cursor, 3)}
+    if not legacy:
+        payload["schema_version"] = SCHEMA_VERSION
+    return payload
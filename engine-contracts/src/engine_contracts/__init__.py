@@ -1,19 +1,45 @@
+from .beat_grid import BeatGrid
+from .codecs import (
+    CODECS,
+    ArtifactStats,
+    artifact_path,
+    open_artifact,
+    read_artifact,
+    write_artifact,
+)
+from .columnar import load_music_columns, write_music_columns
 from .models import (
     BeatStrengthPoint,
     ClipAnalysis,
     DropSection,
     IntensitySegment,
     MusicAnalysis,
+    SegmentTable,
     TimelineEntry,
     TimelinePlan,
 )
+from .render_plan import (
+    DecodeSchedule,
+    DecodeSpan,
+    TimelineChunk,
+    TimelineIndex,
+    segment_timeline,
+    split_timeline,
+)
+from .schema_compiler import SchemaError, SchemaValidationError, compile_schema
+from .streaming import iter_clip_analysis
 from .validators import (
     clip_analysis_schema,
     music_analysis_schema,
+    schema_errors,
     timeline_schema,
+    validate_clip_analysis_item,
     validate_clip_analysis_payload,
+    validate_clip_analysis_schema,
     validate_music_analysis_payload,
+    validate_music_analysis_schema,
     validate_timeline_payload,
+    validate_timeline_schema,
 )
 from .version import SCHEMA_VERSION
 
@@ -24,12 +50,37 @@ __all__ = [
     "BeatStrengthPoint",
     "DropSection",
     "MusicAnalysis",
+    "BeatGrid",
+    "SegmentTable",
     "TimelineEntry",
     "TimelinePlan",
+    "DecodeSchedule",
+    "DecodeSpan",
+    "TimelineIndex",
+    "TimelineChunk",
+    "split_timeline",
+    "segment_timeline",
     "clip_analysis_schema",
     "music_analysis_schema",
     "timeline_schema",
+    "validate_clip_analysis_item",
     "validate_clip_analysis_payload",
     "validate_music_analysis_payload",
     "validate_timeline_payload",
+    "SchemaError",
+    "SchemaValidationError",
+    "compile_schema",
+    "schema_errors",
+    "validate_clip_analysis_schema",
+    "validate_music_analysis_schema",
+    "validate_timeline_schema",
+    "iter_clip_analysis",
+    "CODECS",
+    "ArtifactStats",
+    "artifact_path",
+    "open_artifact",
+    "read_artifact",
+    "write_artifact",
+    "load_music_columns",
+    "write_music_columns",
 ]
@@ -0,0 +1,200 @@
+"""Search structures over the beat data of a ``MusicAnalysis``.
+
+``BeatGrid`` snaps times to beats and downbeats with bisection, averages
+beat strength over a window from prefix sums in O(1) after two bisections,
+and tells whether a time falls in a drop section using a running maximum of
+drop ends. The batch methods take a sequence of query times and are
+vectorized with ``numpy.searchsorted`` when NumPy is installed.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from . import models
+from .models import DropSection
+
+if TYPE_CHECKING:
+    from .models import MusicAnalysis
+
+
+def _sorted_floats(values: Any) -> list[float]:
+    items = [float(value) for value in values]
+    if any(items[idx] > items[idx + 1] for idx in range(len(items) - 1)):
+        items.sort()
+    return items
+
+
+class BeatGrid:
+    """Index over beat times, beat strengths and drop sections.
+
+    Beat strength points and drop sections are sorted by time when they are
+    not already. Downbeats are every ``beats_per_bar``-th beat counting from
+    the first one; the analysis carries no meter, so 4/4 is assumed unless
+    told otherwise. Windows are half-open: ``[start, end)``.
+    """
+
+    def __init__(
+        self,
+        beats: Sequence[float],
+        strength_times: Sequence[float] = (),
+        strengths: Sequence[float] = (),
+        drop_sections: Sequence[DropSection] = (),
+        beats_per_bar: int = 4,
+    ) -> None:
+        if beats_per_bar < 1:
+            raise ValueError("beats_per_bar must be >= 1.")
+        if len(strength_times) != len(strengths):
+            raise ValueError("strength_times and strengths differ in length.")
+        self.beats_per_bar = beats_per_bar
+        self.beats = _sorted_floats(beats)
+
+        points = sorted(zip((float(t) for t in strength_times), (float(s) for s in strengths)))
+        self.strength_times = [time for time, _ in points]
+        self._strengths = [strength for _, strength in points]
+        self._strength_prefix = [0.0]
+        for strength in self._strengths:
+            self._strength_prefix.append(self._strength_prefix[-1] + strength)
+
+        self.drop_sections = tuple(sorted(drop_sections, key=lambda drop: drop.start))
+        self._drop_starts = [drop.start for drop in self.drop_sections]
+        # Largest end among the drops up to each index: t is inside some drop
+        # starting at or before it exactly when that maximum exceeds t.
+        self._drop_max_end: list[float] = []
+        for drop in self.drop_sections:
+            previous = self._drop_max_end[-1] if self._drop_max_end else float("-inf")
+            self._drop_max_end.append(max(previous, drop.end))
+        self._arrays: dict[str, Any] = {}
+
+    @classmethod
+    def from_music_analysis(
+        cls, analysis: "MusicAnalysis", beats_per_bar: int = 4
+    ) -> "BeatGrid":
+        return cls(
+            analysis.beats,
+            [point.time for point in analysis.beat_strength],
+            [point.strength for point in analysis.beat_strength],
+            list(analysis.drop_sections),
+            beats_per_bar=beats_per_bar,
+        )
+
+    def __len__(self) -> int:
+        return len(self.beats)
+
+    # Single queries.
+
+    def nearest_beat_index(self, time: float) -> int | None:
+        """Index of the beat closest to ``time`` (the earlier one on a tie)."""
+        beats = self.beats
+        if not beats:
+            return None
+        idx = bisect_left(beats, time)
+        if idx == 0:
+            return 0
+        if idx == len(beats) or time - beats[idx - 1] <= beats[idx] - time:
+            return idx - 1
+        return idx
+
+    def nearest_beat(self, time: float) -> float | None:
+        idx = self.nearest_beat_index(time)
+        return None if idx is None else self.beats[idx]
+
+    def next_beat(self, time: float) -> float | None:
+        """First beat at or after ``time``."""
+        idx = bisect_left(self.beats, time)
+        return self.beats[idx] if idx < len(self.beats) else None
+
+    def next_downbeat(self, time: float) -> float | None:
+        """First downbeat at or after ``time``."""
+        idx = bisect_left(self.beats, time)
+        idx = -(-idx // self.beats_per_bar) * self.beats_per_bar
+        return self.beats[idx] if idx < len(self.beats) else None
+
+    def beats_between(self, start: float, end: float) -> list[float]:
+        """Beats in ``[start, end)``."""
+        return self.beats[bisect_left(self.beats, start):bisect_left(self.beats, end)]
+
+    def strength_at(self, time: float) -> float:
+        """Strength of the beat-strength point closest to ``time``; 0.0 without any."""
+        times = self.strength_times
+        if not times:
+            return 0.0
+        idx = bisect_left(times, time)
+        if idx == len(times) or (idx > 0 and time - times[idx - 1] <= times[idx] - time):
+            idx -= 1
+        return self._strengths[idx]
+
+    def mean_strength(self, start: float, end: float) -> float:
+        """Mean strength of the points in ``[start, end)``; 0.0 when there are none."""
+        lo = bisect_left(self.strength_times, start)
+        hi = bisect_left(self.strength_times, end)
+        if hi <= lo:
+            return 0.0
+        return (self._strength_prefix[hi] - self._strength_prefix[lo]) / (hi - lo)
+
+    def in_drop(self, time: float) -> bool:
+        idx = bisect_right(self._drop_starts, time) - 1
+        return idx >= 0 and self._drop_max_end[idx] > time
+
+    def drop_at(self, time: float) -> DropSection | None:
+        """The latest-starting drop section that contains ``time``."""
+        idx = bisect_right(self._drop_starts, time) - 1
+        while idx >= 0 and self._drop_max_end[idx] > time:
+            if self.drop_sections[idx].end > time:
+                return self.drop_sections[idx]
+            idx -= 1
+        return None
+
+    # Batch queries return NumPy arrays when NumPy is installed and otherwise
+    # array.array (a list of bools for in_drops).
+
+    def _array(self, name: str, values: list[float]) -> Any:
+        if name not in self._arrays:
+            self._arrays[name] = models._np.asarray(values, dtype=models._np.float64)
+        return self._arrays[name]
+
+    def nearest_beats(self, times: Sequence[float]) -> Any:
+        """Nearest beat to each of ``times``; an empty grid cannot snap anything."""
+        if not self.beats:
+            raise ValueError("BeatGrid has no beats to snap to.")
+        np = models._np
+        if np is None:
+            return array("d", (self.beats[self.nearest_beat_index(t)] for t in times))
+        beats = self._array("beats", self.beats)
+        queries = np.asarray(times, dtype=np.float64)
+        idx = np.searchsorted(beats, queries, side="left")
+        after = np.minimum(idx, len(beats) - 1)
+        before = np.maximum(idx - 1, 0)
+        use_after = (beats[after] - queries) < (queries - beats[before])
+        return np.where(use_after, beats[after], beats[before])
+
+    def mean_strengths(self, starts: Sequence[float], ends: Sequence[float]) -> Any:
+        """``mean_strength`` of each window ``[starts[i], ends[i])``."""
+        if len(starts) != len(ends):
+            raise ValueError("starts and ends differ in length.")
+        np = models._np
+        if np is None:
+            return array("d", (self.mean_strength(s, e) for s, e in zip(starts, ends)))
+        times = self._array("strength_times", self.strength_times)
+        prefix = self._array("strength_prefix", self._strength_prefix)
+        lo = np.searchsorted(times, np.asarray(starts, dtype=np.float64), side="left")
+        hi = np.searchsorted(times, np.asarray(ends, dtype=np.float64), side="left")
+        counts = hi - lo
+        sums = prefix[np.maximum(hi, lo)] - prefix[lo]
+        return np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+
+    def in_drops(self, times: Sequence[float]) -> Any:
+        """``in_drop`` of each of ``times``, as booleans."""
+        np = models._np
+        if np is None:
+            return [self.in_drop(t) for t in times]
+        queries = np.asarray(times, dtype=np.float64)
+        if not self.drop_sections:
+            return np.zeros(len(queries), dtype=bool)
+        starts = self._array("drop_starts", self._drop_starts)
+        max_end = self._array("drop_max_end", self._drop_max_end)
+        idx = np.searchsorted(starts, queries, side="right") - 1
+        return (idx >= 0) & (max_end[np.maximum(idx, 0)] > queries)
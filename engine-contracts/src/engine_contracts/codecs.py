@@ -0,0 +1,145 @@
+"""Encodings for JSON artifacts on disk.
+
+Artifacts are JSON, written compactly (``json``) or compressed with gzip
+(``gzip``) or xz (``lzma``). Readers do not need to know which: the codec
+is detected from the file's leading bytes, so a path written with any codec
+can be handed to :func:`read_artifact` or :func:`open_artifact`. Writes go
+to a temporary sibling that is renamed into place, so a reader never sees a
+partial artifact.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+
+CODECS = ("json", "gzip", "lzma")
+
+# Appended to an artifact's file name, so the encoding is visible in listings.
+SUFFIXES = {"json": "", "gzip": ".gz", "lzma": ".xz"}
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "lzma"),
+)
+
+
+def _check_codec(codec: str) -> None:
+    if codec not in CODECS:
+        raise ValueError(
+            f"Unknown artifact codec {codec!r}; expected one of {', '.join(CODECS)}."
+        )
+
+
+def artifact_path(path: Path | str, codec: str) -> Path:
+    """``path`` with the file-name suffix of ``codec`` appended."""
+    _check_codec(codec)
+    path = Path(path)
+    return path.with_name(path.name + SUFFIXES[codec])
+
+
+def detect_codec(head: bytes) -> str:
+    """Codec of an artifact whose first bytes are ``head``; plain JSON otherwise."""
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return "json"
+
+
+def encode(payload: Any, codec: str = "json", indent: int | None = None) -> bytes:
+    _check_codec(codec)
+    separators = None if indent is not None else (",", ":")
+    data = json.dumps(payload, indent=indent, separators=separators).encode("utf-8")
+    if codec == "gzip":
+        import gzip
+
+        # mtime=0 keeps identical payloads byte-identical.
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "lzma":
+        import lzma
+
+        return lzma.compress(data, preset=6)
+    return data
+
+
+def decode(data: bytes) -> Any:
+    codec = detect_codec(data[:8])
+    if codec == "gzip":
+        import gzip
+
+        data = gzip.decompress(data)
+    elif codec == "lzma":
+        import lzma
+
+        data = lzma.decompress(data)
+    return json.loads(data)
+
+
+@dataclass(frozen=True)
+class ArtifactStats:
+    """What writing or reading one artifact cost."""
+
+    codec: str
+    bytes: int
+    seconds: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"codec": self.codec, "bytes": self.bytes, "seconds": round(self.seconds, 6)}
+
+
+def write_artifact(
+    path: Path | str, payload: Any, codec: str = "json", indent: int | None = None
+) -> ArtifactStats:
+    """Encode ``payload`` with ``codec`` and atomically replace ``path`` with it.
+
+    ``path`` is used as given; see :func:`artifact_path` for the conventional
+    suffix. ``seconds`` covers encoding and writing.
+    """
+    started = time.perf_counter()
+    data = encode(payload, codec, indent)
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return ArtifactStats(codec, len(data), time.perf_counter() - started)
+
+
+def read_artifact_with_stats(path: Path | str) -> tuple[Any, ArtifactStats]:
+    started = time.perf_counter()
+    data = Path(path).read_bytes()
+    payload = decode(data)
+    stats = ArtifactStats(detect_codec(data[:8]), len(data), time.perf_counter() - started)
+    return payload, stats
+
+
+def read_artifact(path: Path | str) -> Any:
+    """Load an artifact written with any codec."""
+    return read_artifact_with_stats(path)[0]
+
+
+def open_artifact(path: Path | str) -> IO[str]:
+    """Open an artifact written with any codec as a decompressing text stream."""
+    path = Path(path)
+    with path.open("rb") as handle:
+        codec = detect_codec(handle.read(8))
+    if codec == "gzip":
+        import gzip
+
+        return gzip.open(path, "rt", encoding="utf-8")
+    if codec == "lzma":
+        import lzma
+
+        return lzma.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
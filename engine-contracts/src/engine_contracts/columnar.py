@@ -0,0 +1,267 @@
+"""Compact columnar sidecar for music-analysis beat data.
+
+Layout of a sidecar file::
+
+    8 bytes   magic  b"ECMUSIC1"
+    4 bytes   header length, unsigned little-endian
+    n bytes   JSON header, space padded so the data starts 8-byte aligned
+    ...       float64 little-endian columns, back to back
+
+The header carries the scalar ``MusicAnalysis`` fields (including
+``schema_version``) and, per column, its offset from the start of the data
+and its item count. Loading memory-maps the file and exposes the columns as
+read-only sequences, so no per-beat Python objects are created until an item
+is indexed.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterator, overload
+
+from .models import BeatStrengthPoint, DropSection, MusicAnalysis
+
+
+MAGIC = b"ECMUSIC1"
+_PREFIX = struct.Struct("<8sI")
+
+COLUMNS = (
+    "beats",
+    "beat_strength.time",
+    "beat_strength.strength",
+    "drop_sections.start",
+    "drop_sections.end",
+    "drop_sections.energy_score",
+)
+
+
+class FloatColumn(Sequence):
+    """Read-only float64 sequence backed by a buffer (typically a memory map).
+
+    ``buffer`` is a ``memoryview`` of format ``"d"`` and can be handed to
+    ``numpy.frombuffer`` without copying.
+    """
+
+    __slots__ = ("_view",)
+
+    def __init__(self, view: memoryview | array) -> None:
+        self._view = memoryview(view)
+
+    @property
+    def buffer(self) -> memoryview:
+        return self._view
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    @overload
+    def __getitem__(self, index: int) -> float: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "FloatColumn": ...
+
+    def __getitem__(self, index: int | slice) -> float | FloatColumn:
+        if isinstance(index, slice):
+            return FloatColumn(self._view[index])
+        return self._view[index]
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._view)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"FloatColumn(len={len(self)})"
+
+
+class BeatStrengthColumn(Sequence):
+    """``BeatStrengthPoint`` sequence over parallel time/strength columns."""
+
+    __slots__ = ("times", "strengths")
+
+    def __init__(self, times: FloatColumn, strengths: FloatColumn) -> None:
+        if len(times) != len(strengths):
+            raise ValueError("beat_strength time and strength columns differ in length.")
+        self.times = times
+        self.strengths = strengths
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return BeatStrengthColumn(self.times[index], self.strengths[index])
+        return BeatStrengthPoint(time=self.times[index], strength=self.strengths[index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+
+class DropSectionColumn(Sequence):
+    """``DropSection`` sequence over parallel start/end/energy columns."""
+
+    __slots__ = ("starts", "ends", "energy_scores")
+
+    def __init__(self, starts: FloatColumn, ends: FloatColumn, energy_scores: FloatColumn) -> None:
+        if not len(starts) == len(ends) == len(energy_scores):
+            raise ValueError("drop_sections columns differ in length.")
+        self.starts = starts
+        self.ends = ends
+        self.energy_scores = energy_scores
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return DropSectionColumn(
+                self.starts[index], self.ends[index], self.energy_scores[index]
+            )
+        return DropSection(
+            start=self.starts[index],
+            end=self.ends[index],
+            energy_score=self.energy_scores[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+
+def _column_values(analysis: MusicAnalysis) -> dict[str, Sequence[float]]:
+    return {
+        "beats": analysis.beats,
+        "beat_strength.time": [point.time for point in analysis.beat_strength],
+        "beat_strength.strength": [point.strength for point in analysis.beat_strength],
+        "drop_sections.start": [section.start for section in analysis.drop_sections],
+        "drop_sections.end": [section.end for section in analysis.drop_sections],
+        "drop_sections.energy_score": [
+            section.energy_score for section in analysis.drop_sections
+        ],
+    }
+
+
+def write_music_columns(analysis: MusicAnalysis | dict[str, Any], path: Path) -> None:
+    """Write ``analysis`` (a model or a JSON payload) as a columnar sidecar.
+
+    The file is written to a temporary name and renamed into place.
+    """
+    if isinstance(analysis, dict):
+        analysis = MusicAnalysis.from_dict(analysis)
+
+    arrays = {}
+    for name, values in _column_values(analysis).items():
+        data = array("d", values)
+        if sys.byteorder != "little":
+            data.byteswap()
+        arrays[name] = data
+
+    columns = {}
+    offset = 0
+    for name in COLUMNS:
+        columns[name] = {"offset": offset, "length": len(arrays[name])}
+        offset += len(arrays[name]) * 8
+    header = {
+        "schema_version": analysis.schema_version,
+        "song": analysis.song,
+        "song_duration": analysis.song_duration,
+        "tempo": analysis.tempo,
+        "beat_count": analysis.beat_count,
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    padding = -(_PREFIX.size + len(header_bytes)) % 8
+    header_bytes += b" " * padding
+
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+            handle.write(header_bytes)
+            for name in COLUMNS:
+                arrays[name].tofile(handle)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_header(buffer: memoryview, source: Path) -> tuple[dict[str, Any], int]:
+    if len(buffer) < _PREFIX.size:
+        raise ValueError(f"{source} is too short to be a music columns file.")
+    magic, header_len = _PREFIX.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{source} is not a music columns file.")
+    data_start = _PREFIX.size + header_len
+    header = json.loads(bytes(buffer[_PREFIX.size:data_start]).decode("utf-8"))
+    return header, data_start
+
+
+def load_music_columns(path: Path) -> MusicAnalysis:
+    """Memory-map a sidecar written by :func:`write_music_columns`.
+
+    The returned ``MusicAnalysis`` holds column views instead of tuples;
+    ``to_dict()`` yields the same payload as the JSON artifact it came from.
+    """
+    path = Path(path)
+    with path.open("rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mapped)
+    header, data_start = _read_header(buffer, path)
+
+    columns: dict[str, FloatColumn] = {}
+    for name in COLUMNS:
+        spec = header["columns"][name]
+        start = data_start + int(spec["offset"])
+        end = start + int(spec["length"]) * 8
+        if end > len(buffer):
+            raise ValueError(f"{path} column {name} extends past the end of the file.")
+        raw = buffer[start:end]
+        if sys.byteorder == "little":
+            columns[name] = FloatColumn(raw.cast("d"))
+        else:
+            values = array("d", bytes(raw))
+            values.byteswap()
+            columns[name] = FloatColumn(values)
+
+    return MusicAnalysis(
+        schema_version=str(header["schema_version"]),
+        song=str(header["song"]),
+        song_duration=float(header["song_duration"]),
+        tempo=float(header["tempo"]),
+        beat_count=int(header["beat_count"]),
+        beats=columns["beats"],
+        beat_strength=BeatStrengthColumn(
+            columns["beat_strength.time"], columns["beat_strength.strength"]
+        ),
+        drop_sections=DropSectionColumn(
+            columns["drop_sections.start"],
+            columns["drop_sections.end"],
+            columns["drop_sections.energy_score"],
+        ),
+    )
@@ -0,0 +1,162 @@
+"""Generate specialized dict codecs for the contract models.
+
+``contract_model`` is applied on top of ``@dataclass(frozen=True,
+slots=True)``. It reads the dataclass fields once and generates the source
+of four functions for the class: ``from_dict`` and ``to_dict`` for one
+object, and ``from_dicts`` and ``to_dicts`` for a list. The generated code has
+no per-field dispatch and does not call ``dataclasses.asdict``. Decoding
+converts each field inline (``float(data["start"])``) and fills the slots
+of a bare instance directly instead of going through the frozen
+``__init__``. Encoding builds the dict literal in field order and calls the
+nested model's encoder for sequences of models.
+
+Supported field annotations are ``float``, ``int``, ``str``, and
+``tuple[X, ...]`` or ``Sequence[X]`` where ``X`` is one of those or a
+model decorated earlier. Anything else is rejected when the class is
+defined. Fields with ``init=False`` are not part of the payload; they are set
+to their default on decode.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import re
+from typing import Any, Callable, Iterable, TypeVar
+
+from .version import SCHEMA_VERSION
+
+
+T = TypeVar("T")
+
+_SCALARS = {"float": "float", "int": "int", "str": "str"}
+_SEQUENCE = re.compile(r"^(?:tuple\[(\w+), \.\.\.\]|Sequence\[(\w+)\])$")
+
+# Models decorated so far, by name, so later models can nest them.
+_MODELS: dict[str, type] = {}
+
+
+def _decode_expr(annotation: str, value: str, owner: str) -> tuple[str, bool]:
+    """Source converting ``value`` for ``annotation``, and whether it is a sequence."""
+    if annotation in _SCALARS:
+        return f"{_SCALARS[annotation]}({value})", False
+    match = _SEQUENCE.match(annotation)
+    if match:
+        element = match.group(1) or match.group(2)
+        if element in _SCALARS:
+            return f"tuple([{_SCALARS[element]}(x) for x in {value}])", True
+        if element in _MODELS:
+            return f"tuple([_decode_{element}(x) for x in {value}])", True
+    raise TypeError(f"{owner}: unsupported field annotation {annotation!r}.")
+
+
+def _encode_expr(annotation: str, value: str) -> str:
+    match = _SEQUENCE.match(annotation)
+    if not match:
+        return value
+    element = match.group(1) or match.group(2)
+    if element in _MODELS:
+        return f"[_encode_{element}(x) for x in {value}]"
+    return f"list({value})"
+
+
+def compile_codecs(
+    cls: type, defaults: dict[str, str] | None = None
+) -> dict[str, Callable[..., Any]]:
+    """Generate the ``decode``/``encode``/``from_dicts``/``to_dicts`` functions.
+
+    ``defaults`` maps a field to the source of its value when the payload
+    lacks it, evaluated after the sequence fields are decoded so it may use
+    them, e.g. ``{"beat_count": "len(beats)"}``. Otherwise a missing
+    sequence is empty, a missing field with a dataclass default takes it and
+    any other field is required.
+    """
+    defaults = dict(defaults or {})
+    name = cls.__name__
+    namespace: dict[str, Any] = {"_cls": cls, "_new": object.__new__}
+    for model, nested in _MODELS.items():
+        namespace[f"_decode_{model}"] = nested._decode
+        namespace[f"_encode_{model}"] = nested._encode
+    namespace["SCHEMA_VERSION"] = SCHEMA_VERSION
+
+    payload = [field for field in dataclasses.fields(cls) if field.init]
+    sequences: list[str] = []
+    scalars: list[str] = []
+    for field in payload:
+        key = repr(field.name)
+        expr, is_sequence = _decode_expr(str(field.type), f"data[{key}]", name)
+        default = defaults.get(field.name)
+        if default is None and is_sequence:
+            default = "()"
+        elif default is None and field.default is not dataclasses.MISSING:
+            namespace[f"_default_{field.name}"] = field.default
+            default = f"_default_{field.name}"
+        if default is not None:
+            expr = f"{expr} if {key} in data else {default}"
+        (sequences if is_sequence else scalars).append(f"    {field.name} = {expr}")
+
+    lines = ["def decode(data):", *sequences, *scalars, "    obj = _new(_cls)"]
+    for field in dataclasses.fields(cls):
+        # The slot descriptors write past the frozen __setattr__.
+        namespace[f"_set_{field.name}"] = cls.__dict__[field.name].__set__
+        value = field.name
+        if not field.init:
+            namespace[f"_default_{field.name}"] = field.default
+            value = f"_default_{field.name}"
+        lines.append(f"    _set_{field.name}(obj, {value})")
+    lines.append("    return obj")
+
+    items = ", ".join(
+        f"{field.name!r}: {_encode_expr(str(field.type), f'obj.{field.name}')}"
+        for field in payload
+    )
+    lines += [
+        "",
+        "def encode(obj):",
+        f"    return {{{items}}}",
+        "",
+        "def from_dicts(items):",
+        "    return [decode(data) for data in items]",
+        "",
+        "def to_dicts(objs):",
+        "    return [encode(obj) for obj in objs]",
+    ]
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, f"<codecs {name}>", "exec"), namespace)
+    codecs = {key: namespace[key] for key in ("decode", "encode", "from_dicts", "to_dicts")}
+    for function in codecs.values():
+        function.__source__ = source
+    return codecs
+
+
+def contract_model(
+    defaults: dict[str, str] | None = None,
+) -> Callable[[type[T]], type[T]]:
+    """Install the generated codecs on a ``slots=True`` dataclass.
+
+    Adds ``from_dict``/``from_dicts`` classmethods and ``to_dict``/
+    ``to_dicts``, and registers the class so later models can nest it.
+    """
+
+    def decorate(cls: type[T]) -> type[T]:
+        if not dataclasses.is_dataclass(cls) or "__slots__" not in cls.__dict__:
+            raise TypeError(f"{cls.__name__} must be a dataclass with slots=True.")
+        codecs = compile_codecs(cls, defaults)
+        decode, from_dicts = codecs["decode"], codecs["from_dicts"]
+
+        def from_dict(cls: type[T], data: dict[str, Any]) -> T:
+            return decode(data)
+
+        def from_dicts_method(cls: type[T], items: Iterable[dict[str, Any]]) -> list[T]:
+            return from_dicts(items)
+
+        from_dicts_method.__name__ = "from_dicts"
+        setattr(cls, "_decode", staticmethod(decode))
+        setattr(cls, "_encode", staticmethod(codecs["encode"]))
+        setattr(cls, "from_dict", classmethod(from_dict))
+        setattr(cls, "from_dicts", classmethod(from_dicts_method))
+        setattr(cls, "to_dict", codecs["encode"])
+        setattr(cls, "to_dicts", staticmethod(codecs["to_dicts"]))
+        _MODELS[cls.__name__] = cls
+        return cls
+
+    return decorate
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
-from typing import Any
+import heapq
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from .version import SCHEMA_VERSION
+from .model_compiler import contract_model
 
+if TYPE_CHECKING:
+    from .beat_grid import BeatGrid
 
-@dataclass(frozen=True)
+try:
+    import numpy as _np
+except ImportError:  # NumPy is optional; SegmentTable falls back to array.array.
+    _np = None
+
+
+@contract_model(defaults={"spike_count": "0", "cluster_density": "0.0"})
+@dataclass(frozen=True, slots=True)
 class IntensitySegment:
     start: float
     end: float
@@ -20,116 +33,267 @@ class IntensitySegment:
     def length(self) -> float:
         return max(0.0, self.end - self.start)
 
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "IntensitySegment":
-        return cls(
-            start=float(data["start"]),
-            end=float(data["end"]),
-            intensity_score=float(data["intensity_score"]),
-            spike_count=int(data.get("spike_count", 0)),
-            cluster_density=float(data.get("cluster_density", 0.0)),
-            ding_hit_count=int(data.get("ding_hit_count", 0)),
-            max_ding_confidence=float(data.get("max_ding_confidence", 0.0)),
-        )
-
 
-@dataclass(frozen=True)
+@contract_model(defaults={"schema_version": "SCHEMA_VERSION"})
+@dataclass(frozen=True, slots=True)
 class ClipAnalysis:
     schema_version: str
     clip_id: str
     duration: float
     intensity_segments: tuple[IntensitySegment, ...]
 
+
+class SegmentTable:
+    """Struct-of-arrays view of the intensity segments of many clips.
+
+    Every ``IntensitySegment`` field is one column, plus ``clip_index`` into
+    ``clip_ids``. Columns are NumPy arrays when NumPy is installed and
+    ``array.array`` otherwise; filtering, sorting and top-k selection are
+    vectorized in the first case and plain loops in the second. All
+    selection methods return a new table; ``to_segments()`` converts back to
+    ``IntensitySegment`` objects.
+    """
+
+    FLOAT_COLUMNS = ("start", "end", "intensity_score", "cluster_density", "max_ding_confidence")
+    INT_COLUMNS = ("clip_index", "spike_count", "ding_hit_count")
+
+    def __init__(self, clip_ids: Sequence[str], columns: dict[str, Any]) -> None:
+        self.clip_ids = tuple(clip_ids)
+        self._columns = columns
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("SegmentTable columns must all have the same length.")
+
+    @staticmethod
+    def _new_column(values: Iterable[float], integer: bool) -> Any:
+        if _np is not None:
+            return _np.fromiter(values, dtype=_np.int64 if integer else _np.float64)
+        return array("q" if integer else "d", values)
+
     @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "ClipAnalysis":
+    def from_payloads(cls, payloads: Iterable[dict[str, Any]]) -> "SegmentTable":
+        """Build from canonical clip-analysis payload items without creating
+        per-segment objects. Missing optional fields take the same defaults
+        as ``IntensitySegment.from_dict``.
+        """
+        clip_ids: list[str] = []
+        raw: dict[str, list[Any]] = {
+            name: [] for name in (*cls.INT_COLUMNS, *cls.FLOAT_COLUMNS)
+        }
+        for clip_index, item in enumerate(payloads):
+            clip_ids.append(str(item["clip_id"]))
+            for seg in item.get("intensity_segments", []):
+                raw["clip_index"].append(clip_index)
+                raw["start"].append(float(seg["start"]))
+                raw["end"].append(float(seg["end"]))
+                raw["intensity_score"].append(float(seg["intensity_score"]))
+                raw["spike_count"].append(int(seg.get("spike_count", 0)))
+                raw["cluster_density"].append(float(seg.get("cluster_density", 0.0)))
+                raw["ding_hit_count"].append(int(seg.get("ding_hit_count", 0)))
+                raw["max_ding_confidence"].append(float(seg.get("max_ding_confidence", 0.0)))
         return cls(
-            schema_version=str(data.get("schema_version", SCHEMA_VERSION)),
-            clip_id=str(data["clip_id"]),
-            duration=float(data["duration"]),
-            intensity_segments=tuple(
-                IntensitySegment.from_dict(item)
-                for item in data.get("intensity_segments", [])
-            ),
+            clip_ids,
+            {
+                name: cls._new_column(values, name in cls.INT_COLUMNS)
+                for name, values in raw.items()
+            },
         )
 
-    def to_dict(self) -> dict[str, Any]:
-        return {
-            "schema_version": self.schema_version,
-            "clip_id": self.clip_id,
-            "duration": self.duration,
-            "intensity_segments": [asdict(item) for item in self.intensity_segments],
+    @classmethod
+    def from_clip_analyses(cls, analyses: Iterable["ClipAnalysis"]) -> "SegmentTable":
+        clip_ids: list[str] = []
+        raw: dict[str, list[Any]] = {
+            name: [] for name in (*cls.INT_COLUMNS, *cls.FLOAT_COLUMNS)
         }
+        for clip_index, analysis in enumerate(analyses):
+            clip_ids.append(analysis.clip_id)
+            for seg in analysis.intensity_segments:
+                raw["clip_index"].append(clip_index)
+                for name in (*cls.INT_COLUMNS[1:], *cls.FLOAT_COLUMNS):
+                    raw[name].append(getattr(seg, name))
+        return cls(
+            clip_ids,
+            {
+                name: cls._new_column(values, name in cls.INT_COLUMNS)
+                for name, values in raw.items()
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self._columns["start"])
+
+    def column(self, name: str) -> Any:
+        """Return column ``name``; treat it as read-only."""
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"Unknown SegmentTable column: {name}") from None
+
+    def lengths(self) -> Any:
+        """Per-segment ``max(0, end - start)``, matching ``IntensitySegment.length``."""
+        starts, ends = self._columns["start"], self._columns["end"]
+        if _np is not None:
+            return _np.maximum(ends - starts, 0.0)
+        return array("d", (max(0.0, end - start) for start, end in zip(starts, ends)))
+
+    def segment_clip_ids(self) -> list[str]:
+        return [self.clip_ids[idx] for idx in self._columns["clip_index"]]
+
+    def take(self, indices: Iterable[int]) -> "SegmentTable":
+        """Return the rows at ``indices``, in that order."""
+        if _np is not None:
+            if not hasattr(indices, "dtype"):
+                indices = list(indices)
+            index_array = _np.asarray(indices, dtype=_np.int64)
+            return SegmentTable(
+                self.clip_ids,
+                {name: values[index_array] for name, values in self._columns.items()},
+            )
+        rows = list(indices)
+        return SegmentTable(
+            self.clip_ids,
+            {
+                name: array(values.typecode, (values[idx] for idx in rows))
+                for name, values in self._columns.items()
+            },
+        )
+
+    def where(
+        self,
+        min_intensity: float | None = None,
+        min_length: float | None = None,
+        overlapping: tuple[float, float] | None = None,
+        clip_id: str | None = None,
+    ) -> "SegmentTable":
+        """Keep rows matching every given condition.
+
+        ``overlapping`` keeps segments whose ``[start, end)`` range intersects
+        the given one.
+        """
+        starts, ends = self._columns["start"], self._columns["end"]
+        scores = self._columns["intensity_score"]
+        clip_index = self.clip_ids.index(clip_id) if clip_id in self.clip_ids else -1
+
+        if _np is not None:
+            mask = _np.ones(len(self), dtype=bool)
+            if min_intensity is not None:
+                mask &= scores >= min_intensity
+            if min_length is not None:
+                mask &= self.lengths() >= min_length
+            if overlapping is not None:
+                mask &= (starts < overlapping[1]) & (ends > overlapping[0])
+            if clip_id is not None:
+                mask &= self._columns["clip_index"] == clip_index
+            return self.take(_np.flatnonzero(mask))
+
+        lengths = self.lengths() if min_length is not None else None
+        keep = []
+        for idx in range(len(self)):
+            if min_intensity is not None and scores[idx] < min_intensity:
+                continue
+            if lengths is not None and lengths[idx] < min_length:
+                continue
+            if overlapping is not None and not (
+                starts[idx] < overlapping[1] and ends[idx] > overlapping[0]
+            ):
+                continue
+            if clip_id is not None and self._columns["clip_index"][idx] != clip_index:
+                continue
+            keep.append(idx)
+        return self.take(keep)
+
+    def sort_by(self, name: str, descending: bool = True) -> "SegmentTable":
+        """Sort rows by column ``name``; ties keep their current order."""
+        values = self.column(name)
+        if _np is not None:
+            keys = -values if descending else values
+            return self.take(_np.argsort(keys, kind="stable"))
+        order = sorted(range(len(self)), key=values.__getitem__, reverse=descending)
+        return self.take(order)
+
+    def top_k(self, name: str, k: int) -> "SegmentTable":
+        """The ``k`` rows with the largest ``name`` values, largest first."""
+        k = max(0, min(k, len(self)))
+        values = self.column(name)
+        if k == 0:
+            return self.take([])
+        if _np is not None:
+            candidates = _np.argpartition(-values, k - 1)[:k]
+            order = _np.lexsort((candidates, -values[candidates]))
+            return self.take(candidates[order])
+        best = heapq.nsmallest(k, range(len(self)), key=lambda idx: (-values[idx], idx))
+        return self.take(best)
 
+    def segment(self, idx: int) -> IntensitySegment:
+        columns = self._columns
+        return IntensitySegment(
+            start=float(columns["start"][idx]),
+            end=float(columns["end"][idx]),
+            intensity_score=float(columns["intensity_score"][idx]),
+            spike_count=int(columns["spike_count"][idx]),
+            cluster_density=float(columns["cluster_density"][idx]),
+            ding_hit_count=int(columns["ding_hit_count"][idx]),
+            max_ding_confidence=float(columns["max_ding_confidence"][idx]),
+        )
+
+    def to_segments(self) -> tuple[IntensitySegment, ...]:
+        return tuple(self.segment(idx) for idx in range(len(self)))
 
-@dataclass(frozen=True)
+
+@contract_model()
+@dataclass(frozen=True, slots=True)
 class BeatStrengthPoint:
     time: float
     strength: float
 
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "BeatStrengthPoint":
-        return cls(time=float(data["time"]), strength=float(data["strength"]))
 
-
-@dataclass(frozen=True)
+@contract_model()
+@dataclass(frozen=True, slots=True)
 class DropSection:
     start: float
     end: float
     energy_score: float = 0.0
 
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "DropSection":
-        return cls(
-            start=float(data["start"]),
-            end=float(data["end"]),
-            energy_score=float(data.get("energy_score", 0.0)),
-        )
-
 
-@dataclass(frozen=True)
+@contract_model(defaults={"schema_version": "SCHEMA_VERSION", "beat_count": "len(beats)"})
+@dataclass(frozen=True, slots=True)
 class MusicAnalysis:
     schema_version: str
     song: str
     song_duration: float
     tempo: float
     beat_count: int
-    beats: tuple[float, ...]
-    beat_strength: tuple[BeatStrengthPoint, ...]
-    drop_sections: tuple[DropSection, ...]
+    # Tuples when built from JSON; memory-mapped column views when loaded with
+    # from_columnar().
+    beats: Sequence[float]
+    beat_strength: Sequence[BeatStrengthPoint]
+    drop_sections: Sequence[DropSection]
+    # Filled by the beat_grid property; slotted classes cannot use cached_property.
+    _beat_grid: BeatGrid | None = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "MusicAnalysis":
-        beats = tuple(float(b) for b in data.get("beats", []))
-        return cls(
-            schema_version=str(data.get("schema_version", SCHEMA_VERSION)),
-            song=str(data["song"]),
-            song_duration=float(data["song_duration"]),
-            tempo=float(data["tempo"]),
-            beat_count=int(data.get("beat_count", len(beats))),
-            beats=beats,
-            beat_strength=tuple(
-                BeatStrengthPoint.from_dict(item)
-                for item in data.get("beat_strength", [])
-            ),
-            drop_sections=tuple(
-                DropSection.from_dict(item) for item in data.get("drop_sections", [])
-            ),
-        )
+    def from_columnar(cls, path: Path) -> "MusicAnalysis":
+        from .columnar import load_music_columns
 
-    def to_dict(self) -> dict[str, Any]:
-        return {
-            "schema_version": self.schema_version,
-            "song": self.song,
-            "song_duration": self.song_duration,
-            "tempo": self.tempo,
-            "beat_count": self.beat_count,
-            "beats": list(self.beats),
-            "beat_strength": [asdict(item) for item in self.beat_strength],
-            "drop_sections": [asdict(item) for item in self.drop_sections],
-        }
+        return load_music_columns(path)
+
+    def to_columnar(self, path: Path) -> None:
+        from .columnar import write_music_columns
+
+        write_music_columns(self, path)
 
+    @property
+    def beat_grid(self) -> "BeatGrid":
+        """Beat snapping and windowed strength/drop queries, built on first use."""
+        if self._beat_grid is None:
+            from .beat_grid import BeatGrid
+
+            object.__setattr__(self, "_beat_grid", BeatGrid.from_music_analysis(self))
+        return self._beat_grid
 
-@dataclass(frozen=True)
+
+@contract_model()
+@dataclass(frozen=True, slots=True)
 class TimelineEntry:
     clip_id: str
     clip_start: float
@@ -137,39 +301,10 @@ class TimelineEntry:
     song_start: float
     song_end: float
 
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "TimelineEntry":
-        return cls(
-            clip_id=str(data["clip_id"]),
-            clip_start=float(data["clip_start"]),
-            clip_end=float(data["clip_end"]),
-            song_start=float(data["song_start"]),
-            song_end=float(data["song_end"]),
-        )
-
-    def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
 
-
-@dataclass(frozen=True)
+@contract_model(defaults={"schema_version": "SCHEMA_VERSION"})
+@dataclass(frozen=True, slots=True)
 class TimelinePlan:
     schema_version: str
     timeline: tuple[TimelineEntry, ...]
     total_duration: float
-
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> "TimelinePlan":
-        return cls(
-            schema_version=str(data.get("schema_version", SCHEMA_VERSION)),
-            timeline=tuple(
-                TimelineEntry.from_dict(item) for item in data.get("timeline", [])
-            ),
-            total_duration=float(data["total_duration"]),
-        )
-
-    def to_dict(self) -> dict[str, Any]:
-        return {
-            "schema_version": self.schema_version,
-            "timeline": [item.to_dict() for item in self.timeline],
-            "total_duration": self.total_duration,
-        }
@@ -0,0 +1,346 @@
+"""Render-side views of a ``TimelinePlan``.
+
+``TimelineIndex`` answers "which entries cover song time t" and "which
+entries overlap [start, end)" in O(log n + matches), for timelines whose
+entries may overlap. ``DecodeSchedule`` groups the entries by source clip
+and merges overlapping or adjacent source ranges, so a renderer can read
+each stretch of a clip once and cut every entry out of the decoded span
+instead of seeking once per entry. ``split_timeline`` cuts a plan into
+song-time chunks on entry boundaries, rebased to start at zero, so the
+chunks can be rendered independently and concatenated.
+``segment_timeline`` does the same in pieces of a given length that line up
+with the pieces of an earlier split, so unchanged pieces can be reused.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+
+from .models import TimelineEntry, TimelinePlan
+from .version import SCHEMA_VERSION
+
+if TYPE_CHECKING:
+    from .beat_grid import BeatGrid
+
+
+class TimelineIndex:
+    """Interval index over the ``song_start``/``song_end`` of a plan's entries.
+
+    Entries are sorted by ``song_start`` and laid out as an implicit balanced
+    binary tree over that order: the node for a slice of the array is its
+    middle element, which also stores the largest ``song_end`` in the slice.
+    Queries skip every subtree whose largest end is at or before the query
+    start. Intervals are half-open, so an entry ending at ``t`` does not
+    cover ``t``. Results are timeline indices, in ``song_start`` order.
+    """
+
+    def __init__(self, entries: tuple[TimelineEntry, ...] | list[TimelineEntry]) -> None:
+        self.entries = tuple(entries)
+        self._order = sorted(
+            range(len(self.entries)),
+            key=lambda idx: (self.entries[idx].song_start, idx),
+        )
+        self._starts = [self.entries[idx].song_start for idx in self._order]
+        self._ends = [self.entries[idx].song_end for idx in self._order]
+        self._max_end = list(self._ends)
+        self._build(0, len(self._order))
+
+    @classmethod
+    def from_plan(cls, plan: TimelinePlan) -> "TimelineIndex":
+        return cls(plan.timeline)
+
+    def _build(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _collect(
+        self, lo: int, hi: int, start: float, end: float, out: list[int], inclusive: bool = False
+    ) -> None:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._max_end[mid] <= start:
+                return
+            self._collect(lo, mid, start, end, out, inclusive)
+            if self._starts[mid] > end if inclusive else self._starts[mid] >= end:
+                return
+            if self._ends[mid] > start:
+                out.append(self._order[mid])
+            lo = mid + 1
+
+    def overlapping(self, start: float, end: float) -> list[int]:
+        """Indices of the entries that overlap the song range ``[start, end)``."""
+        if end <= start:
+            return []
+        out: list[int] = []
+        self._collect(0, len(self._order), start, end, out)
+        return out
+
+    def covering(self, time: float) -> list[int]:
+        """Indices of the entries whose ``[song_start, song_end)`` contains ``time``."""
+        out: list[int] = []
+        # An entry starting exactly at ``time`` covers it, hence the
+        # inclusive right bound.
+        self._collect(0, len(self._order), time, time, out, inclusive=True)
+        return out
+
+    def entry_at(self, time: float) -> TimelineEntry | None:
+        """The earliest-starting entry that covers ``time``, or None in a gap."""
+        covering = self.covering(time)
+        return self.entries[covering[0]] if covering else None
+
+
+@dataclass(frozen=True)
+class DecodeSpan:
+    """One contiguous read of a source clip and the timeline entries cut from it."""
+
+    clip_id: str
+    clip_start: float
+    clip_end: float
+    entries: tuple[int, ...]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "clip_id": self.clip_id,
+            "clip_start": self.clip_start,
+            "clip_end": self.clip_end,
+            "entries": list(self.entries),
+        }
+
+
+@dataclass(frozen=True)
+class DecodeSchedule:
+    """Decode spans of a plan, grouped by clip in order of first use.
+
+    Within a clip, entries are sorted by ``clip_start`` and merged into one
+    span while the next entry starts no more than ``max_gap`` seconds after
+    the current span ends. ``max_gap=0`` merges only overlapping or exactly
+    adjacent ranges; a larger gap trades decoding a few unused frames for a
+    seek. ``entries`` are indices into the plan's timeline.
+    """
+
+    spans: tuple[DecodeSpan, ...]
+    max_gap: float = 0.0
+
+    @classmethod
+    def from_plan(cls, plan: TimelinePlan, max_gap: float = 0.0) -> "DecodeSchedule":
+        if max_gap < 0:
+            raise ValueError("max_gap must be >= 0.")
+        by_clip: dict[str, list[int]] = {}
+        for idx, entry in enumerate(plan.timeline):
+            by_clip.setdefault(entry.clip_id, []).append(idx)
+
+        spans: list[DecodeSpan] = []
+        for clip_id, indices in by_clip.items():
+            indices.sort(key=lambda idx: (plan.timeline[idx].clip_start, idx))
+            current: list[int] = []
+            span_start = span_end = 0.0
+            for idx in indices:
+                entry = plan.timeline[idx]
+                if current and entry.clip_start <= span_end + max_gap:
+                    current.append(idx)
+                    span_end = max(span_end, entry.clip_end)
+                    continue
+                if current:
+                    spans.append(DecodeSpan(clip_id, span_start, span_end, tuple(current)))
+                current = [idx]
+                span_start, span_end = entry.clip_start, entry.clip_end
+            spans.append(DecodeSpan(clip_id, span_start, span_end, tuple(current)))
+        return cls(spans=tuple(spans), max_gap=max_gap)
+
+    def __iter__(self) -> Iterator[DecodeSpan]:
+        return iter(self.spans)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def span_of(self) -> dict[int, int]:
+        """Map from timeline index to the index of the span it is cut from."""
+        return {entry: idx for idx, span in enumerate(self.spans) for entry in span.entries}
+
+    def to_dict(self) -> dict[str, Any]:
+        cuts = sum(len(span.entries) for span in self.spans)
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "max_gap": self.max_gap,
+            "clips": len({span.clip_id for span in self.spans}),
+            "cuts": cuts,
+            "decode_spans": len(self.spans),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+@dataclass(frozen=True)
+class TimelineChunk:
+    """A contiguous song-time slice of a plan, rebased to start at zero.
+
+    ``song_offset`` is where the chunk starts in the original song and
+    ``plan.total_duration`` its length; ``entries`` are the indices of its
+    entries in the original timeline.
+    """
+
+    index: int
+    song_offset: float
+    plan: TimelinePlan
+    entries: tuple[int, ...]
+
+    @property
+    def song_end(self) -> float:
+        return self.song_offset + self.plan.total_duration
+
+
+def _boundaries(entries: list[TimelineEntry], total_duration: float) -> list[float]:
+    """Entry start times, inside the song, that no earlier entry runs past."""
+    boundaries = []
+    reach = float("-inf")
+    for previous, entry in zip(entries, entries[1:]):
+        reach = max(reach, previous.song_end)
+        if reach <= entry.song_start and 0.0 < entry.song_start < total_duration:
+            boundaries.append(entry.song_start)
+    return boundaries
+
+
+def _song_order(plan: TimelinePlan) -> tuple[list[int], list[TimelineEntry]]:
+    order = sorted(
+        range(len(plan.timeline)), key=lambda idx: (plan.timeline[idx].song_start, idx)
+    )
+    return order, [plan.timeline[idx] for idx in order]
+
+
+def _beat_test(
+    beat_grid: "BeatGrid | None", beat_tolerance: float
+) -> Callable[[float], bool]:
+    def on_beat(time: float) -> bool:
+        if beat_grid is None:
+            return False
+        beat = beat_grid.nearest_beat(time)
+        return beat is not None and abs(beat - time) <= beat_tolerance
+
+    return on_beat
+
+
+def _choose_cuts(
+    boundaries: list[float],
+    start: float,
+    end: float,
+    pieces: int,
+    on_beat: Callable[[float], bool],
+) -> list[float]:
+    """Boundaries inside ``(start, end)`` nearest ``pieces`` equal-length targets."""
+    length = (end - start) / pieces
+    inside = [time for time in boundaries if start < time < end]
+    cuts: list[float] = []
+    for target in (start + length * k for k in range(1, pieces)):
+        candidates = [time for time in inside if not cuts or time > cuts[-1]]
+        if not candidates:
+            break
+        near = [time for time in candidates if abs(time - target) <= length / 4]
+        cuts.append(
+            min(
+                near or candidates,
+                key=lambda time: (not on_beat(time), abs(time - target)),
+            )
+        )
+    return cuts
+
+
+def _chunks_at(
+    plan: TimelinePlan, order: list[int], entries: list[TimelineEntry], cuts: list[float]
+) -> list[TimelineChunk]:
+    # Rebased times are rounded to the microsecond so that subtracting the
+    # offset does not leave float noise such as 2.1999999999999997.
+    result = []
+    starts = [0.0, *cuts]
+    ends = [*cuts, plan.total_duration]
+    position = 0
+    for index, (offset, end) in enumerate(zip(starts, ends)):
+        last = index == len(starts) - 1
+        indices = []
+        while position < len(entries) and (last or entries[position].song_start < end):
+            indices.append(order[position])
+            position += 1
+        rebased = TimelinePlan(
+            schema_version=plan.schema_version,
+            timeline=tuple(
+                replace(
+                    plan.timeline[idx],
+                    song_start=round(plan.timeline[idx].song_start - offset, 6),
+                    song_end=round(plan.timeline[idx].song_end - offset, 6),
+                )
+                for idx in indices
+            ),
+            total_duration=round(end - offset, 6),
+        )
+        result.append(TimelineChunk(index, offset, rebased, tuple(indices)))
+    return result
+
+
+def split_timeline(
+    plan: TimelinePlan,
+    chunks: int,
+    beat_grid: "BeatGrid | None" = None,
+    beat_tolerance: float = 0.05,
+) -> list[TimelineChunk]:
+    """Split ``plan`` into at most ``chunks`` pieces of roughly equal song time.
+
+    Cuts are only made between entries, never inside one, at the boundary
+    nearest each equal-length target. With a ``beat_grid``, a boundary within
+    ``beat_tolerance`` seconds of a beat is preferred over an off-beat one,
+    as long as it is within a quarter of a chunk of the target. Fewer chunks
+    come back when the timeline has too few boundaries.
+    """
+    if chunks < 1:
+        raise ValueError("chunks must be >= 1.")
+    order, entries = _song_order(plan)
+    boundaries = _boundaries(entries, plan.total_duration)
+    cuts = _choose_cuts(
+        boundaries, 0.0, plan.total_duration, chunks, _beat_test(beat_grid, beat_tolerance)
+    )
+    return _chunks_at(plan, order, entries, cuts)
+
+
+def segment_timeline(
+    plan: TimelinePlan,
+    segment_seconds: float,
+    keep: Iterable[tuple[float, float]] = (),
+    beat_grid: "BeatGrid | None" = None,
+    beat_tolerance: float = 0.05,
+) -> list[TimelineChunk]:
+    """Split ``plan`` into pieces of about ``segment_seconds`` of song time.
+
+    ``keep`` holds ``(start, end)`` song ranges, usually the pieces of an
+    earlier split of a similar timeline. A range whose two ends are still cut
+    points (a boundary between entries, or an end of the song) comes back as
+    one piece, so pieces of an edited timeline line up with the earlier ones
+    wherever the edit did not move a boundary. The song time between kept
+    ranges is cut as by :func:`split_timeline`.
+    """
+    if segment_seconds <= 0:
+        raise ValueError("segment_seconds must be > 0.")
+    order, entries = _song_order(plan)
+    boundaries = _boundaries(entries, plan.total_duration)
+    on_beat = _beat_test(beat_grid, beat_tolerance)
+
+    # Earlier offsets went through JSON, so they are matched at microseconds.
+    points = {round(time, 6): time for time in (0.0, *boundaries, plan.total_duration)}
+    kept = set()
+    for start, end in keep:
+        span = (points.get(round(start, 6)), points.get(round(end, 6)))
+        if span[0] is not None and span[1] is not None and span[0] < span[1]:
+            kept.add(span)
+    fixed = sorted({time for span in kept for time in span} | {0.0, plan.total_duration})
+
+    cuts: list[float] = []
+    for start, end in zip(fixed, fixed[1:]):
+        if start > 0.0:
+            cuts.append(start)
+        if (start, end) not in kept:
+            pieces = max(1, round((end - start) / segment_seconds))
+            cuts.extend(_choose_cuts(boundaries, start, end, pieces, on_beat))
+    return _chunks_at(plan, order, entries, cuts)
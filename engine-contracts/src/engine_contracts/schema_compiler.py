@@ -0,0 +1,156 @@
+"""Compile the contract JSON schemas into specialized Python validators.
+
+``compile_schema`` walks a schema once and generates the source of a single
+function that checks a payload in one pass: no per-node dispatch and no
+schema lookups at validation time. Only the JSON Schema subset the contract
+schemas use is supported (``type``, ``required``, ``properties`` and
+``items``, plus annotation keywords); anything else is rejected at compile
+time so a schema change cannot silently go unchecked.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "$comment"}
+_SUPPORTED = _ANNOTATIONS | {"type", "required", "properties", "items"}
+
+_TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "integer": (
+        "((isinstance({v}, int) and not isinstance({v}, bool))"
+        " or (isinstance({v}, float) and {v}.is_integer()))"
+    ),
+}
+
+
+@dataclass(frozen=True)
+class SchemaError:
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class SchemaValidationError(ValueError):
+    """Raised with the first errors found; ``errors`` holds them all."""
+
+    def __init__(self, title: str, errors: list[SchemaError]) -> None:
+        self.errors = errors
+        details = "\n".join(f"  {error}" for error in errors)
+        super().__init__(f"{title} payload does not match its schema:\n{details}")
+
+
+class _Stop(Exception):
+    pass
+
+
+def _report(errors: list[SchemaError], limit: int, path: str, message: str) -> None:
+    errors.append(SchemaError(path, message))
+    if len(errors) >= limit:
+        raise _Stop
+
+
+class _Emitter:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self._counter = 0
+
+    def name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def emit(self, depth: int, line: str) -> None:
+        self.lines.append("    " * depth + line)
+
+    def node(self, schema: dict[str, Any], var: str, path: str, depth: int) -> None:
+        """Emit checks for ``var`` (a local holding the value at f-string ``path``)."""
+        unknown = set(schema) - _SUPPORTED
+        if unknown:
+            raise ValueError(f"Unsupported schema keyword(s): {', '.join(sorted(unknown))}")
+
+        types = schema.get("type")
+        if isinstance(types, str):
+            types = [types]
+        if types:
+            for type_name in types:
+                if type_name not in _TYPE_CHECKS:
+                    raise ValueError(f"Unsupported schema type: {type_name}")
+            check = " or ".join(_TYPE_CHECKS[t].format(v=var) for t in types)
+            expected = " or ".join(types)
+            self.emit(depth, f"if not ({check}):")
+            self.emit(
+                depth + 1,
+                f"report(errors, limit, f{path!r}, "
+                f"'expected {expected}, got ' + type({var}).__name__)",
+            )
+            self.emit(depth, "else:")
+            depth += 1
+            self.emit(depth, "pass")
+
+        object_checks = "required" in schema or "properties" in schema
+        if object_checks:
+            if types is None:
+                self.emit(depth, f"if isinstance({var}, dict):")
+                depth += 1
+                self.emit(depth, "pass")
+            for key in schema.get("required", []):
+                self.emit(depth, f"if {key!r} not in {var}:")
+                self.emit(
+                    depth + 1,
+                    f"report(errors, limit, f{path!r}, 'missing required property {key}')",
+                )
+            for key, subschema in schema.get("properties", {}).items():
+                child = self.name("v")
+                self.emit(depth, f"{child} = {var}.get({key!r}, MISSING)")
+                self.emit(depth, f"if {child} is not MISSING:")
+                escaped = key.replace("{", "{{").replace("}", "}}")
+                self.node(subschema, child, f"{path}.{escaped}", depth + 1)
+            if types is None:
+                depth -= 1
+
+        if "items" in schema:
+            if types is None:
+                self.emit(depth, f"if isinstance({var}, list):")
+                depth += 1
+            index = self.name("i")
+            child = self.name("v")
+            self.emit(depth, f"for {index}, {child} in enumerate({var}):")
+            self.node(schema["items"], child, f"{path}[{{{index}}}]", depth + 1)
+            self.emit(depth + 1, "pass")
+
+
+def compile_schema(schema: dict[str, Any]) -> Callable[..., list[SchemaError]]:
+    """Return ``validate(payload, max_errors=10) -> list[SchemaError]`` for ``schema``.
+
+    Validation stops after ``max_errors`` errors; an empty list means the
+    payload is valid.
+    """
+    emitter = _Emitter()
+    emitter.emit(0, "def _check(v0, errors, limit):")
+    emitter.node(schema, "v0", "$", 1)
+    emitter.emit(1, "pass")
+    source = "\n".join(emitter.lines)
+
+    namespace: dict[str, Any] = {"report": _report, "MISSING": object()}
+    exec(compile(source, f"<schema {schema.get('title', 'anonymous')}>", "exec"), namespace)
+    check = namespace["_check"]
+
+    def validate(payload: Any, max_errors: int = 10) -> list[SchemaError]:
+        errors: list[SchemaError] = []
+        try:
+            check(payload, errors, max(1, max_errors))
+        except _Stop:
+            pass
+        return errors
+
+    validate.source = source  # type: ignore[attr-defined]
+    return validate
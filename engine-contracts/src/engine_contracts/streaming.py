@@ -0,0 +1,130 @@
+"""Incremental reader for clip-analysis artifacts.
+
+``iter_clip_analysis`` walks the top-level JSON array of a clip-analysis file
+in fixed-size chunks and yields one validated item at a time, so memory is
+bounded by the chunk size plus the largest single item rather than by the
+whole file.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .codecs import open_artifact
+from .models import ClipAnalysis
+from .validators import validate_clip_analysis_item
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+
+class _Chunks:
+    """Text buffer over a stream, topped up on demand and compacted between items."""
+
+    def __init__(self, handle: IO[str], chunk_size: int) -> None:
+        self._handle = handle
+        self._chunk_size = max(1, chunk_size)
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum: int = 0) -> bool:
+        """Append at least one chunk (or ``minimum`` characters); False at end of input."""
+        if self.eof:
+            return False
+        chunk = self._handle.read(max(self._chunk_size, minimum))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def compact(self) -> None:
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+    def peek(self) -> str:
+        """Advance past whitespace and return the next character, or "" at end of input."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            self.compact()
+            if not self.fill():
+                return ""
+
+
+def _decode_item(chunks: _Chunks, decoder: json.JSONDecoder, idx: int) -> Any:
+    start = chunks.pos
+    while True:
+        try:
+            item, end = decoder.raw_decode(chunks.text, start)
+        except json.JSONDecodeError as exc:
+            # Read at least as much again as is buffered, so an item spanning
+            # many chunks is re-decoded a logarithmic number of times.
+            if chunks.fill(minimum=len(chunks.text) - start):
+                continue
+            raise ValueError(f"Clip analysis item {idx} is not valid JSON: {exc.msg}") from None
+        # A value that ends exactly at the buffer edge (e.g. a number) may
+        # continue in the next chunk.
+        if end == len(chunks.text) and chunks.fill():
+            continue
+        chunks.pos = end
+        return item
+
+
+def _iter_items(handle: IO[str], chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    chunks = _Chunks(handle, chunk_size)
+    if chunks.peek() != "[":
+        raise ValueError("Clip analysis payload must be a list.")
+    chunks.pos += 1
+    idx = 0
+    if chunks.peek() == "]":
+        chunks.pos += 1
+    else:
+        while True:
+            if chunks.peek() == "":
+                raise ValueError(f"Clip analysis item {idx} is truncated.")
+            yield _decode_item(chunks, decoder, idx)
+            chunks.compact()
+            following = chunks.peek()
+            if following == "]":
+                chunks.pos += 1
+                break
+            if following != ",":
+                raise ValueError(f"Clip analysis item {idx} is not followed by ',' or ']'.")
+            chunks.pos += 1
+            idx += 1
+    if chunks.peek() != "":
+        raise ValueError("Clip analysis payload has trailing data after the list.")
+
+
+def iter_clip_analysis(
+    source: Path | str | IO[str],
+    strict: bool = True,
+    as_model: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """Yield the items of a clip-analysis JSON array one at a time.
+
+    ``source`` is a path to an artifact in any codec (see
+    :mod:`engine_contracts.codecs`) or an open text stream. Each item passes the same
+    checks as ``validate_clip_analysis_payload`` (``strict`` selects strict or
+    compat mode) before it is yielded, as a dict or, with ``as_model``, a
+    ``ClipAnalysis``. Problems raise ``ValueError`` naming the item index;
+    items before the bad one have already been yielded.
+    """
+    if isinstance(source, (str, Path)):
+        with open_artifact(source) as handle:
+            yield from iter_clip_analysis(handle, strict, as_model, chunk_size)
+        return
+
+    for idx, item in enumerate(_iter_items(source, chunk_size)):
+        validate_clip_analysis_item(item, idx, strict)
+        yield ClipAnalysis.from_dict(item) if as_model else item
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import copy
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from .schema_compiler import SchemaError, SchemaValidationError, compile_schema
 from .version import SCHEMA_VERSION
 
 
@@ -12,48 +15,86 @@ def _assert(condition: bool, message: str) -> None:
         raise ValueError(message)
 
 
+@lru_cache(maxsize=None)
 def _load_schema(name: str) -> dict[str, Any]:
     schema_path = Path(__file__).resolve().parent / "schemas" / f"{name}.schema.json"
     return json.loads(schema_path.read_text(encoding="utf-8"))
 
 
+@lru_cache(maxsize=None)
+def _compiled(name: str) -> Callable[..., list[SchemaError]]:
+    return compile_schema(_load_schema(name))
+
+
 def clip_analysis_schema() -> dict[str, Any]:
-    return _load_schema("clip_analysis")
+    return copy.deepcopy(_load_schema("clip_analysis"))
 
 
 def music_analysis_schema() -> dict[str, Any]:
-    return _load_schema("music_analysis")
+    return copy.deepcopy(_load_schema("music_analysis"))
 
 
 def timeline_schema() -> dict[str, Any]:
-    return _load_schema("timeline")
+    return copy.deepcopy(_load_schema("timeline"))
+
+
+def schema_errors(name: str, payload: Any, max_errors: int = 10) -> list[SchemaError]:
+    """Check ``payload`` against schema ``name`` and return up to ``max_errors`` errors.
+
+    ``name`` is ``"clip_analysis"``, ``"music_analysis"`` or ``"timeline"``.
+    The schema is compiled on first use and reused for the rest of the process.
+    """
+    return _compiled(name)(payload, max_errors)
+
+
+def _raise_schema_errors(name: str, payload: Any, max_errors: int) -> None:
+    errors = schema_errors(name, payload, max_errors)
+    if errors:
+        raise SchemaValidationError(_load_schema(name).get("title", name), errors)
+
+
+def validate_clip_analysis_schema(payload: Any, max_errors: int = 10) -> None:
+    _raise_schema_errors("clip_analysis", payload, max_errors)
+
+
+def validate_music_analysis_schema(payload: Any, max_errors: int = 10) -> None:
+    _raise_schema_errors("music_analysis", payload, max_errors)
+
+
+def validate_timeline_schema(payload: Any, max_errors: int = 10) -> None:
+    _raise_schema_errors("timeline", payload, max_errors)
+
+
+def validate_clip_analysis_item(item: Any, idx: int, strict: bool = True) -> None:
+    """Check one element of a clip-analysis list; ``idx`` is used in error messages."""
+    _assert(isinstance(item, dict), f"Clip analysis item {idx} must be an object.")
+    if strict:
+        _assert(
+            item.get("schema_version") == SCHEMA_VERSION,
+            f"Clip analysis item {idx} schema_version must be {SCHEMA_VERSION}.",
+        )
+        _assert("clip_id" in item, f"Clip analysis item {idx} missing clip_id.")
+        _assert("duration" in item, f"Clip analysis item {idx} missing duration.")
+        _assert(
+            isinstance(item.get("intensity_segments"), list),
+            f"Clip analysis item {idx} intensity_segments must be a list.",
+        )
+        for seg_idx, seg in enumerate(item.get("intensity_segments", [])):
+            _assert(
+                "intensity_score" in seg,
+                f"Clip analysis item {idx} segment {seg_idx} missing intensity_score.",
+            )
+    else:
+        _assert(
+            ("clip_id" in item) or ("clip" in item),
+            f"Clip analysis item {idx} missing clip_id/clip alias.",
+        )
 
 
 def validate_clip_analysis_payload(payload: Any, strict: bool = True) -> None:
     _assert(isinstance(payload, list), "Clip analysis payload must be a list.")
     for idx, item in enumerate(payload):
-        _assert(isinstance(item, dict), f"Clip analysis item {idx} must be an object.")
-        if strict:
-            _assert(
-                item.get("schema_version") == SCHEMA_VERSION,
-                f"Clip analysis item {idx} schema_version must be {SCHEMA_VERSION}.",
-            )
-            _assert("clip_id" in item, f"Clip analysis item {idx} missing clip_id.")
-            _assert("duration" in item, f"Clip analysis item {idx} missing duration.")
-            _assert(
-                isinstance(item.get("intensity_segments"), list),
-                f"Clip analysis item {idx} intensity_segments must be a list.",
-            )
-            for seg_idx, seg in enumerate(item.get("intensity_segments", [])):
-                _assert(
-                    "intensity_score" in seg,
-                    f"Clip analysis item {idx} segment {seg_idx} missing intensity_score.",
-                )
-        else:
-            _assert(
-                ("clip_id" in item) or ("clip" in item),
-                f"Clip analysis item {idx} missing clip_id/clip alias.",
-            )
+        validate_clip_analysis_item(item, idx, strict)
 
 
 def validate_music_analysis_payload(payload: Any, strict: bool = True) -> None:
@@ -0,0 +1,273 @@
+"""Drive concurrent ``run_pipeline.py`` runs against stub services.
+
+The stubs in ``loadtest/stub_services`` stand in for the four services (see
+``stub_service.py`` for their knobs), so orchestration overhead can be
+measured without media tooling. Run from the repository root::
+
+    python loadtest/run_loadtest.py --runs 40 --concurrency 8 --clip-counts 10,100,1000
+    python loadtest/run_loadtest.py --render-latency-s 0.5 -- --executor warm
+
+Arguments after ``--`` are passed to every ``run_pipeline.py`` invocation.
+Each clip count gets its own round of ``--runs`` runs, ``--concurrency`` at a
+time. A run's orchestrator CPU is its process CPU (from ``wait4``) minus
+the service CPU recorded in its manifest; its RSS is the manifest's peak.
+Under ``--executor warm`` the services run in forkserver workers whose CPU
+may not be folded into the orchestrator's rusage, so that figure is a lower
+bound there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Mapping
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STUB_SERVICES_DIR = Path(__file__).resolve().parent / "stub_services"
+sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.batch import _percentile  # noqa: E402
+from orchestrator.telemetry import maxrss_kb  # noqa: E402
+
+
+def prepare_media(media_dir: Path, clips: int) -> tuple[list[Path], Path]:
+    """Placeholder clips and song; the stubs never decode them."""
+    media_dir.mkdir(parents=True, exist_ok=True)
+    clip_paths = [media_dir / f"clip_{idx:05d}.mp4" for idx in range(clips)]
+    for path in clip_paths:
+        if not path.exists():
+            path.write_bytes(b"\0" * 4096)
+    song = media_dir / "song.mp3"
+    song.write_bytes(b"\0" * 4096)
+    return clip_paths, song
+
+
+def stub_env(knobs: Mapping[str, Any] | None = None) -> dict[str, str]:
+    """This environment, pointed at the stub services with ``knobs`` set.
+
+    Knobs are named as in ``stub_service.py`` without the
+    ``CONTENT_ENGINE_STUB_`` prefix, e.g. ``{"SEGMENTS": 3}``; None values
+    are left unset.
+    """
+    env = dict(os.environ, CONTENT_ENGINE_SERVICES_DIR=str(STUB_SERVICES_DIR))
+    for name, value in (knobs or {}).items():
+        if value is not None:
+            env[f"CONTENT_ENGINE_STUB_{name.upper()}"] = str(value)
+    return env
+
+
+def _stub_env(args: argparse.Namespace) -> dict[str, str]:
+    knobs: dict[str, Any] = {
+        "LATENCY_S": args.latency_s,
+        "CPU_S": args.cpu_s,
+        "RENDER_LATENCY_S": args.render_latency_s,
+        "RENDER_CPU_S": args.render_cpu_s,
+        "SEGMENTS": args.segments,
+        "SONG_SECONDS": args.song_seconds,
+        "BPM": args.bpm,
+    }
+    for item in args.stub_env:
+        name, _, value = item.partition("=")
+        knobs[name] = value
+    return stub_env(knobs)
+
+
+def run_once(
+    run_dir: Path,
+    clips: list[Path],
+    song: Path,
+    env: dict[str, str],
+    pipeline_args: list[str],
+) -> dict[str, Any]:
+    """Run the pipeline once in a child process and measure it."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    command = [
+        sys.executable,
+        str(REPO_ROOT / "run_pipeline.py"),
+        "--clips",
+        *map(str, clips),
+        "--music",
+        str(song),
+        "--run-dir",
+        str(run_dir),
+        "--no-cache",
+        *pipeline_args,
+    ]
+    started = time.perf_counter()
+    with (run_dir / "loadtest.stderr.log").open("wb") as stderr:
+        process = subprocess.Popen(
+            command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        # The child's rusage covers it and every service process it reaped.
+        _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+
+    try:
+        manifest = json.loads((run_dir / "run-manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    spans = manifest.get("telemetry", {}).get("stages", {})
+    service_cpu = sum(
+        span["child_user_s"] + span["child_sys_s"]
+        for span in spans.values()
+        if span.get("category") == "stage"
+    )
+    total_cpu = usage.ru_utime + usage.ru_stime
+    return {
+        "ok": os.waitstatus_to_exitcode(status) == 0 and manifest.get("status") == "succeeded",
+        "wall_s": wall,
+        "orchestrator_cpu_s": max(0.0, total_cpu - service_cpu),
+        "service_cpu_s": service_cpu,
+        "orchestrator_rss_kb": manifest.get("telemetry", {}).get("peak_rss_kb", 0),
+        "max_rss_kb": maxrss_kb(usage),
+    }
+
+
+def run_round(
+    work_dir: Path,
+    clips: list[Path],
+    song: Path,
+    runs: int,
+    concurrency: int,
+    env: dict[str, str],
+    pipeline_args: list[str],
+) -> dict[str, Any]:
+    """``runs`` pipeline runs over ``clips``, ``concurrency`` at a time, summarized."""
+    round_dir = work_dir / f"clips-{len(clips)}"
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(
+            pool.map(
+                lambda idx: run_once(
+                    round_dir / f"run-{idx:04d}", clips, song, env, pipeline_args
+                ),
+                range(runs),
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    ok = [result for result in results if result["ok"]]
+    latencies = [result["wall_s"] for result in ok]
+    orchestrator_cpu = [result["orchestrator_cpu_s"] for result in ok]
+    rss = [result["orchestrator_rss_kb"] / 1024 for result in ok]
+
+    def mean(values: list[float]) -> float:
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        "clips": len(clips),
+        "runs": runs,
+        "failed": runs - len(ok),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "runs_per_minute": round(60.0 * len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_s": {
+            "p50": round(_percentile(latencies, 0.5), 3),
+            "p95": round(_percentile(latencies, 0.95), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+        },
+        "orchestrator_cpu_s": {
+            "mean": round(mean(orchestrator_cpu), 3),
+            "p95": round(_percentile(orchestrator_cpu, 0.95), 3),
+            "per_clip_ms": round(1000 * mean(orchestrator_cpu) / len(clips), 3),
+        },
+        "service_cpu_s": round(mean([result["service_cpu_s"] for result in ok]), 3),
+        "orchestrator_rss_mb": {
+            "mean": round(mean(rss), 1),
+            "max": round(max(rss, default=0.0), 1),
+        },
+    }
+
+
+def _print_table(rounds: list[dict[str, Any]]) -> None:
+    print(
+        f"{'clips':>6} {'ok/runs':>8} {'runs/min':>9} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+        f"{'orch cpu s':>10} {'ms/clip':>8} {'svc cpu s':>9} {'rss MB':>7}"
+    )
+    for item in rounds:
+        latency = item["latency_s"]
+        cpu = item["orchestrator_cpu_s"]
+        print(
+            f"{item['clips']:>6} {item['runs'] - item['failed']:>4}/{item['runs']:<3} "
+            f"{item['runs_per_minute']:>9.1f} {latency['p50']:>7.2f} {latency['p95']:>7.2f} "
+            f"{latency['p99']:>7.2f} {cpu['mean']:>10.3f} {cpu['per_clip_ms']:>8.2f} "
+            f"{item['service_cpu_s']:>9.3f} {item['orchestrator_rss_mb']['max']:>7.1f}"
+        )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Pipeline runs per clip count.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Runs in flight at once.")
+    parser.add_argument(
+        "--clip-counts", default="10,100", help="Comma-separated clip counts to scale over."
+    )
+    parser.add_argument("--segments", type=int, help="Intensity segments per clip (stub).")
+    parser.add_argument("--song-seconds", type=float, help="Song length (stub).")
+    parser.add_argument("--bpm", type=float, help="Song tempo (stub).")
+    parser.add_argument("--latency-s", type=float, help="Sleep per service call.")
+    parser.add_argument("--cpu-s", type=float, help="CPU burned per service call.")
+    parser.add_argument("--render-latency-s", type=float, help="Sleep per render call.")
+    parser.add_argument("--render-cpu-s", type=float, help="CPU burned per render call.")
+    parser.add_argument(
+        "--stub-env",
+        action="append",
+        default=[],
+        metavar="KNOB=VALUE",
+        help="Any other stub knob, e.g. CLIP_LATENCY_S=0.2 (repeatable).",
+    )
+    parser.add_argument("--work-dir", help="Where run directories go (default: a temp dir).")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary work dir.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    pipeline_args: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, pipeline_args = argv[:split], argv[split + 1 :]
+    args = _build_parser().parse_args(argv)
+    clip_counts = [int(count) for count in args.clip_counts.split(",") if count.strip()]
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="content-engine-loadtest-"))
+    env = _stub_env(args)
+    clip_paths, song = prepare_media(work_dir / "media", max(clip_counts))
+    rounds = []
+    try:
+        for count in clip_counts:
+            rounds.append(
+                run_round(
+                    work_dir,
+                    clip_paths[:count],
+                    song,
+                    args.runs,
+                    max(1, args.concurrency),
+                    env,
+                    pipeline_args,
+                )
+            )
+    finally:
+        failed = len(rounds) < len(clip_counts) or any(item["failed"] for item in rounds)
+        if args.work_dir or args.keep or failed:
+            print(f"Run directories are in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    _print_table(rounds)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"rounds": rounds}, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
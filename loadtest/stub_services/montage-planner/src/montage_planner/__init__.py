@@ -0,0 +1,48 @@
+"""Stub planner: cuts the song every bar, cycling through clips and segments."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from stub_service import simulate  # noqa: E402
+
+
+class MontagePlanner:
+    def __init__(self, compat_mode: bool = False) -> None:
+        self.compat_mode = compat_mode
+
+    def build_timeline(self, clips: list[Any], music_data: dict[str, Any]) -> dict[str, Any]:
+        simulate("PLAN")
+        beats = music_data["beats"][::4]
+        segments = [
+            (clip["clip_id"], segment, clip["duration"])
+            for clip in clips
+            for segment in clip["intensity_segments"]
+        ]
+        timeline = []
+        song_cursor = 0.0
+        for idx, (bar_start, bar_end) in enumerate(zip(beats, beats[1:])):
+            if not segments:
+                break
+            clip_id, segment, duration = segments[idx % len(segments)]
+            clip_end = min(segment["start"] + (bar_end - bar_start), duration)
+            length = round(clip_end - segment["start"], 4)
+            timeline.append(
+                {
+                    "clip_id": clip_id,
+                    "clip_start": segment["start"],
+                    "clip_end": round(clip_end, 4),
+                    "song_start": round(song_cursor, 4),
+                    "song_end": round(song_cursor + length, 4),
+                }
+            )
+            song_cursor += length
+        return {
+            "schema_version": music_data["schema_version"],
+            "timeline": timeline,
+            "total_duration": round(song_cursor, 4),
+        }
@@ -0,0 +1,28 @@
+"""Stub music analyzer: ``main.py --song PATH`` prints the analysis JSON."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from stub_service import knob, simulate  # noqa: E402
+from generators import make_music_analysis  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--song", required=True)
+    args = parser.parse_args()
+
+    simulate("MUSIC")
+    payload = make_music_analysis(knob("SONG_SECONDS", 180.0), knob("BPM", 128.0))
+    payload["song"] = Path(args.song).name
+    json.dump(payload, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Stub renderer: checks that every timeline clip exists and writes a placeholder."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from stub_service import knob, simulate  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timeline", required=True)
+    parser.add_argument("--music", required=True)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    timeline_path = Path(args.timeline)
+    timeline = json.loads(timeline_path.read_text(encoding="utf-8"))
+    for entry in timeline["timeline"]:
+        clip = timeline_path.parent / entry["clip_id"]
+        if not clip.exists():
+            raise SystemExit(f"Timeline clip not found: {clip}")
+    simulate("RENDER")
+    Path(args.output).write_bytes(b"\0" * int(knob("OUTPUT_KB", 64) * 1024))
+
+
+if __name__ == "__main__":
+    main()
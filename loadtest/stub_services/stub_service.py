@@ -0,0 +1,47 @@
+"""Knobs shared by the stub services.
+
+Every stub reads its behaviour from the environment, which the
+orchestrator passes through to service processes unchanged:
+
+- ``CONTENT_ENGINE_STUB_LATENCY_S``: seconds to sleep per call.
+- ``CONTENT_ENGINE_STUB_CPU_S``: seconds of CPU to burn per call.
+- ``CONTENT_ENGINE_STUB_SEGMENTS``: intensity segments per analyzed clip.
+- ``CONTENT_ENGINE_STUB_SONG_SECONDS`` / ``CONTENT_ENGINE_STUB_BPM``: length
+  and tempo of the analyzed song, which sets the number of beats.
+- ``CONTENT_ENGINE_STUB_OUTPUT_KB``: size of the rendered file.
+
+Latency and CPU can be set per service by inserting ``CLIP``, ``MUSIC``,
+``PLAN`` or ``RENDER``, e.g. ``CONTENT_ENGINE_STUB_RENDER_LATENCY_S``.
+Payloads come from the engine-contracts benchmark generators, so they are
+schema-valid at any size.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "engine-contracts" / "benchmarks"))
+
+PREFIX = "CONTENT_ENGINE_STUB_"
+
+
+def knob(name: str, default: float, service: str | None = None) -> float:
+    """``PREFIX<SERVICE>_<name>``, else ``PREFIX<name>``, else ``default``."""
+    for key in ([f"{PREFIX}{service}_{name}"] if service else []) + [f"{PREFIX}{name}"]:
+        if os.environ.get(key):
+            return float(os.environ[key])
+    return default
+
+
+def simulate(service: str) -> None:
+    """Sleep and burn CPU as configured for ``service``."""
+    time.sleep(knob("LATENCY_S", 0.0, service))
+    budget = knob("CPU_S", 0.0, service)
+    started = time.process_time()
+    spin = 0
+    while time.process_time() - started < budget:
+        spin = (spin * 31 + 7) % 1_000_003
@@ -0,0 +1,30 @@
+"""Stub clip analyzer: ``cli.py CLIP... --output PATH``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from stub_service import knob, simulate  # noqa: E402
+from generators import make_clip_analysis  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    simulate("CLIP")
+    items = make_clip_analysis(len(args.clips), int(knob("SEGMENTS", 20)))
+    for item, clip in zip(items, args.clips):
+        item["clip_id"] = Path(clip).name
+    Path(args.output).write_text(json.dumps(items), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cache import ArtifactCache
+    from .graph import Stage, StageGraph
+    from .pipeline import PipelineContext, PipelineJob, run_job
+    from .scheduler import ResourcePool
+    from .workers import EntryPoint, EntryResult, SubprocessBackend, WarmWorkerBackend
+
+# Every service call in a subprocess starts with ``python -m
+# orchestrator.entry``, which imports this package first; the exports are
+# resolved on first use so that import stays as cheap as entry.py's own.
+_EXPORTS = {
+    "ArtifactCache": "cache",
+    "Stage": "graph",
+    "StageGraph": "graph",
+    "PipelineContext": "pipeline",
+    "PipelineJob": "pipeline",
+    "run_job": "pipeline",
+    "ResourcePool": "scheduler",
+    "EntryPoint": "workers",
+    "EntryResult": "workers",
+    "SubprocessBackend": "workers",
+    "WarmWorkerBackend": "workers",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .pipeline import PipelineContext, PipelineJob, run_job
+
+
+def job_from_record(
+    record: Any, base_dir: Path, planner_compat_mode: bool = False, where: str = "job"
+) -> PipelineJob:
+    """Build a job from a JSON object with ``clips``, ``music``, ``run_dir`` and
+    optional ``output`` / ``planner_compat_mode``. Relative paths resolve
+    against ``base_dir``; ``where`` prefixes error messages.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"{where} must be a JSON object.")
+    missing = [field for field in ("clips", "music", "run_dir") if field not in record]
+    if missing:
+        raise ValueError(f"{where} missing field(s): {', '.join(missing)}")
+    if not isinstance(record["clips"], list) or not record["clips"]:
+        raise ValueError(f"{where} clips must be a non-empty list.")
+    return PipelineJob.create(
+        clips=record["clips"],
+        music=record["music"],
+        run_dir=record["run_dir"],
+        output=record.get("output", "final.mp4"),
+        planner_compat_mode=record.get("planner_compat_mode", planner_compat_mode),
+        base_dir=base_dir,
+    )
+
+
+def load_jobs(jobs_path: Path, planner_compat_mode: bool = False) -> list[PipelineJob]:
+    """Read one job per JSON line (see :func:`job_from_record`). Relative paths
+    resolve against the jobs file's directory. Jobs run concurrently, so two
+    jobs may not resolve to the same ``run_dir``.
+    """
+    base_dir = jobs_path.resolve().parent
+    jobs: list[PipelineJob] = []
+    run_dirs: dict[Path, int] = {}
+    for line_no, line in enumerate(jobs_path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"{jobs_path}:{line_no} is not valid JSON: {exc}") from exc
+        job = job_from_record(record, base_dir, planner_compat_mode, f"{jobs_path}:{line_no}")
+        if job.run_dir in run_dirs:
+            raise ValueError(
+                f"{jobs_path}:{line_no} run_dir {job.run_dir} is already used by the job on"
+                f" line {run_dirs[job.run_dir]}; concurrent jobs would overwrite each other."
+            )
+        run_dirs[job.run_dir] = line_no
+        jobs.append(job)
+    return jobs
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_batch(
+    jobs: list[PipelineJob], context: PipelineContext, max_parallel_jobs: int
+) -> dict[str, Any]:
+    """Run ``jobs`` with at most ``max_parallel_jobs`` in flight and summarize them.
+
+    A failing job is recorded in the summary and does not stop the others.
+    ``queue_wait_s`` is the time from batch start until the job was picked
+    up; ``resource_wait_s`` is the time its stages then spent waiting on the
+    context's resource pool.
+    """
+    started_at = datetime.now(timezone.utc).isoformat()
+    batch_start = time.perf_counter()
+    lock = threading.Lock()
+    results: list[dict[str, Any]] = [{} for _ in jobs]
+
+    def execute(idx: int, job: PipelineJob) -> None:
+        picked_up = time.perf_counter()
+        record: dict[str, Any] = {
+            "run_dir": str(job.run_dir),
+            "music": str(job.music),
+            "clip_count": len(job.clips),
+            "queue_wait_s": round(picked_up - batch_start, 6),
+        }
+        try:
+            manifest = run_job(job, context)
+        except Exception as exc:
+            record.update(status="failed", error=str(exc))
+        else:
+            record.update(
+                status="succeeded",
+                manifest=str(job.run_dir / "run-manifest.json"),
+                resource_wait_s=round(
+                    sum(manifest["execution"]["resource_wait_s"].values()), 6
+                ),
+            )
+        record["wall_s"] = round(time.perf_counter() - picked_up, 6)
+        with lock:
+            results[idx] = record
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_parallel_jobs), thread_name_prefix="job"
+    ) as pool:
+        for future in [pool.submit(execute, idx, job) for idx, job in enumerate(jobs)]:
+            future.result()
+
+    wall = time.perf_counter() - batch_start
+    succeeded = [record for record in results if record["status"] == "succeeded"]
+    queue_waits = [record["queue_wait_s"] for record in results]
+    return {
+        "batch_started_at": started_at,
+        "job_count": len(jobs),
+        "succeeded": len(succeeded),
+        "failed": len(jobs) - len(succeeded),
+        "unique_songs": len({str(job.music) for job in jobs}),
+        "wall_s": round(wall, 6),
+        "throughput_jobs_per_min": round(len(succeeded) / wall * 60.0, 3) if wall > 0 else 0.0,
+        "queue_wait_s": {
+            "mean": round(sum(queue_waits) / len(queue_waits), 6) if queue_waits else 0.0,
+            "p50": round(_percentile(queue_waits, 0.5), 6),
+            "p95": round(_percentile(queue_waits, 0.95), 6),
+            "max": round(max(queue_waits, default=0.0), 6),
+        },
+        "resources": (
+            {
+                "cpu_slots": context.resources.cpu_slots,
+                "memory_mb": context.resources.memory_mb,
+                **context.resources.wait_stats(),
+            }
+            if context.resources
+            else None
+        ),
+        "cache": context.cache.stats() if context.cache else None,
+        "jobs": results,
+    }
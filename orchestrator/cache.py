@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "content-engine"
+
+
+def service_identity(matrix_path: Path, service: str) -> dict[str, Any]:
+    """Describe an analyzer by the compatibility-matrix entry it runs under."""
+    matrix = json.loads(matrix_path.read_text(encoding="utf-8"))
+    return {
+        "service": service,
+        "matrix_schema_version": matrix.get("schema_version"),
+        "capabilities": matrix.get("services", {}).get(service, {}),
+    }
+
+
+class ArtifactCache:
+    """Content-addressed JSON store with least-recently-used eviction.
+
+    Entries live at ``<root>/<namespace>/<key[:2]>/<key>.json``. A hit touches
+    the entry's mtime, and :meth:`prune` removes the oldest entries until the
+    store fits in ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}.json"
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        path = self._entry_path(namespace, key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count(namespace, "misses")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(namespace, "hits")
+        return payload
+
+    def put(self, namespace: str, key: str, payload: Any) -> None:
+        path = self._entry_path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, separators=(",", ":"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits; return bytes freed."""
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for path in self.root.glob("*/*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            freed += size
+        return freed
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {namespace: dict(counts) for namespace, counts in self._stats.items()}
@@ -0,0 +1,71 @@
+"""Launch a service entry point with its arguments read from a JSON file.
+
+Used as ``python -m orchestrator.entry --module val_content_engine.cli
+--args-file args.json`` so that argument lists of any length (thousands of
+clip paths) never hit the operating system's argv size limit. When
+``CONTENT_ENGINE_PROFILE`` is set, the entry point runs under cProfile and
+its stats are written to that path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import runpy
+import sys
+import time
+from pathlib import Path
+
+from .profiling import PROFILE_ENV, profile_to
+
+
+def run_entry(module: str | None, script: str | None, entry_args: list[str]) -> None:
+    """Execute ``module`` or ``script`` as ``__main__`` with ``entry_args`` as argv."""
+    if module:
+        sys.argv = [module, *map(str, entry_args)]
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+        return
+    if not script:
+        raise ValueError("Either module or script is required.")
+    script_path = str(Path(script).resolve())
+    sys.argv = [script_path, *map(str, entry_args)]
+    sys.path.insert(0, str(Path(script_path).parent))
+    runpy.run_path(script_path, run_name="__main__")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run a service entry point.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--module", help="Module to run as __main__.")
+    target.add_argument("--script", help="Script path to run as __main__.")
+    parser.add_argument(
+        "--args-file", required=True, help="JSON list of arguments for the entry point."
+    )
+    parser.add_argument(
+        "--timing-file",
+        help="Write wall-clock start/finish times of the entry point here as JSON.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    entry_args = json.loads(Path(args.args_file).read_text(encoding="utf-8"))
+    if not isinstance(entry_args, list):
+        raise SystemExit(f"{args.args_file} must contain a JSON list of arguments.")
+
+    started = time.time()
+    try:
+        with profile_to(os.environ.get(PROFILE_ENV) or None):
+            run_entry(args.module, args.script, entry_args)
+    finally:
+        if args.timing_file:
+            Path(args.timing_file).write_text(
+                json.dumps({"started": started, "finished": time.time()}), encoding="utf-8"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+"""Identify input media without hashing every byte.
+
+Three strengths, cheapest first:
+
+- :func:`stat_key` / :func:`quick_id`: device, inode, size and mtime. Free,
+  and enough to notice that a file was replaced or edited, but not to
+  recognize the same content at another path.
+- sampled: a hash of the size and ``SAMPLE_BLOCKS`` blocks spread evenly
+  over the file, read through mmap. A few MiB of reads however large the
+  file, and the content identity used by the analysis cache.
+- full: SHA-256 of the whole file, only when asked for.
+
+:class:`Fingerprinter` memoizes both hashes in a :class:`FingerprintIndex`
+keyed by the stat key, so an unchanged file is only ever read once, and
+fingerprints lists of files on a thread pool.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+
+SAMPLE_BLOCKS = 16
+BLOCK_BYTES = 256 * 1024
+# Bumped whenever the sampled scheme changes, so old memo entries and cache
+# keys are not mistaken for new ones.
+SAMPLED_VERSION = "sampled-v1"
+
+
+class StatKey(NamedTuple):
+    device: int
+    inode: int
+    size: int
+    mtime_ns: int
+
+    def __str__(self) -> str:
+        return f"{self.device}:{self.inode}:{self.size}:{self.mtime_ns}"
+
+
+def stat_key(path: Path) -> StatKey:
+    stat = os.stat(path)
+    return StatKey(stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def quick_id(path: Path) -> str:
+    """Hex digest of ``path``'s :class:`StatKey`."""
+    return hashlib.sha256(str(stat_key(path)).encode("utf-8")).hexdigest()
+
+
+def _mapped(handle: Any, size: int) -> Any:
+    if size == 0:
+        return b""
+    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def sampled_digest(
+    path: Path, blocks: int = SAMPLE_BLOCKS, block_bytes: int = BLOCK_BYTES
+) -> str:
+    """Hash of the file size and ``blocks`` evenly spaced blocks.
+
+    Files no larger than ``blocks * block_bytes`` are hashed whole. The first
+    and last blocks are always included, which covers container headers and
+    trailers (an mp4's moov atom is at one end or the other).
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        digest.update(size.to_bytes(8, "little"))
+        data = _mapped(handle, size)
+        try:
+            if size <= blocks * block_bytes or blocks < 2:
+                digest.update(data)
+            else:
+                step = (size - block_bytes) / (blocks - 1)
+                for idx in range(blocks):
+                    offset = round(idx * step)
+                    digest.update(data[offset : offset + block_bytes])
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    return f"{SAMPLED_VERSION}:{digest.hexdigest()}"
+
+
+def full_digest(path: Path) -> str:
+    """SHA-256 of the whole file."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        data = _mapped(handle, os.fstat(handle.fileno()).st_size)
+        try:
+            digest.update(data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    return f"sha256:{digest.hexdigest()}"
+
+
+class FingerprintIndex:
+    """Small persistent memo from :class:`StatKey` to computed digests.
+
+    Stored as one JSON object at ``path`` and written back by :meth:`save`
+    when it changed. Saving merges with what is on disk, so concurrent
+    orchestrators lose at most each other's latest additions. Beyond
+    ``max_entries`` the oldest entries are dropped.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 50_000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str]] | None = None
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _loaded(self) -> dict[str, dict[str, str]]:
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def get(self, key: StatKey, kind: str) -> str | None:
+        with self._lock:
+            return self._loaded().get(str(key), {}).get(kind)
+
+    def put(self, key: StatKey, kind: str, digest: str) -> None:
+        with self._lock:
+            entries = self._loaded()
+            entry = entries.pop(str(key), {})
+            entry[kind] = digest
+            # Re-inserting keeps the dict ordered oldest to newest.
+            entries[str(key)] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            entries = {**self._load(), **self._entries}
+            for stale in list(entries)[: max(0, len(entries) - self.max_entries)]:
+                del entries[stale]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(entries, handle, separators=(",", ":"))
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            self._entries = entries
+            self._dirty = False
+
+
+class Fingerprinter:
+    """Content fingerprints of input files, memoized by stat key.
+
+    ``full`` selects whole-file SHA-256 over the sampled hash. Without an
+    ``index`` results are only memoized for the lifetime of this object.
+    """
+
+    def __init__(
+        self, index: FingerprintIndex | None = None, full: bool = False, workers: int = 8
+    ) -> None:
+        self.index = index
+        self.full = full
+        self.workers = max(1, workers)
+        self._memo: dict[tuple[StatKey, str], str] = {}
+        self._lock = threading.Lock()
+        self._counts = {"memo_hits": 0, "hashed": 0, "hashed_bytes": 0}
+
+    @property
+    def kind(self) -> str:
+        return "full" if self.full else "sampled"
+
+    def digest(self, path: Path) -> str:
+        key = stat_key(path)
+        kind = self.kind
+        with self._lock:
+            found = self._memo.get((key, kind))
+        if found is None and self.index is not None:
+            found = self.index.get(key, kind)
+        if found is not None:
+            with self._lock:
+                self._memo[(key, kind)] = found
+                self._counts["memo_hits"] += 1
+            return found
+
+        found = full_digest(path) if self.full else sampled_digest(path)
+        with self._lock:
+            self._memo[(key, kind)] = found
+            self._counts["hashed"] += 1
+            self._counts["hashed_bytes"] += (
+                key.size if self.full else min(key.size, SAMPLE_BLOCKS * BLOCK_BYTES)
+            )
+        if self.index is not None:
+            self.index.put(key, kind, found)
+        return found
+
+    def digests(self, paths: Iterable[Path]) -> list[str]:
+        """:meth:`digest` of each path, hashing distinct files in parallel."""
+        paths = list(paths)
+        unique = list(dict.fromkeys(paths))
+        if len(unique) <= 1:
+            results = [self.digest(path) for path in unique]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(unique)), thread_name_prefix="fingerprint"
+            ) as pool:
+                results = list(pool.map(self.digest, unique))
+        by_path = dict(zip(unique, results))
+        return [by_path[path] for path in paths]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def save(self) -> None:
+        if self.index is not None:
+            self.index.save()
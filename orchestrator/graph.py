@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+
+StageFn = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline node that consumes named artifacts and produces new ones.
+
+    ``run`` receives a mapping holding exactly the declared ``inputs`` and must
+    return a mapping holding every declared ``output``.
+    """
+
+    name: str
+    run: StageFn
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+class StageGraph:
+    """Runs stages as soon as every artifact they depend on is available."""
+
+    def __init__(self, stages: Iterable[Stage] = ()) -> None:
+        self._stages: dict[str, Stage] = {}
+        self._producers: dict[str, str] = {}
+        for stage in stages:
+            self.add(stage)
+
+    @property
+    def stages(self) -> tuple[Stage, ...]:
+        return tuple(self._stages.values())
+
+    def add(self, stage: Stage) -> None:
+        if stage.name in self._stages:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        for output in stage.outputs:
+            producer = self._producers.get(output)
+            if producer is not None:
+                raise ValueError(
+                    f"Artifact {output} is produced by both {producer} and {stage.name}."
+                )
+        self._stages[stage.name] = stage
+        for output in stage.outputs:
+            self._producers[output] = stage.name
+
+    def _check_inputs(self, available: set[str]) -> None:
+        for stage in self._stages.values():
+            missing = [
+                name
+                for name in stage.inputs
+                if name not in available and name not in self._producers
+            ]
+            if missing:
+                raise ValueError(
+                    f"Stage {stage.name} needs artifacts nobody produces: {', '.join(missing)}"
+                )
+
+    def run(
+        self, artifacts: dict[str, Any] | None = None, max_workers: int | None = None
+    ) -> dict[str, Any]:
+        """Execute the graph and return every artifact, including ``artifacts``.
+
+        The first stage failure stops new stages from being scheduled; stages
+        already running are allowed to finish and the original error is
+        re-raised.
+        """
+        results: dict[str, Any] = dict(artifacts or {})
+        self._check_inputs(set(results))
+
+        pending = dict(self._stages)
+        running: dict[Future[dict[str, Any]], Stage] = {}
+        error: BaseException | None = None
+        workers = max_workers or max(1, len(self._stages))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                if error is None:
+                    ready = [
+                        stage
+                        for stage in pending.values()
+                        if all(name in results for name in stage.inputs)
+                    ]
+                    for stage in ready:
+                        del pending[stage.name]
+                        stage_inputs = {name: results[name] for name in stage.inputs}
+                        running[pool.submit(stage.run, stage_inputs)] = stage
+
+                if not running:
+                    if error is None and pending:
+                        names = ", ".join(sorted(pending))
+                        raise ValueError(f"Stage graph has a dependency cycle among: {names}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        if error is None:
+                            error = exc
+                        continue
+                    produced = future.result() or {}
+                    missing = [name for name in stage.outputs if name not in produced]
+                    if missing and error is None:
+                        error = RuntimeError(
+                            f"Stage {stage.name} did not produce: {', '.join(missing)}"
+                        )
+                        continue
+                    for name in stage.outputs:
+                        results[name] = produced[name]
+
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,1180 @@
+from __future__ import annotations
+
+import json
+import os
+import resource
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator, Mapping
+
+from .cache import ArtifactCache, service_identity
+from .fingerprint import FingerprintIndex, Fingerprinter
+from .graph import Stage, StageGraph
+from .profiling import RunProfiler
+from .proxies import make_proxies, proxy_command, proxy_timeline
+from .resume import ResumeState, file_identity, fingerprint, read_manifest, service_revision
+from .scheduler import ResourcePool
+from .segments import SEGMENT_SECONDS, SegmentStore, entry_keys, segment_key
+from .staging import stage_clips
+from .telemetry import Span, Telemetry, TraceRecorder, file_bytes, maxrss_kb
+from .workers import EntryPoint, EntryResult, SubprocessBackend, WarmWorkerBackend, run_command
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# CONTENT_ENGINE_SERVICES_DIR points the orchestrator at another checkout of
+# the four services, such as the stubs in loadtest/stub_services.
+SERVICES_DIR = Path(
+    os.environ.get("CONTENT_ENGINE_SERVICES_DIR") or REPO_ROOT / "services"
+).absolute()
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+COMPATIBILITY_MATRIX = REPO_ROOT / "compatibility-matrix.json"
+CLIP_ANALYZER_DIR = SERVICES_DIR / "val-content-engine"
+MUSIC_ANALYZER_DIR = SERVICES_DIR / "music-analyzer"
+PLANNER_SRC = SERVICES_DIR / "montage-planner" / "src"
+RENDER_ENGINE_DIR = SERVICES_DIR / "render-engine"
+WARM_PRELOAD = ["engine_contracts", "val_content_engine", "render_engine"]
+# Where warm workers find WARM_PRELOAD, in the same order.
+WARM_SEARCH_PATH = [ENGINE_CONTRACTS_SRC, CLIP_ANALYZER_DIR / "src", RENDER_ENGINE_DIR]
+FFMPEG = "ffmpeg"
+
+# Rough peak memory of one stage invocation, used to pack stages into the
+# batch scheduler's memory budget.
+STAGE_MEMORY_MB = {
+    "clip_analysis": 1024,
+    "music_analysis": 768,
+    "plan": 256,
+    "render": 2048,
+    "preview": 1024,
+}
+
+# Stages whose re-execution forces a stage to run again on --resume.
+STAGE_UPSTREAM = {
+    "plan": ("clip_analysis", "music_analysis"),
+    "render": ("plan",),
+    "preview": ("plan",),
+}
+
+
+def ensure_paths() -> None:
+    if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+        sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+    if str(PLANNER_SRC) not in sys.path:
+        sys.path.insert(0, str(PLANNER_SRC))
+
+
+def write_json(path: Path, payload: Any, indent: int | None = 2) -> None:
+    """Atomically write ``payload`` as plain JSON (indented unless ``indent`` is None)."""
+    ensure_paths()
+    from engine_contracts.codecs import write_artifact
+
+    write_artifact(path, payload, "json", indent)
+
+
+@dataclass(frozen=True)
+class PipelineJob:
+    """Inputs and output locations of one montage run."""
+
+    clips: tuple[Path, ...]
+    music: Path
+    run_dir: Path
+    output: Path
+    planner_compat_mode: bool = False
+
+    @classmethod
+    def create(
+        cls,
+        clips: list[str],
+        music: str,
+        run_dir: str,
+        output: str = "final.mp4",
+        planner_compat_mode: bool = False,
+        base_dir: Path | None = None,
+    ) -> "PipelineJob":
+        """Resolve user-supplied paths; relative paths are taken from ``base_dir``."""
+
+        def resolve(value: str) -> Path:
+            path = Path(value).expanduser()
+            if base_dir is not None and not path.is_absolute():
+                path = base_dir / path
+            return path.resolve()
+
+        resolved_run_dir = resolve(run_dir)
+        final_output = Path(output)
+        if not final_output.is_absolute():
+            final_output = resolved_run_dir / final_output
+        return cls(
+            clips=tuple(resolve(clip) for clip in clips),
+            music=resolve(music),
+            run_dir=resolved_run_dir,
+            output=final_output,
+            planner_compat_mode=bool(planner_compat_mode),
+        )
+
+
+def _match_clip_items(clip_paths: list[Path], items: list[Any]) -> list[Any]:
+    """Pair analyzer output items with the clip paths they were produced from.
+
+    Items are matched by file name first. A clip with no item of its name
+    takes the item at its own position if no other clip claimed it, else
+    the first unclaimed item, so every item is used exactly once.
+    """
+    if len(items) != len(clip_paths):
+        raise RuntimeError(
+            f"Clip analyzer returned {len(items)} items for {len(clip_paths)} clips."
+        )
+    by_name: dict[str, list[int]] = {}
+    for idx, item in enumerate(items):
+        clip_id = item.get("clip_id", item.get("clip")) if isinstance(item, dict) else None
+        by_name.setdefault(Path(str(clip_id)).name, []).append(idx)
+
+    by_clip: list[int | None] = []
+    for clip_path in clip_paths:
+        candidates = by_name.get(clip_path.name)
+        by_clip.append(candidates.pop(0) if candidates else None)
+    claimed = set(by_clip)
+    # Insertion-ordered set of the items no clip has claimed by name.
+    unclaimed = dict.fromkeys(idx for idx in range(len(items)) if idx not in claimed)
+    matched: list[Any] = []
+    for idx, choice in enumerate(by_clip):
+        if choice is None:
+            choice = idx if idx in unclaimed else next(iter(unclaimed))
+            del unclaimed[choice]
+        matched.append(items[choice])
+    return matched
+
+
+def _shard(items: list[Path], shards: int) -> list[list[Path]]:
+    """Split ``items`` into at most ``shards`` contiguous, evenly sized batches."""
+    shards = max(1, min(shards, len(items)))
+    size, extra = divmod(len(items), shards)
+    batches: list[list[Path]] = []
+    start = 0
+    for idx in range(shards):
+        end = start + size + (1 if idx < extra else 0)
+        batches.append(items[start:end])
+        start = end
+    return batches
+
+
+def _clip_analysis_entry(clip_paths: list[Path], output_path: Path) -> EntryPoint:
+    return EntryPoint(
+        cwd=CLIP_ANALYZER_DIR,
+        module="val_content_engine.cli",
+        args=(*(str(path) for path in clip_paths), "--output", str(output_path)),
+        pythonpath=(CLIP_ANALYZER_DIR / "src", ENGINE_CONTRACTS_SRC),
+    )
+
+
+def _music_analysis_entry(music_path: Path) -> EntryPoint:
+    return EntryPoint(cwd=MUSIC_ANALYZER_DIR, script="main.py", args=("--song", str(music_path)))
+
+
+def _render_entry(timeline_path: Path, music_path: Path, output_path: Path) -> EntryPoint:
+    return EntryPoint(
+        cwd=RENDER_ENGINE_DIR,
+        module="render_engine.cli",
+        args=(
+            "--timeline",
+            str(timeline_path),
+            "--music",
+            str(music_path),
+            "--output",
+            str(output_path),
+        ),
+        pythonpath=(ENGINE_CONTRACTS_SRC,),
+    )
+
+
+def _chunk_timeline_payload(plan: Any, run_dir: Path) -> dict[str, Any]:
+    """``plan`` as a timeline payload that can be written outside ``run_dir``.
+
+    Clip ids relative to the run directory (staged clips) are made absolute.
+    """
+    payload = plan.to_dict()
+    for entry in payload["timeline"]:
+        if not os.path.isabs(entry["clip_id"]):
+            entry["clip_id"] = os.path.abspath(run_dir / entry["clip_id"])
+    return payload
+
+
+def _cut_music_command(
+    music_path: Path, offset: float, duration: float, output_path: Path
+) -> list[str]:
+    # Decoded to PCM so the slice starts on the exact sample, not the nearest
+    # compressed frame.
+    return [
+        FFMPEG,
+        "-y",
+        "-v",
+        "error",
+        "-ss",
+        f"{offset:.6f}",
+        "-t",
+        f"{duration:.6f}",
+        "-i",
+        str(music_path),
+        "-vn",
+        "-c:a",
+        "pcm_s16le",
+        str(output_path),
+    ]
+
+
+def _concat_command(list_path: Path, output_path: Path) -> list[str]:
+    """Join the files in ``list_path`` without re-encoding."""
+    return [
+        FFMPEG,
+        "-y",
+        "-v",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_path),
+        "-c",
+        "copy",
+        str(output_path),
+    ]
+
+
+def _concat_list(paths: list[Path]) -> str:
+    """An ffmpeg concat-demuxer list of ``paths``."""
+    lines = []
+    for path in paths:
+        quoted = str(path.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{quoted}'\n")
+    return "".join(lines)
+
+
+def _analyze_clip_shards(
+    clip_paths: list[Path],
+    workers: int,
+    shard_dir: Path,
+    run: Callable[[EntryPoint, str], EntryResult],
+) -> list[Any]:
+    """Run the clip analyzer over ``clip_paths`` in parallel shards.
+
+    Each shard's clip list is handed to the analyzer through ``run`` (called
+    with the entry point and a per-shard log name) rather than on one shared
+    command line. Each shard's output is streamed and validated item by item
+    (compat mode). Results are returned in the order of ``clip_paths``.
+    """
+    from engine_contracts.streaming import iter_clip_analysis
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    def run_shard(idx: int, batch: list[Path]) -> list[Any]:
+        output_path = shard_dir / f"clip-analysis-{idx}.json"
+        run(_clip_analysis_entry(batch, output_path), f"clip_analysis-{idx}")
+        try:
+            items = list(iter_clip_analysis(output_path, strict=False))
+        except ValueError as exc:
+            raise RuntimeError(f"Clip analyzer shard {idx} output is invalid: {exc}") from exc
+        output_path.unlink()
+        return _match_clip_items(batch, items)
+
+    batches = _shard(clip_paths, workers)
+    with ThreadPoolExecutor(max_workers=len(batches), thread_name_prefix="clip-shard") as pool:
+        futures = [pool.submit(run_shard, idx, batch) for idx, batch in enumerate(batches)]
+        merged: list[Any] = []
+        for future in futures:
+            merged.extend(future.result())
+    try:
+        shard_dir.rmdir()
+    except OSError:
+        pass
+    return merged
+
+
+def _planner_clip_items(items: list[Any], clip_ids: list[str]) -> list[Any]:
+    """Copies of the clip-analysis ``items`` renamed to their staged clip ids.
+
+    Staged names are unique per distinct file, so the planner can tell apart
+    clips that share a basename and its timeline refers to staged files.
+    """
+    renamed = []
+    for item, clip_id in zip(items, clip_ids):
+        item = dict(item)
+        if "clip_id" in item or "clip" not in item:
+            item["clip_id"] = clip_id
+        if "clip" in item:
+            item["clip"] = clip_id
+        renamed.append(item)
+    return renamed
+
+
+def _service_version(service: str, directory: Path) -> dict[str, Any]:
+    return {
+        "identity": service_identity(COMPATIBILITY_MATRIX, service),
+        "revision": service_revision(directory),
+    }
+
+
+def _stage_fingerprints(job: PipelineJob, context: PipelineContext) -> dict[str, str]:
+    """Fingerprint each stage by its input files, argv, service versions and schema.
+
+    A stage's fingerprint includes those of the stages it consumes, so a
+    change anywhere upstream invalidates everything downstream. The render
+    fingerprint also covers how the context renders: whole, in
+    ``render_chunks`` chunks, or incrementally in ``segment_seconds``
+    segments.
+    """
+    from engine_contracts import SCHEMA_VERSION
+
+    clips = list(job.clips)
+    clip_analysis = fingerprint(
+        "clip_analysis",
+        [file_identity(path) for path in clips],
+        _clip_analysis_entry(clips, Path("clip-analysis.json")).describe(),
+        _service_version("val-content-engine", CLIP_ANALYZER_DIR),
+        SCHEMA_VERSION,
+    )
+    music_analysis = fingerprint(
+        "music_analysis",
+        file_identity(job.music),
+        _music_analysis_entry(job.music).describe(),
+        _service_version("music-analyzer", MUSIC_ANALYZER_DIR),
+        SCHEMA_VERSION,
+        context.music_sidecar,
+    )
+    plan = fingerprint(
+        "plan",
+        clip_analysis,
+        music_analysis,
+        job.planner_compat_mode,
+        [str(path) for path in clips],
+        _service_version("montage-planner", PLANNER_SRC.parent),
+        SCHEMA_VERSION,
+    )
+    render = fingerprint(
+        "render",
+        plan,
+        file_identity(job.music),
+        _render_entry(Path("timeline.json"), job.music, job.output).describe(),
+        _service_version("render-engine", RENDER_ENGINE_DIR),
+        # render_chunks only bounds parallelism for incremental renders.
+        ["incremental", context.segment_seconds]
+        if context.incremental_render
+        else ["chunks", context.render_chunks],
+    )
+    preview = fingerprint(
+        "preview",
+        plan,
+        file_identity(job.music),
+        proxy_command(FFMPEG, Path("clip"), Path("proxy")),
+        _render_entry(Path("timeline.preview.json"), job.music, Path("preview.mp4")).describe(),
+        _service_version("render-engine", RENDER_ENGINE_DIR),
+    )
+    return {
+        "clip_analysis": clip_analysis,
+        "music_analysis": music_analysis,
+        "plan": plan,
+        "render": render,
+        "preview": preview,
+    }
+
+
+class PipelineContext:
+    """State shared by every job an orchestrator process runs.
+
+    Holds the execution backend, the analysis cache, one ``MontagePlanner``
+    per compat mode, and a per-song memo so that jobs sharing a song analyze
+    it once. When ``resources`` is set, every stage first acquires its CPU and
+    memory share from it. When ``trace`` is set, each job's telemetry is added
+    to it. With ``resume``, stages whose fingerprint matches the run directory's
+    previous manifest and whose artifacts still exist are not re-executed.
+    ``artifact_codec`` selects how the clip- and music-analysis artifacts are
+    encoded (see ``engine_contracts.codecs``). ``render_chunks`` above one
+    renders that many song-time chunks of the timeline in parallel and joins
+    them with ffmpeg. ``stage_limits`` caps how many calls of a stage run at
+    once across all jobs, e.g. ``{"render": 2}``. With ``profile``, each job
+    writes cProfile stats for its in-process steps and service calls to
+    ``profiles/`` in its run directory (see ``orchestrator.profiling``).
+    Cache keys identify inputs by a sampled content hash memoized next to the
+    cache (see ``orchestrator.fingerprint``); ``full_hash`` hashes whole files.
+    ``incremental_render`` renders the timeline in segments of about
+    ``segment_seconds`` kept in ``render-segments/`` of the run directory, and
+    re-renders only the segments whose entries changed since the last render
+    there (see ``orchestrator.segments``); ``render_chunks`` then bounds how
+    many render at once. ``preview`` replaces the render stage with a render of ``preview.mp4``
+    from low-resolution proxies of the staged clips (see
+    ``orchestrator.proxies``), and implies ``resume`` so that analysis and
+    planning from earlier runs are reused.
+    """
+
+    def __init__(
+        self,
+        backend: SubprocessBackend | WarmWorkerBackend | None = None,
+        cache: ArtifactCache | None = None,
+        clip_workers: int = 1,
+        resources: ResourcePool | None = None,
+        music_sidecar: bool = False,
+        trace: TraceRecorder | None = None,
+        resume: bool = False,
+        artifact_codec: str = "json",
+        render_chunks: int = 1,
+        stage_limits: Mapping[str, int] | None = None,
+        profile: bool = False,
+        full_hash: bool = False,
+        preview: bool = False,
+        incremental_render: bool = False,
+        segment_seconds: float = SEGMENT_SECONDS,
+    ) -> None:
+        ensure_paths()
+        from engine_contracts.codecs import CODECS
+
+        if artifact_codec not in CODECS:
+            raise ValueError(
+                f"Unknown artifact codec {artifact_codec!r}; expected one of {', '.join(CODECS)}."
+            )
+        self.backend = backend or SubprocessBackend()
+        self.cache = cache
+        self.clip_workers = clip_workers
+        self.music_sidecar = music_sidecar
+        self.resources = resources
+        self.trace = trace
+        self.resume = resume or preview
+        self.preview = preview
+        self.artifact_codec = artifact_codec
+        if render_chunks < 1:
+            raise ValueError("render_chunks must be >= 1.")
+        self.render_chunks = render_chunks
+        if segment_seconds <= 0:
+            raise ValueError("segment_seconds must be > 0.")
+        self.incremental_render = incremental_render
+        self.segment_seconds = segment_seconds
+        self.profile = profile
+        self.fingerprints = Fingerprinter(
+            FingerprintIndex(cache.root / "fingerprints.json") if cache else None,
+            full=full_hash,
+        )
+        unknown = sorted(set(stage_limits or {}) - set(STAGE_MEMORY_MB))
+        if unknown:
+            raise ValueError(f"Unknown stage(s) in stage_limits: {', '.join(unknown)}")
+        self.stage_limits = dict(stage_limits or {})
+        self._stage_gates = {
+            stage: threading.BoundedSemaphore(max(1, limit))
+            for stage, limit in self.stage_limits.items()
+        }
+        self._lock = threading.Lock()
+        self._shared: dict[Any, Future[Any]] = {}
+        self._planners: dict[bool, tuple[Any, threading.Lock]] = {}
+
+    def reserve(self, stage: str, cpu: int = 1) -> ContextManager[Any]:
+        """Wait for ``stage``'s concurrency limit and resource share; yields the wait in seconds."""
+        gate = self._stage_gates.get(stage)
+        if gate is None:
+            if self.resources is None:
+                return nullcontext(0.0)
+            return self.resources.acquire(cpu=cpu, memory_mb=STAGE_MEMORY_MB.get(stage, 0))
+        return self._gated(gate, stage, cpu)
+
+    @contextmanager
+    def _gated(self, gate: threading.BoundedSemaphore, stage: str, cpu: int) -> Iterator[float]:
+        requested = time.perf_counter()
+        with gate:
+            waited = time.perf_counter() - requested
+            if self.resources is None:
+                yield waited
+                return
+            memory_mb = STAGE_MEMORY_MB.get(stage, 0)
+            with self.resources.acquire(cpu=cpu, memory_mb=memory_mb) as pool_wait:
+                yield waited + pool_wait
+
+    def shared(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return ``compute()``, running it at most once per ``key`` across jobs."""
+        with self._lock:
+            future = self._shared.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._shared[key] = future
+        assert future is not None
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as exc:
+                future.set_exception(exc)
+                with self._lock:
+                    self._shared.pop(key, None)
+        return future.result()
+
+    def forget_shared(self) -> None:
+        """Drop finished per-song results; in-flight ones stay shared.
+
+        A long-lived context calls this between jobs so it does not hold on to
+        every song it has seen.
+        """
+        with self._lock:
+            self._shared = {
+                key: future for key, future in self._shared.items() if not future.done()
+            }
+
+    def planner(self, compat_mode: bool) -> tuple[Any, threading.Lock]:
+        """Return the reusable planner for ``compat_mode`` and the lock guarding it."""
+        with self._lock:
+            if compat_mode not in self._planners:
+                from montage_planner import MontagePlanner
+
+                self._planners[compat_mode] = (
+                    MontagePlanner(compat_mode=compat_mode),
+                    threading.Lock(),
+                )
+            return self._planners[compat_mode]
+
+    def close(self) -> None:
+        self.backend.close()
+        self.fingerprints.save()
+        if self.cache:
+            self.cache.prune()
+
+
+def run_job(job: PipelineJob, context: PipelineContext) -> dict[str, Any]:
+    """Run all four phases for ``job``, write its manifest and return it.
+
+    The manifest is also written when a stage fails, recording the stages
+    that did complete so that a ``resume`` run can pick up from there.
+    """
+    from engine_contracts import (
+        SCHEMA_VERSION,
+        DecodeSchedule,
+        MusicAnalysis,
+        TimelinePlan,
+        segment_timeline,
+        split_timeline,
+        write_music_columns,
+    )
+    from engine_contracts.codecs import artifact_path, read_artifact_with_stats, write_artifact
+    from engine_contracts.streaming import iter_clip_analysis
+    from engine_contracts.validators import (
+        validate_clip_analysis_payload,
+        validate_music_analysis_payload,
+        validate_music_analysis_schema,
+        validate_timeline_payload,
+        validate_timeline_schema,
+    )
+
+    run_started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    telemetry = Telemetry()
+    clip_paths = list(job.clips)
+    music_path = job.music
+    run_dir = job.run_dir
+    run_dir.mkdir(parents=True, exist_ok=True)
+    clip_bytes = file_bytes(clip_paths)
+
+    codec = context.artifact_codec
+    clip_analysis_path = artifact_path(run_dir / "clip-analysis.json", codec)
+    music_analysis_path = artifact_path(run_dir / "music-analysis.json", codec)
+    music_columns_path = run_dir / "music-analysis.columns"
+    timeline_path = run_dir / "timeline.json"
+    decode_schedule_path = run_dir / "decode-schedule.json"
+    chunk_dir = run_dir / "render-chunks"
+    segment_store = SegmentStore(run_dir / "render-segments", job.output.suffix or ".mp4")
+    preview_timeline_path = run_dir / "timeline.preview.json"
+    preview_output = run_dir / "preview.mp4"
+    manifest_path = run_dir / "run-manifest.json"
+    logs_dir = run_dir / "logs"
+    final_output = job.output
+    profiler = RunProfiler(run_dir / "profiles" if context.profile else None)
+
+    previous = read_manifest(manifest_path) if context.resume else {}
+    previous_artifacts = previous.get("artifacts") or {}
+    resume = ResumeState(
+        _stage_fingerprints(job, context),
+        STAGE_UPSTREAM,
+        previous.get("stage_fingerprints"),
+    )
+    stage_outputs: dict[str, Any] = {}
+
+    cache = context.cache
+    cache_counts: dict[str, dict[str, int]] = {}
+    stage_timings: dict[str, list[dict[str, Any]]] = {}
+    resource_waits: dict[str, float] = {}
+    stage_spans: dict[str, Span] = {}
+    artifact_io: dict[str, dict[str, Any]] = {}
+    render_chunk_info: list[dict[str, Any]] = []
+    preview_info: dict[str, Any] = {}
+    incremental_info: dict[str, Any] = {}
+    timings_lock = threading.Lock()
+
+    def store(name: str, path: Path, payload: Any, artifact_codec: str = codec) -> None:
+        stats = write_artifact(path, payload, artifact_codec)
+        with timings_lock:
+            artifact_io.setdefault(name, {}).update(
+                codec=stats.codec, bytes=stats.bytes, encode_s=round(stats.seconds, 6)
+            )
+
+    def record_read(name: str, artifact_codec: str, size: int, seconds: float) -> None:
+        with timings_lock:
+            entry = artifact_io.setdefault(name, {})
+            entry.setdefault("codec", artifact_codec)
+            entry.setdefault("bytes", size)
+            entry["decode_s"] = round(entry.get("decode_s", 0.0) + seconds, 6)
+
+    def load_artifact(name: str, path: Path) -> Any:
+        payload, stats = read_artifact_with_stats(path)
+        record_read(name, stats.codec, stats.bytes, stats.seconds)
+        return payload
+
+    def count(namespace: str, outcome: str) -> None:
+        with timings_lock:
+            counts = cache_counts.setdefault(namespace, {"hits": 0, "misses": 0})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def run_service(
+        stage: str,
+        entry: EntryPoint,
+        log_name: str | None = None,
+        stdout_path: Path | None = None,
+    ) -> EntryResult:
+        log_name = log_name or stage
+        if profiler.enabled:
+            entry = replace(entry, profile=profiler.service_path(log_name))
+        if stdout_path is None:
+            stdout_path = logs_dir / f"{log_name}.stdout.log"
+        stderr_path = logs_dir / f"{log_name}.stderr.log"
+        with telemetry.span(log_name, category="service") as span:
+            with context.reserve(stage) as waited:
+                result = context.backend.run(entry, stdout_path, stderr_path)
+            span.add_child(
+                result.user_s, result.sys_s, result.max_rss_kb, result.worker_peak_rss_kb
+            )
+            span.args.update(backend=result.backend, resource_wait_s=round(waited, 6))
+        with timings_lock:
+            stage_timings.setdefault(stage, []).append(result.timing())
+            resource_waits[stage] = round(resource_waits.get(stage, 0.0) + waited, 6)
+            if stage in stage_spans:
+                stage_spans[stage].add_child(
+                    result.user_s, result.sys_s, result.max_rss_kb, result.worker_peak_rss_kb
+                )
+        return result
+
+    @contextmanager
+    def stage_span(name: str, input_bytes: int = 0) -> Iterator[Span]:
+        """Time a graph stage; service calls made under ``name`` add their child usage to it."""
+        with telemetry.span(name, input_bytes=input_bytes) as span:
+            with timings_lock:
+                stage_spans[name] = span
+            yield span
+
+    def analyze_clips(_: dict[str, Any]) -> dict[str, Any]:
+        with stage_span("clip_analysis", input_bytes=clip_bytes) as span:
+            clip_payload = collect_clip_analysis()
+            with profiler.step("clip_analysis"):
+                store("clip_analysis", clip_analysis_path, clip_payload)
+                span.output_bytes = file_bytes([clip_analysis_path])
+                with telemetry.span("validate_clip_analysis", "step", span.output_bytes):
+                    validate_clip_analysis_payload(clip_payload, strict=False)
+        return {"clip_analysis": clip_payload}
+
+    def collect_clip_analysis() -> list[Any]:
+        keys: dict[Path, str] = {}
+        analyzed: dict[Path, Any] = {}
+        if cache:
+            clip_identity = service_identity(COMPATIBILITY_MATRIX, "val-content-engine")
+            with telemetry.span("fingerprint_clips", "step", clip_bytes):
+                digests = context.fingerprints.digests(clip_paths)
+            for path, digest in zip(clip_paths, digests):
+                keys[path] = ArtifactCache.key(digest, path.name, clip_identity, SCHEMA_VERSION)
+                item = cache.get("clip_analysis", keys[path])
+                if item is not None:
+                    analyzed[path] = item
+                count("clip_analysis", "misses" if item is None else "hits")
+
+        misses = [path for path in clip_paths if path not in analyzed]
+        if misses:
+            fresh = _analyze_clip_shards(
+                misses,
+                context.clip_workers,
+                run_dir / "shards",
+                lambda entry, log_name: run_service("clip_analysis", entry, log_name),
+            )
+            for path, item in zip(misses, fresh):
+                analyzed[path] = item
+                if cache:
+                    cache.put("clip_analysis", keys[path], item)
+
+        return [analyzed[path] for path in clip_paths]
+
+    def compute_music() -> tuple[Any, Path]:
+        key = ""
+        if cache:
+            music_identity = service_identity(COMPATIBILITY_MATRIX, "music-analyzer")
+            key = ArtifactCache.key(
+                context.fingerprints.digest(music_path),
+                music_path.name,
+                music_identity,
+                SCHEMA_VERSION,
+            )
+            cached = cache.get("music_analysis", key)
+            count("music_analysis", "misses" if cached is None else "hits")
+            if cached is not None:
+                with profiler.step("music_analysis"):
+                    with telemetry.span("validate_music_analysis", "step"):
+                        validate_music_analysis_payload(cached, strict=False)
+                    store("music_analysis", music_analysis_path, cached)
+                return cached, music_analysis_path
+
+        # Stream the analyzer's stdout to disk, parse it from there once, and
+        # only then store it as the artifact in the run's codec.
+        partial_path = music_analysis_path.with_name(f"{music_analysis_path.name}.partial")
+        run_service("music_analysis", _music_analysis_entry(music_path), stdout_path=partial_path)
+        with profiler.step("music_analysis"):
+            with telemetry.span("parse_music_analysis", "step", file_bytes([partial_path])):
+                with partial_path.open("r", encoding="utf-8") as handle:
+                    music_payload = json.load(handle)
+            with telemetry.span("validate_music_analysis", "step"):
+                validate_music_analysis_payload(music_payload, strict=False)
+            store("music_analysis", music_analysis_path, music_payload)
+        partial_path.unlink()
+        if cache:
+            cache.put("music_analysis", key, music_payload)
+        return music_payload, music_analysis_path
+
+    def analyze_music(_: dict[str, Any]) -> dict[str, Any]:
+        computed: list[bool] = []
+
+        def compute() -> tuple[Any, Path]:
+            computed.append(True)
+            return compute_music()
+
+        with stage_span("music_analysis", input_bytes=file_bytes([music_path])) as span:
+            music_payload, artifact_path = context.shared(
+                ("music_analysis", *file_identity(music_path).values()),
+                compute,
+            )
+            if not computed:
+                count("music_analysis", "shared")
+                if artifact_path != music_analysis_path:
+                    shutil.copyfile(artifact_path, music_analysis_path)
+
+            columns_path = None
+            if context.music_sidecar:
+                with telemetry.span("music_columns", "step") as step:
+                    with profiler.step("music_analysis"):
+                        # Only canonical payloads map onto MusicAnalysis; legacy-alias
+                        # payloads accepted in compat mode get no sidecar.
+                        try:
+                            validate_music_analysis_payload(music_payload, strict=True)
+                            validate_music_analysis_schema(music_payload)
+                        except ValueError:
+                            pass
+                        else:
+                            write_music_columns(music_payload, music_columns_path)
+                            columns_path = str(music_columns_path)
+                            step.output_bytes = file_bytes([music_columns_path])
+            span.output_bytes = file_bytes([music_analysis_path, columns_path])
+        return {"music_analysis": music_payload, "music_columns": columns_path}
+
+    def plan_timeline(inputs: dict[str, Any]) -> dict[str, Any]:
+        analysis_bytes = file_bytes([clip_analysis_path, music_analysis_path])
+        with stage_span("plan", input_bytes=analysis_bytes) as span:
+            with telemetry.span("stage_clips", "step", clip_bytes) as staging:
+                staged = stage_clips(clip_paths, run_dir / "clips")
+                staging.output_bytes = sum(clip.bytes_copied for clip in staged)
+            staged_ids = [clip.name for clip in staged]
+            planner, planner_lock = context.planner(job.planner_compat_mode)
+            with context.reserve("plan"), planner_lock, profiler.step("plan"):
+                with telemetry.span("build_timeline", "step", analysis_bytes):
+                    timeline_payload = planner.build_timeline(
+                        clips=_planner_clip_items(inputs["clip_analysis"], staged_ids),
+                        music_data=inputs["music_analysis"],
+                    )
+            staged_set = set(staged_ids)
+            for entry in timeline_payload.get("timeline", []):
+                if entry.get("clip_id") in staged_set:
+                    entry["clip_id"] = f"clips/{entry['clip_id']}"
+            with profiler.step("plan"):
+                # The render service reads the timeline, so it is always plain JSON.
+                store("timeline", timeline_path, timeline_payload, "json")
+                span.output_bytes = file_bytes([timeline_path])
+                with telemetry.span("validate_timeline", "step", span.output_bytes):
+                    validate_timeline_payload(timeline_payload, strict=True)
+                    validate_timeline_schema(timeline_payload)
+                with telemetry.span("decode_schedule", "step", span.output_bytes) as step:
+                    schedule = DecodeSchedule.from_plan(TimelinePlan.from_dict(timeline_payload))
+                    store("decode_schedule", decode_schedule_path, schedule.to_dict(), "json")
+                    step.output_bytes = file_bytes([decode_schedule_path])
+        return {
+            "timeline": timeline_payload,
+            "staged_clips": [clip.to_dict() for clip in staged],
+        }
+
+    def render(inputs: dict[str, Any]) -> dict[str, Any]:
+        render_inputs = file_bytes([timeline_path, music_path]) + clip_bytes
+        with stage_span("render", input_bytes=render_inputs) as span:
+            plan = None
+            chunks = []
+            if context.incremental_render or context.render_chunks > 1:
+                with profiler.step("render"):
+                    plan = TimelinePlan.from_dict(inputs["timeline"])
+                    try:
+                        beat_grid = MusicAnalysis.from_dict(inputs["music_analysis"]).beat_grid
+                    except (KeyError, TypeError, ValueError):
+                        # Legacy-alias payloads accepted in compat mode have no
+                        # canonical beats; cut on entry boundaries alone.
+                        beat_grid = None
+                    if not context.incremental_render:
+                        chunks = split_timeline(plan, context.render_chunks, beat_grid)
+            if plan is not None and context.incremental_render and plan.timeline:
+                render_incremental(plan, beat_grid)
+            elif len(chunks) > 1:
+                render_chunked(chunks)
+            else:
+                run_service("render", _render_entry(timeline_path, music_path, final_output))
+            span.output_bytes = file_bytes([final_output])
+        return {"final_output": final_output}
+
+    def render_piece(chunk: Any, name: str, output: Path) -> None:
+        """Render ``chunk`` against its slice of the song into ``output``."""
+        chunk_timeline = chunk_dir / f"{name}.json"
+        chunk_music = chunk_dir / f"{name}.wav"
+        with profiler.step("render"):
+            payload = _chunk_timeline_payload(chunk.plan, run_dir)
+            write_json(chunk_timeline, payload, indent=None)
+        with telemetry.span("cut_music", "step", file_bytes([music_path])) as step:
+            run_command(
+                _cut_music_command(
+                    music_path, chunk.song_offset, chunk.plan.total_duration, chunk_music
+                ),
+                run_dir,
+                stdout_path=logs_dir / f"cut_music.{name}.stdout.log",
+                stderr_path=logs_dir / f"cut_music.{name}.stderr.log",
+            )
+            step.output_bytes = file_bytes([chunk_music])
+        run_service("render", _render_entry(chunk_timeline, chunk_music, output), f"render.{name}")
+        chunk_music.unlink(missing_ok=True)
+
+    def concat(outputs: list[Path]) -> None:
+        """Stream-copy ``outputs`` together into the final output."""
+        concat_list = chunk_dir / "concat.txt"
+        concat_list.write_text(_concat_list(outputs), encoding="utf-8")
+        with telemetry.span("concat", "step", file_bytes(outputs)) as step:
+            run_command(
+                _concat_command(concat_list, final_output),
+                run_dir,
+                stdout_path=logs_dir / "concat.stdout.log",
+                stderr_path=logs_dir / "concat.stderr.log",
+            )
+            step.output_bytes = file_bytes([final_output])
+
+    def render_chunked(chunks: list[Any]) -> None:
+        """Render each chunk against its slice of the song, then stream-copy them together."""
+        if shutil.which(FFMPEG) is None:
+            raise RuntimeError(f"Chunked rendering needs {FFMPEG} on PATH.")
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        suffix = final_output.suffix or ".mp4"
+
+        def render_chunk(chunk: Any) -> Path:
+            name = f"chunk-{chunk.index:03d}"
+            chunk_output = chunk_dir / f"{name}{suffix}"
+            render_piece(chunk, name, chunk_output)
+            with timings_lock:
+                render_chunk_info.append(
+                    {
+                        "index": chunk.index,
+                        "song_offset": chunk.song_offset,
+                        "duration": chunk.plan.total_duration,
+                        "entries": len(chunk.entries),
+                        "bytes": file_bytes([chunk_output]),
+                    }
+                )
+            return chunk_output
+
+        with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="render-chunk") as pool:
+            outputs = list(pool.map(render_chunk, chunks))
+        concat(outputs)
+        # The chunk timelines and concat list stay for inspection; the media
+        # would double the run directory's size.
+        for path in outputs:
+            path.unlink()
+
+    def render_incremental(plan: Any, beat_grid: Any) -> None:
+        """Render only the segments not already in the segment store, then join them all."""
+        if shutil.which(FFMPEG) is None:
+            raise RuntimeError(f"Incremental rendering needs {FFMPEG} on PATH.")
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        # Segment timelines of the last render would otherwise linger under stale indices.
+        for path in chunk_dir.glob("segment-*"):
+            path.unlink()
+        segment_store.directory.mkdir(parents=True, exist_ok=True)
+        with telemetry.span("plan_segments", "step"), profiler.step("render"):
+            previous = segment_store.load()
+            kept = [
+                (item["song_offset"], item["song_offset"] + item["duration"]) for item in previous
+            ]
+            chunks = segment_timeline(plan, context.segment_seconds, kept, beat_grid)
+            keys = entry_keys(plan.timeline, run_dir)
+            renderer = (
+                _render_entry(
+                    Path("segment.json"), Path("segment.wav"), segment_store.path("segment")
+                ).describe(),
+                _service_version("render-engine", RENDER_ENGINE_DIR),
+            )
+            music = file_identity(music_path)
+            segments = []
+            for chunk in chunks:
+                chunk_keys = [keys[idx] for idx in chunk.entries]
+                duration = chunk.plan.total_duration
+                segments.append(
+                    {
+                        "key": segment_key(
+                            renderer, music, chunk.song_offset, duration, chunk_keys
+                        ),
+                        "song_offset": chunk.song_offset,
+                        "duration": duration,
+                        "entries": chunk_keys,
+                    }
+                )
+
+        def render_segment(item: tuple[Any, dict[str, Any]]) -> None:
+            chunk, segment = item
+            reused = segment_store.path(segment["key"]).exists()
+            if not reused:
+                partial = segment_store.partial_path(segment["key"])
+                render_piece(chunk, f"segment-{chunk.index:03d}", partial)
+                os.replace(partial, segment_store.path(segment["key"]))
+            with timings_lock:
+                render_chunk_info.append(
+                    {
+                        "index": chunk.index,
+                        "song_offset": chunk.song_offset,
+                        "duration": chunk.plan.total_duration,
+                        "entries": len(chunk.entries),
+                        "bytes": file_bytes([segment_store.path(segment["key"])]),
+                        "reused": reused,
+                    }
+                )
+
+        with ThreadPoolExecutor(
+            max_workers=min(context.render_chunks, len(chunks)), thread_name_prefix="render-segment"
+        ) as pool:
+            list(pool.map(render_segment, zip(chunks, segments)))
+        concat([segment_store.path(segment["key"]) for segment in segments])
+        segment_store.save(segments)
+
+        previous_entries = {key for item in previous for key in item.get("entries", ())}
+        reused = [info for info in render_chunk_info if info["reused"]]
+        reused_seconds = sum(info["duration"] for info in reused)
+        with timings_lock:
+            incremental_info.update(
+                segments=len(segments),
+                reused_segments=len(reused),
+                rendered_segments=len(segments) - len(reused),
+                entries=len(keys),
+                changed_entries=sum(1 for key in keys if key not in previous_entries),
+                reused_entries=sum(info["entries"] for info in reused),
+                reused_seconds=round(reused_seconds, 6),
+                reused_fraction=(
+                    round(reused_seconds / plan.total_duration, 4) if plan.total_duration else 0.0
+                ),
+            )
+
+    def preview(inputs: dict[str, Any]) -> dict[str, Any]:
+        """Render ``preview.mp4`` from proxies, making the ones not cached yet."""
+        if shutil.which(FFMPEG) is None:
+            raise RuntimeError(f"Preview rendering needs {FFMPEG} on PATH.")
+        staged = [Path(item["staged"]) for item in inputs["staged_clips"]]
+        with stage_span("preview", input_bytes=file_bytes(staged)) as span:
+
+            def run_proxy(command: list[str], name: str) -> None:
+                run_command(
+                    command,
+                    run_dir,
+                    stdout_path=logs_dir / f"proxy.{name}.stdout.log",
+                    stderr_path=logs_dir / f"proxy.{name}.stderr.log",
+                )
+
+            with telemetry.span("make_proxies", "step", file_bytes(staged)) as step:
+                proxies = make_proxies(staged, run_dir / "clips" / "proxies", run_proxy, FFMPEG)
+                step.output_bytes = sum(clip.bytes for clip in proxies if not clip.reused)
+            with profiler.step("preview"):
+                payload = proxy_timeline(inputs["timeline"], run_dir, proxies)
+                write_json(preview_timeline_path, payload, indent=None)
+            run_service(
+                "preview", _render_entry(preview_timeline_path, music_path, preview_output)
+            )
+            span.output_bytes = file_bytes([preview_output])
+        with timings_lock:
+            preview_info["proxies"] = [clip.to_dict() for clip in proxies]
+        return {"preview_output": preview_output}
+
+    def load_clip_analysis() -> list[Any]:
+        started = time.perf_counter()
+        items = list(iter_clip_analysis(clip_analysis_path, strict=False))
+        record_read(
+            "clip_analysis",
+            codec,
+            file_bytes([clip_analysis_path]),
+            time.perf_counter() - started,
+        )
+        return items
+
+    previous_columns = previous_artifacts.get("music_columns")
+    previous_staged = previous_artifacts.get("staged_clips") or []
+    # Per stage: the artifacts that must still exist to reuse it (None entries
+    # are ignored), and how to load its outputs from them.
+    reusable: dict[str, tuple[list[Any], Callable[[], dict[str, Any]]]] = {
+        "clip_analysis": (
+            [clip_analysis_path],
+            lambda: {"clip_analysis": load_clip_analysis()},
+        ),
+        "music_analysis": (
+            [music_analysis_path, previous_columns],
+            lambda: {
+                "music_analysis": load_artifact("music_analysis", music_analysis_path),
+                "music_columns": previous_columns,
+            },
+        ),
+        "plan": (
+            [
+                timeline_path,
+                decode_schedule_path,
+                *(item.get("staged") for item in previous_staged),
+            ],
+            lambda: {
+                "timeline": load_artifact("timeline", timeline_path),
+                "staged_clips": previous_staged,
+            },
+        ),
+        "render": ([final_output], lambda: {"final_output": final_output}),
+        "preview": (
+            [preview_output, preview_timeline_path],
+            lambda: {"preview_output": preview_output},
+        ),
+    }
+
+    def resumable(
+        name: str, run: Callable[[dict[str, Any]], dict[str, Any]]
+    ) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        def wrapped(inputs: dict[str, Any]) -> dict[str, Any]:
+            artifacts, load = reusable[name]
+            skip = resume.can_skip(name, [path for path in artifacts if path is not None])
+            if skip:
+                with profiler.step(name):
+                    outputs = load()
+            else:
+                outputs = run(inputs)
+            resume.finished(name, skipped=skip)
+            if name == "preview":
+                with timings_lock:
+                    preview_info["time_to_preview_s"] = round(time.perf_counter() - started, 6)
+            with timings_lock:
+                stage_outputs.update(outputs)
+            return outputs
+
+        return wrapped
+
+    # Clip and music analysis are independent, so the graph starts them together;
+    # planning waits for both and rendering waits for the timeline. A preview
+    # takes the render stage's place.
+    if context.preview:
+        final_stage = Stage(
+            "preview",
+            resumable("preview", preview),
+            inputs=("timeline", "staged_clips"),
+            outputs=("preview_output",),
+        )
+    else:
+        final_stage = Stage(
+            "render",
+            resumable("render", render),
+            inputs=("timeline", "music_analysis"),
+            outputs=("final_output",),
+        )
+    graph = StageGraph(
+        [
+            Stage(
+                "clip_analysis",
+                resumable("clip_analysis", analyze_clips),
+                outputs=("clip_analysis",),
+            ),
+            Stage(
+                "music_analysis",
+                resumable("music_analysis", analyze_music),
+                outputs=("music_analysis", "music_columns"),
+            ),
+            Stage(
+                "plan",
+                resumable("plan", plan_timeline),
+                inputs=("clip_analysis", "music_analysis"),
+                outputs=("timeline", "staged_clips"),
+            ),
+            final_stage,
+        ]
+    )
+    error: BaseException | None = None
+    try:
+        graph.run()
+    except BaseException as exc:
+        error = exc
+    finally:
+        if context.trace is not None:
+            context.trace.add(telemetry, str(run_dir))
+    resume.carry_over(["preview" if final_stage.name == "render" else "render"])
+
+    manifest = {
+        "run_started_at": run_started_at,
+        "run_finished_at": datetime.now(timezone.utc).isoformat(),
+        "status": "failed" if error else "succeeded",
+        **({"error": str(error)} if error else {}),
+        "artifacts": {
+            "clip_analysis": str(clip_analysis_path),
+            "music_analysis": str(music_analysis_path),
+            "music_columns": stage_outputs.get("music_columns"),
+            "timeline": str(timeline_path),
+            "decode_schedule": str(decode_schedule_path),
+            "final_output": str(final_output),
+            "preview_output": str(preview_output) if context.preview else None,
+            "logs": str(logs_dir),
+            "staged_clips": stage_outputs.get("staged_clips", []),
+        },
+        "artifact_io": artifact_io,
+        "stage_fingerprints": resume.completed,
+        "planner_compat_mode": job.planner_compat_mode,
+        "cache": {
+            "enabled": cache is not None,
+            "dir": str(cache.root) if cache else None,
+            "fingerprint": context.fingerprints.kind,
+            **cache_counts,
+        },
+        "execution": {
+            "backend": context.backend.name,
+            "stages": stage_timings,
+            "resource_wait_s": resource_waits,
+            "resumed": context.resume,
+            "skipped_stages": resume.skipped,
+            "render_chunks": sorted(render_chunk_info, key=lambda chunk: chunk["index"]),
+            "incremental_render": incremental_info or None,
+        },
+        "telemetry": {
+            "wall_s": round(telemetry.wall_s(), 6),
+            "peak_rss_kb": maxrss_kb(resource.getrusage(resource.RUSAGE_SELF)),
+            "stages": telemetry.summary(),
+        },
+    }
+    if context.preview:
+        manifest["preview"] = {
+            "output": str(preview_output),
+            "timeline": str(preview_timeline_path),
+            "time_to_preview_s": preview_info.get("time_to_preview_s"),
+            "proxies": preview_info.get("proxies", []),
+        }
+    if profiler.enabled:
+        manifest["profile"] = profiler.write()
+    context.fingerprints.save()
+    write_json(manifest_path, manifest)
+    if error is not None:
+        raise error
+    return manifest
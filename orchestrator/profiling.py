@@ -0,0 +1,128 @@
+"""Opt-in cProfile hooks for a run.
+
+In-process steps (planning, validation, artifact encoding and decoding) are
+profiled into one ``<stage>.prof`` per stage. Service entry points profile
+themselves: ``orchestrator.entry`` writes ``$CONTENT_ENGINE_PROFILE`` when it
+is set, and warm workers profile the call in place. Every file can be opened
+with ``python -m pstats`` or snakeviz; :func:`top_functions` condenses one
+for the manifest.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+PROFILE_ENV = "CONTENT_ENGINE_PROFILE"
+
+# From Python 3.12 only one profiler may be active per process, so profiled
+# sections from concurrent stages take turns.
+_active = threading.Lock()
+
+
+@contextmanager
+def profile_to(path: Path | str | None) -> Iterator[None]:
+    """Profile the block and dump the stats to ``path``; a no-op without one."""
+    if path is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    with _active:
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    profile.dump_stats(str(path))
+
+
+def top_functions(path: Path | str, limit: int = 15) -> list[dict[str, Any]]:
+    """The ``limit`` functions with the most cumulative time in a ``.prof`` file."""
+    stats = pstats.Stats(str(path)).stats  # type: ignore[attr-defined]
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": pstats.func_std_string(func),
+            "calls": calls,
+            "tottime_s": round(tottime, 6),
+            "cumtime_s": round(cumtime, 6),
+        }
+        for func, (_, calls, tottime, cumtime, _) in ranked[:limit]
+    ]
+
+
+class RunProfiler:
+    """Collects the profiles of one run under ``directory``.
+
+    With ``directory`` None every method is a no-op, so call sites need no
+    checks of their own.
+    """
+
+    def __init__(self, directory: Path | None) -> None:
+        self.directory = directory
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._services: dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    @contextmanager
+    def step(self, stage: str) -> Iterator[None]:
+        """Add the block to ``stage``'s in-process profile."""
+        if self.directory is None:
+            yield
+            return
+        with self._lock:
+            profile = self._profiles.setdefault(stage, cProfile.Profile())
+        with _active:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+
+    def service_path(self, log_name: str) -> Path | None:
+        """Where the service call logged as ``log_name`` writes its profile."""
+        if self.directory is None:
+            return None
+        path = self.directory / f"service.{log_name}.prof"
+        # Drop a previous run's file so a failed call is not summarized with it.
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self._services[log_name] = path
+        return path
+
+    def write(self, limit: int = 15) -> dict[str, Any]:
+        """Dump the stage profiles and summarize them with every service profile."""
+        if self.directory is None:
+            return {"enabled": False}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stages = {}
+            for stage, profile in self._profiles.items():
+                stages[stage] = self.directory / f"{stage}.prof"
+                profile.dump_stats(str(stages[stage]))
+            services = dict(self._services)
+
+        def summarize(paths: dict[str, Path]) -> dict[str, Any]:
+            # A service that failed before its entry point ran leaves no file.
+            return {
+                name: {"file": path.name, "top": top_functions(path, limit)}
+                for name, path in sorted(paths.items())
+                if path.exists()
+            }
+
+        return {
+            "enabled": True,
+            "dir": str(self.directory),
+            "stages": summarize(stages),
+            "services": summarize(services),
+        }
@@ -0,0 +1,138 @@
+"""Low-resolution proxies of staged clips for preview renders.
+
+A proxy is the staged clip scaled down to ``PROXY_HEIGHT`` lines and encoded
+with x264's fastest preset and a short GOP, so the renderer decodes a
+fraction of the pixels and seeks cheaply. Proxies live next to the staged
+clips in ``clips/proxies/`` and are named after them; staged names already
+fingerprint the source file, so a proxy on disk is reused by every later
+preview of the same clip.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Iterable
+
+
+PROXY_HEIGHT = 360
+PROXY_PRESET = "ultrafast"
+PROXY_CRF = 30
+PROXY_GOP = 12
+
+
+def proxy_name(staged: Path, height: int = PROXY_HEIGHT) -> str:
+    return f"{staged.stem}.{height}p.mp4"
+
+
+def proxy_command(
+    ffmpeg: str, source: Path, output_path: Path, height: int = PROXY_HEIGHT
+) -> list[str]:
+    # Never upscale, and keep the width even as x264 requires.
+    scale = f"scale=-2:'min({height},ih)'"
+    return [
+        ffmpeg,
+        "-y",
+        "-v",
+        "error",
+        "-i",
+        str(source),
+        "-vf",
+        scale,
+        "-c:v",
+        "libx264",
+        "-preset",
+        PROXY_PRESET,
+        "-crf",
+        str(PROXY_CRF),
+        "-g",
+        str(PROXY_GOP),
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "96k",
+        "-f",
+        "mp4",
+        str(output_path),
+    ]
+
+
+@dataclass(frozen=True)
+class ProxyClip:
+    staged: Path
+    proxy: Path
+    bytes: int
+    # True when a previous preview already made this proxy.
+    reused: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "staged": str(self.staged),
+            "proxy": str(self.proxy),
+            "bytes": self.bytes,
+            "reused": self.reused,
+        }
+
+
+def make_proxies(
+    staged_paths: Iterable[Path],
+    proxies_dir: Path,
+    run: Callable[[list[str], str], Any],
+    ffmpeg: str = "ffmpeg",
+    height: int = PROXY_HEIGHT,
+    workers: int = 4,
+) -> list[ProxyClip]:
+    """Make a proxy of each distinct staged clip, in parallel, reusing existing ones.
+
+    ``run(command, name)`` runs one ffmpeg command; ``name`` identifies the
+    clip in logs. Each proxy is encoded under a temporary name and renamed
+    into place, so a proxy under its final name is complete.
+    """
+    unique = list(dict.fromkeys(staged_paths))
+    proxies_dir.mkdir(parents=True, exist_ok=True)
+
+    def make(staged: Path) -> ProxyClip:
+        target = proxies_dir / proxy_name(staged, height)
+        if target.exists():
+            return ProxyClip(staged, target, target.stat().st_size, reused=True)
+        tmp = target.with_name(f".{target.name}.tmp")
+        try:
+            run(proxy_command(ffmpeg, staged, tmp, height), target.stem)
+            os.replace(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return ProxyClip(staged, target, target.stat().st_size)
+
+    if not unique:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(workers, len(unique))), thread_name_prefix="proxy"
+    ) as pool:
+        return list(pool.map(make, unique))
+
+
+def proxy_timeline(
+    timeline_payload: dict[str, Any], run_dir: Path, proxies: Iterable[ProxyClip]
+) -> dict[str, Any]:
+    """A copy of ``timeline_payload`` whose staged clip ids point at their proxies.
+
+    Clip ids are relative to ``run_dir``, as the planner writes them; entries
+    whose clip has no proxy keep their original id.
+    """
+    by_staged = {
+        PurePosixPath(os.path.relpath(clip.staged, run_dir)).as_posix(): PurePosixPath(
+            os.path.relpath(clip.proxy, run_dir)
+        ).as_posix()
+        for clip in proxies
+    }
+    payload = dict(timeline_payload)
+    payload["timeline"] = [
+        {**entry, "clip_id": by_staged.get(entry["clip_id"], entry["clip_id"])}
+        for entry in timeline_payload.get("timeline", [])
+    ]
+    return payload
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from .cache import ArtifactCache
+from .fingerprint import stat_key
+
+
+def file_identity(path: Path) -> dict[str, Any]:
+    """Make-style identity of an input file: its path and :func:`~.fingerprint.stat_key`.
+
+    The inode is part of it, so a file replaced by a copy with the same size
+    and mtime still counts as changed.
+    """
+    return {"path": str(path), **stat_key(path)._asdict()}
+
+
+@lru_cache(maxsize=None)
+def service_revision(service_dir: Path) -> str | None:
+    """Git revision of a service checkout, or ``None`` when it is not its own git work tree."""
+    if not (service_dir / ".git").exists():
+        return None
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(service_dir), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+def fingerprint(*parts: Any) -> str:
+    return ArtifactCache.key(*parts)
+
+
+def read_manifest(manifest_path: Path) -> dict[str, Any]:
+    """The previous run's manifest, or an empty dict when there is none to resume from."""
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+class ResumeState:
+    """Decides, Make-style, which stages of a resumed run can reuse their artifacts.
+
+    A stage is reused when resuming, its fingerprint matches the previous
+    run's, its artifacts exist, and none of its ``upstream`` stages ran in
+    this invocation. Fingerprints of completed stages are collected for the
+    next manifest.
+    """
+
+    def __init__(
+        self,
+        fingerprints: Mapping[str, str],
+        upstream: Mapping[str, Iterable[str]],
+        previous: Mapping[str, str] | None = None,
+    ) -> None:
+        self.fingerprints = dict(fingerprints)
+        self.upstream = {stage: tuple(deps) for stage, deps in upstream.items()}
+        self.previous = {
+            stage: value for stage, value in (previous or {}).items() if isinstance(value, str)
+        }
+        self.completed: dict[str, str] = {}
+        self.skipped: list[str] = []
+        self._ran: set[str] = set()
+        self._lock = threading.Lock()
+
+    def can_skip(self, stage: str, artifacts: Iterable[Path | str | None]) -> bool:
+        with self._lock:
+            if self.previous.get(stage) != self.fingerprints[stage]:
+                return False
+            if any(dep in self._ran for dep in self.upstream.get(stage, ())):
+                return False
+        return all(path is not None and os.path.lexists(path) for path in artifacts)
+
+    def finished(self, stage: str, skipped: bool) -> None:
+        with self._lock:
+            self.completed[stage] = self.fingerprints[stage]
+            if skipped:
+                self.skipped.append(stage)
+            else:
+                self._ran.add(stage)
+
+    def carry_over(self, stages: Iterable[str]) -> None:
+        """Keep the previous fingerprints of ``stages``, which this run does not execute.
+
+        A preview run leaves the full render's fingerprint alone and the
+        other way around, unless something upstream of the stage ran.
+        """
+        with self._lock:
+            for stage in stages:
+                if stage in self.previous and not any(
+                    dep in self._ran for dep in self.upstream.get(stage, ())
+                ):
+                    self.completed.setdefault(stage, self.previous[stage])
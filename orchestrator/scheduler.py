@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+DEFAULT_MEMORY_MB = 8192
+
+
+def detect_memory_mb() -> int:
+    """Physical memory in MiB, or ``DEFAULT_MEMORY_MB`` when it cannot be read."""
+    try:
+        pages = os.sysconf("SC_PHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return DEFAULT_MEMORY_MB
+    if pages <= 0 or page_size <= 0:
+        return DEFAULT_MEMORY_MB
+    return int(pages * page_size // (1024 * 1024))
+
+
+class ResourcePool:
+    """Counting gate over CPU slots and a memory budget.
+
+    A request larger than the whole pool is clamped to the pool so it can still
+    run, alone, instead of waiting forever.
+    """
+
+    def __init__(self, cpu_slots: int, memory_mb: int) -> None:
+        self.cpu_slots = max(1, cpu_slots)
+        self.memory_mb = max(1, memory_mb)
+        self._cpu_free = self.cpu_slots
+        self._memory_free = self.memory_mb
+        self._condition = threading.Condition()
+        self._waits: list[float] = []
+
+    @contextmanager
+    def acquire(self, cpu: int = 1, memory_mb: int = 0) -> Iterator[float]:
+        """Hold ``cpu`` slots and ``memory_mb`` for the block; yields the wait in seconds."""
+        cpu = min(max(0, cpu), self.cpu_slots)
+        memory_mb = min(max(0, memory_mb), self.memory_mb)
+        requested = time.perf_counter()
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._cpu_free >= cpu and self._memory_free >= memory_mb
+            )
+            self._cpu_free -= cpu
+            self._memory_free -= memory_mb
+            waited = time.perf_counter() - requested
+            self._waits.append(waited)
+        try:
+            yield waited
+        finally:
+            with self._condition:
+                self._cpu_free += cpu
+                self._memory_free += memory_mb
+                self._condition.notify_all()
+
+    def wait_stats(self) -> dict[str, float]:
+        with self._condition:
+            waits = list(self._waits)
+        return {
+            "acquisitions": len(waits),
+            "total_wait_s": round(sum(waits), 6),
+            "max_wait_s": round(max(waits, default=0.0), 6),
+        }
@@ -0,0 +1,113 @@
+"""Rendered timeline segments kept between runs for incremental renders.
+
+An incremental render splits the timeline with
+``engine_contracts.segment_timeline``, keeping the song ranges of the
+previous run's segments whole wherever they still fit. Each segment is keyed
+by what its output depends on: the identity and source/song ranges of its
+entries, its slice of the song, and the renderer. A segment whose key is
+already in the :class:`SegmentStore` is reused as is; only the others are
+rendered before the segments are concatenated.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+from .fingerprint import stat_key
+from .resume import fingerprint
+
+
+SEGMENT_SECONDS = 20.0
+
+
+def entry_keys(entries: Iterable[Any], run_dir: Path) -> list[str]:
+    """Key of each timeline entry: its clip's identity and its two ranges.
+
+    Clip ids are resolved against ``run_dir``. The stat key of the clip
+    follows staged symlinks, so an edited source clip changes the key even
+    when its staged name is reused.
+    """
+    identities: dict[str, Any] = {}
+
+    def identity(clip_id: str) -> Any:
+        if clip_id not in identities:
+            try:
+                identities[clip_id] = list(stat_key(run_dir / clip_id))
+            except OSError:
+                identities[clip_id] = None
+        return identities[clip_id]
+
+    return [
+        fingerprint(
+            entry.clip_id,
+            identity(entry.clip_id),
+            entry.clip_start,
+            entry.clip_end,
+            entry.song_start,
+            entry.song_end,
+        )
+        for entry in entries
+    ]
+
+
+def segment_key(
+    renderer: Any, music: Any, song_offset: float, duration: float, keys: list[str]
+) -> str:
+    return fingerprint("render_segment", renderer, music, song_offset, duration, keys)
+
+
+class SegmentStore:
+    """Segment media under ``directory``, named by key, plus ``index.json``.
+
+    The index lists the segments of the last incremental render in song
+    order; each record holds ``key``, ``song_offset``, ``duration`` and the
+    ``entries`` keys.
+    """
+
+    def __init__(self, directory: Path, suffix: str = ".mp4") -> None:
+        self.directory = directory
+        self.suffix = suffix
+        self.index_path = directory / "index.json"
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def partial_path(self, key: str) -> Path:
+        """Where a segment is rendered before :meth:`path`; same suffix for the muxer."""
+        return self.directory / f".{key}.partial{self.suffix}"
+
+    def load(self) -> list[dict[str, Any]]:
+        """The previous render's segments whose media still exists."""
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+        if not isinstance(index, dict) or not isinstance(index.get("segments"), list):
+            return []
+        return [
+            segment
+            for segment in index["segments"]
+            if isinstance(segment, dict) and self.path(str(segment.get("key"))).exists()
+        ]
+
+    def save(self, segments: list[dict[str, Any]]) -> None:
+        """Record ``segments`` as the current render and drop every other segment file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.directory, prefix=".index.json.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"segments": segments}, handle, separators=(",", ":"))
+            os.replace(tmp_name, self.index_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        current = {self.path(segment["key"]).name for segment in segments}
+        for path in self.directory.iterdir():
+            if path.suffix == self.suffix and path.name not in current:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import json
+import math
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+from .batch import job_from_record
+from .pipeline import PipelineContext, PipelineJob, run_job, write_json
+from .resume import read_manifest
+
+
+MAX_REQUEST_BYTES = 1024 * 1024
+KEEP_FINISHED = 1000
+
+
+class QueueFull(RuntimeError):
+    """Raised by :meth:`JobSpool.submit` when ``max_queued`` jobs are already waiting."""
+
+
+class RunDirBusy(RuntimeError):
+    """Raised by :meth:`JobSpool.submit` when a queued or running job uses the same run_dir."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobSpool:
+    """Persistent FIFO of submitted jobs.
+
+    Each job is one JSON record in ``spool_dir/jobs``, rewritten atomically
+    on every state change (``queued`` -> ``running`` -> ``succeeded`` or
+    ``failed``). On start, records left ``queued`` or ``running`` by a
+    previous process are queued again in submission order. Only the newest
+    ``keep_finished`` succeeded or failed records are kept; older ones are
+    dropped along with their files (their run directories are left alone).
+    """
+
+    def __init__(
+        self, spool_dir: Path, max_queued: int, keep_finished: int = KEEP_FINISHED
+    ) -> None:
+        self.jobs_dir = spool_dir / "jobs"
+        self.runs_dir = spool_dir / "runs"
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_queued = max(1, max_queued)
+        self.keep_finished = max(0, keep_finished)
+        self._condition = threading.Condition()
+        self._records: dict[str, dict[str, Any]] = {}
+        self._pending: deque[str] = deque()
+        self._closed = False
+        self._seq = 0
+        self._recover()
+
+    def _recover(self) -> None:
+        for path in self.jobs_dir.glob("*.json"):
+            record = read_manifest(path)
+            if "id" not in record or "seq" not in record:
+                continue
+            self._records[record["id"]] = record
+            self._seq = max(self._seq, int(record["seq"]) + 1)
+        for record in sorted(self._records.values(), key=lambda record: record["seq"]):
+            if record["status"] in ("queued", "running"):
+                if record["status"] == "running":
+                    record.update(status="queued", recovered=True)
+                    self._persist(record)
+                self._pending.append(record["id"])
+        self._prune()
+
+    def _prune(self) -> None:
+        finished = sorted(
+            (
+                record
+                for record in self._records.values()
+                if record["status"] in ("succeeded", "failed")
+            ),
+            key=lambda record: record["seq"],
+        )
+        for record in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._records[record["id"]]
+            (self.jobs_dir / f"{record['id']}.json").unlink(missing_ok=True)
+
+    def _persist(self, record: dict[str, Any]) -> None:
+        write_json(self.jobs_dir / f"{record['id']}.json", record)
+
+    def submit(self, request: dict[str, Any], run_dir: Path | None = None) -> dict[str, Any]:
+        """Queue ``request``; ``run_dir`` defaults to ``spool_dir/runs/<id>``.
+
+        Raises :class:`RunDirBusy` if a queued or running job already uses
+        ``run_dir``: two jobs writing one run directory would overwrite each
+        other's artifacts and manifest.
+        """
+        with self._condition:
+            if run_dir is not None:
+                for other in self._records.values():
+                    if other["status"] in ("queued", "running") and other["run_dir"] == str(
+                        run_dir
+                    ):
+                        raise RunDirBusy(
+                            f"Job {other['id']} ({other['status']}) already uses {run_dir}."
+                        )
+            if len(self._pending) >= self.max_queued:
+                raise QueueFull(f"{len(self._pending)} jobs are already queued.")
+            job_id = f"{self._seq:08d}-{secrets.token_hex(4)}"
+            record = {
+                "id": job_id,
+                "seq": self._seq,
+                "status": "queued",
+                "submitted_at": _now(),
+                "request": request,
+                "run_dir": str(run_dir or self.runs_dir / job_id),
+            }
+            self._seq += 1
+            self._persist(record)
+            self._records[job_id] = record
+            self._pending.append(job_id)
+            self._condition.notify()
+            return dict(record, position=len(self._pending))
+
+    def take(self) -> dict[str, Any] | None:
+        """Block until a job is queued, mark it running and return it; None once closed."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if self._closed:
+                return None
+            record = self._records[self._pending.popleft()]
+            record.update(status="running", started_at=_now())
+            self._persist(record)
+            return dict(record)
+
+    def finish(self, job_id: str, **fields: Any) -> None:
+        with self._condition:
+            record = self._records[job_id]
+            record.update(fields, finished_at=_now())
+            self._persist(record)
+            self._prune()
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._condition:
+            record = self._records.get(job_id)
+            if record is None:
+                return None
+            result = dict(record)
+            if record["status"] == "queued":
+                result["position"] = self._pending.index(job_id) + 1
+            return result
+
+    def list(self) -> list[dict[str, Any]]:
+        with self._condition:
+            records = sorted(self._records.values(), key=lambda record: record["seq"])
+            return [
+                {key: record.get(key) for key in ("id", "status", "submitted_at", "run_dir")}
+                for record in records
+            ]
+
+    def counts(self) -> dict[str, int]:
+        with self._condition:
+            counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+            for record in self._records.values():
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+            return counts
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class PipelineServer:
+    """Runs submitted jobs on a fixed pool of job threads behind a local HTTP API.
+
+    All jobs share one ``PipelineContext``, so the execution backend, the
+    analysis cache, warm planners and the context's per-stage limits and
+    resource pool apply across requests. The cache is pruned to its size
+    limit after every job. Submissions beyond ``max_queued``
+    waiting jobs are refused with 429 and a ``Retry-After`` estimate, and
+    submissions whose ``run_dir`` belongs to a queued or running job with 409.
+
+    API (JSON in and out)::
+
+        POST /jobs                  {"clips": [...], "music": ..., ["run_dir", "output",
+                                     "planner_compat_mode"]} -> 202 job record
+        GET  /jobs                  all jobs still in the spool, oldest first
+        GET  /jobs/<id>             one job record, with its queue position while queued
+        GET  /jobs/<id>/manifest    the job's run-manifest.json once it has one
+        GET  /health                job counts by status and queue capacity
+
+    Relative paths in a submission resolve against ``base_dir``; ``run_dir``
+    defaults to ``spool_dir/runs/<id>``.
+    """
+
+    def __init__(
+        self,
+        context: PipelineContext,
+        spool_dir: Path,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        job_workers: int = 2,
+        max_queued: int = 64,
+        keep_finished: int = KEEP_FINISHED,
+        base_dir: Path | None = None,
+        warm_planners: bool = True,
+        runner: Callable[[PipelineJob, PipelineContext], dict[str, Any]] = run_job,
+    ) -> None:
+        self.context = context
+        self.spool_dir = spool_dir
+        self.spool = JobSpool(spool_dir, max_queued, keep_finished)
+        self.job_workers = max(1, job_workers)
+        self.base_dir = (base_dir or Path.cwd()).resolve()
+        self.warm_planners = warm_planners
+        self._runner = runner
+        self._lock = threading.Lock()
+        self._running = 0
+        self._recent_wall_s: deque[float] = deque(maxlen=32)
+        self._threads: list[threading.Thread] = []
+        self._http = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._http.daemon_threads = True
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._http.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        """Start the job threads and the HTTP listener; returns immediately."""
+        if self.warm_planners:
+            self.context.planner(False)
+        for idx in range(self.job_workers):
+            thread = threading.Thread(target=self._work, name=f"job-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        listener = threading.Thread(target=self._http.serve_forever, name="http", daemon=True)
+        listener.start()
+        self._threads.append(listener)
+
+    def shutdown(self) -> None:
+        """Stop accepting requests and wait for running jobs to finish.
+
+        Jobs still queued stay in the spool and run when a server starts on
+        the same ``spool_dir`` again.
+        """
+        self._http.shutdown()
+        self._http.server_close()
+        self.spool.close()
+        for thread in self._threads:
+            thread.join()
+
+    def submit(self, request: Any) -> dict[str, Any]:
+        """Validate and queue a submission.
+
+        Raises ``ValueError``, :class:`QueueFull` or :class:`RunDirBusy`.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Job request must be a JSON object.")
+        # The default run_dir needs the job id, so validate with a placeholder.
+        job = job_from_record({"run_dir": ".", **request}, self.base_dir, where="Job request")
+        return self.spool.submit(request, job.run_dir if "run_dir" in request else None)
+
+    def retry_after_s(self) -> int:
+        """Rough wait until a queue slot frees up, from recent job durations."""
+        with self._lock:
+            recent = list(self._recent_wall_s)
+        mean = sum(recent) / len(recent) if recent else 5.0
+        return max(1, math.ceil(mean / self.job_workers))
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "status": "ok",
+            "jobs": self.spool.counts(),
+            "max_queued": self.spool.max_queued,
+            "job_workers": self.job_workers,
+        }
+
+    def _work(self) -> None:
+        while True:
+            record = self.spool.take()
+            if record is None:
+                return
+            with self._lock:
+                self._running += 1
+            started = time.perf_counter()
+            try:
+                job = job_from_record(
+                    {**record["request"], "run_dir": record["run_dir"]},
+                    self.base_dir,
+                    where=f"Job {record['id']}",
+                )
+                self._runner(job, self.context)
+            except Exception as exc:
+                fields = {"status": "failed", "error": str(exc)}
+            else:
+                fields = {
+                    "status": "succeeded",
+                    "manifest": str(job.run_dir / "run-manifest.json"),
+                    "output": str(job.output),
+                }
+            wall = time.perf_counter() - started
+            fields["wall_s"] = round(wall, 6)
+            if self.context.cache:
+                # The context lives as long as the server, so its close()
+                # cannot be what keeps the cache within --cache-max-mb. A
+                # concurrent job's lookup of an evicted entry is just a miss.
+                self.context.cache.prune()
+            self.spool.finish(record["id"], **fields)
+            with self._lock:
+                self._running -= 1
+                self._recent_wall_s.append(wall)
+                idle = self._running == 0
+            if idle:
+                self.context.forget_shared()
+
+
+def _handler_for(server: PipelineServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "content-engine"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Job records and manifests are the log; per-request lines would
+            # drown them under load.
+            pass
+
+        def _send(
+            self, status: HTTPStatus, payload: Any, headers: dict[str, str] | None = None
+        ) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(
+            self, status: HTTPStatus, message: str, headers: dict[str, str] | None = None
+        ) -> None:
+            self._send(status, {"error": message}, headers)
+
+        def do_GET(self) -> None:
+            parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+            if parts == ["health"]:
+                self._send(HTTPStatus.OK, server.health())
+            elif parts == ["jobs"]:
+                self._send(HTTPStatus.OK, {"jobs": server.spool.list()})
+            elif len(parts) in (2, 3) and parts[0] == "jobs":
+                record = server.spool.get(parts[1])
+                if record is None:
+                    self._error(HTTPStatus.NOT_FOUND, f"No job {parts[1]}.")
+                elif len(parts) == 2:
+                    self._send(HTTPStatus.OK, record)
+                elif parts[2] != "manifest":
+                    self._error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}.")
+                else:
+                    manifest = read_manifest(Path(record["run_dir"]) / "run-manifest.json")
+                    if manifest:
+                        self._send(HTTPStatus.OK, manifest)
+                    else:
+                        self._error(
+                            HTTPStatus.NOT_FOUND,
+                            f"Job {parts[1]} has no manifest yet (status {record['status']}).",
+                        )
+            else:
+                self._error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}.")
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") != "/jobs":
+                self._error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}.")
+                return
+            try:
+                length = int(self.headers.get("Content-Length", ""))
+            except ValueError:
+                self._error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required.")
+                return
+            if length > MAX_REQUEST_BYTES:
+                self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Job request is too large.")
+                return
+            try:
+                request = json.loads(self.rfile.read(length))
+                record = server.submit(request)
+            except QueueFull as exc:
+                self._error(
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    str(exc),
+                    {"Retry-After": str(server.retry_after_s())},
+                )
+            except RunDirBusy as exc:
+                self._error(HTTPStatus.CONFLICT, str(exc))
+            except ValueError as exc:
+                self._error(HTTPStatus.BAD_REQUEST, str(exc))
+            else:
+                self._send(
+                    HTTPStatus.ACCEPTED, record, {"Location": f"/jobs/{record['id']}"}
+                )
+
+    return Handler
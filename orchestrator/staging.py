@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .fingerprint import quick_id
+
+
+# Cheapest first; each one falls through to the next when the filesystem or
+# platform refuses it.
+STRATEGIES = ("symlink", "hardlink", "reflink", "copy")
+
+# FICLONE from linux/fs.h: share the source's extents copy-on-write.
+_FICLONE = 0x40049409
+
+
+def staged_name(path: Path) -> str:
+    """File name for ``path`` in the staging directory.
+
+    The name keeps the clip's stem for readability and adds a fingerprint of
+    the file's identity (device, inode, size, mtime), so different clips that
+    share a basename get different names and the same file listed twice gets
+    the same one.
+    """
+    return f"{path.stem}-{quick_id(path)[:12]}{path.suffix}"
+
+
+@dataclass(frozen=True)
+class StagedClip:
+    source: Path
+    staged: Path
+    strategy: str
+    bytes_copied: int
+    # True when the clip shares its staged file with an earlier clip in the
+    # same list, or the file was already staged by a previous run.
+    reused: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.staged.name
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "source": str(self.source),
+            "staged": str(self.staged),
+            "staged_type": self.strategy,
+            "bytes_copied": self.bytes_copied,
+            "reused": self.reused,
+        }
+
+
+def _temporary_sibling(target: Path) -> Path:
+    fd, name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    os.close(fd)
+    return Path(name)
+
+
+def _symlink(source: Path, target: Path) -> int:
+    os.symlink(source, target)
+    return 0
+
+
+def _hardlink(source: Path, target: Path) -> int:
+    os.link(source, target)
+    return 0
+
+
+def _reflink(source: Path, target: Path) -> int:
+    import fcntl
+
+    tmp = _temporary_sibling(target)
+    try:
+        with source.open("rb") as src, tmp.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        shutil.copystat(source, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return 0
+
+
+def _copy(source: Path, target: Path) -> int:
+    tmp = _temporary_sibling(target)
+    try:
+        shutil.copy2(source, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return os.stat(target).st_size
+
+
+_STAGERS: dict[str, Callable[[Path, Path], int]] = {
+    "symlink": _symlink,
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy": _copy,
+}
+
+
+def _existing_strategy(source: Path, target: Path) -> str | None:
+    """How ``target`` was staged by an earlier run, or None if it is unusable."""
+    if target.is_symlink():
+        return "symlink" if target.exists() and os.path.samefile(target, source) else None
+    if not target.exists():
+        return None
+    if os.path.samefile(target, source):
+        return "hardlink"
+    # Reflinks and copies are written under a temporary name and renamed, so
+    # a file under the fingerprinted name is complete.
+    return "copy" if target.stat().st_size == source.stat().st_size else None
+
+
+def _stage_one(source: Path, target: Path, strategies: tuple[str, ...]) -> StagedClip:
+    existing = _existing_strategy(source, target)
+    if existing is not None:
+        return StagedClip(source, target, existing, 0, reused=True)
+    if os.path.lexists(target):
+        target.unlink()
+
+    failures = []
+    for strategy in strategies:
+        try:
+            copied = _STAGERS[strategy](source, target)
+        except (OSError, ImportError) as exc:
+            failures.append(f"{strategy}: {exc}")
+            continue
+        return StagedClip(source, target, strategy, copied)
+    raise OSError(
+        errno.EIO, f"Could not stage {source} into {target.parent}: {'; '.join(failures)}"
+    )
+
+
+def stage_clips(
+    clip_paths: Iterable[Path],
+    clips_dir: Path,
+    strategies: Iterable[str] = STRATEGIES,
+    workers: int | None = None,
+) -> list[StagedClip]:
+    """Stage ``clip_paths`` into ``clips_dir``, in parallel, one result per input path.
+
+    Each distinct file is staged once under :func:`staged_name`, trying
+    ``strategies`` in order. Files already staged by an earlier run into the
+    same directory are reused.
+    """
+    strategies = tuple(strategies)
+    unknown = [strategy for strategy in strategies if strategy not in _STAGERS]
+    if unknown or not strategies:
+        raise ValueError(f"Unknown staging strategies: {', '.join(unknown) or '(none)'}")
+    clip_paths = list(clip_paths)
+    clips_dir.mkdir(parents=True, exist_ok=True)
+
+    targets = [clips_dir / staged_name(path) for path in clip_paths]
+    unique: dict[Path, Path] = {}
+    for source, target in zip(clip_paths, targets):
+        unique.setdefault(target, source)
+
+    if not unique:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=workers or min(8, len(unique)), thread_name_prefix="stage-clip"
+    ) as pool:
+        staged = dict(
+            zip(
+                unique,
+                pool.map(lambda item: _stage_one(item[1], item[0], strategies), unique.items()),
+            )
+        )
+
+    results: list[StagedClip] = []
+    seen: set[Path] = set()
+    for source, target in zip(clip_paths, targets):
+        clip = staged[target]
+        if target in seen:
+            clip = StagedClip(source, target, clip.strategy, 0, reused=True)
+        seen.add(target)
+        results.append(clip)
+    return results
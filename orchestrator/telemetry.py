@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+# Per-thread CPU where the platform has it, so concurrent stages on other
+# threads do not leak into each other's numbers.
+_THREAD_USAGE = getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)
+
+
+def maxrss_kb(usage: Any) -> int:
+    """``ru_maxrss`` in KiB (macOS reports bytes, Linux KiB)."""
+    return int(usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss)
+
+
+def file_bytes(paths: Iterable[Path | str | None]) -> int:
+    """Total size of the existing files among ``paths``."""
+    total = 0
+    for path in paths:
+        if path is None:
+            continue
+        try:
+            total += os.stat(path).st_size
+        except OSError:
+            pass
+    return total
+
+
+@dataclass
+class Span:
+    """One timed piece of a run.
+
+    ``user_s``/``sys_s`` are CPU spent by the orchestrator thread that ran
+    the span; ``child_*`` come from service calls made inside it (the
+    child's own rusage for subprocesses, the worker's usage delta for warm
+    workers). ``child_peak_rss_kb`` only counts subprocess calls; warm calls
+    raise ``worker_peak_rss_kb``, the lifetime peak of the workers that ran
+    them. ``peak_rss_kb`` is the orchestrator's high-water mark when the
+    span ended.
+    """
+
+    name: str
+    category: str
+    started_at: float
+    thread: str
+    tid: int
+    duration_s: float = 0.0
+    user_s: float = 0.0
+    sys_s: float = 0.0
+    child_user_s: float = 0.0
+    child_sys_s: float = 0.0
+    child_peak_rss_kb: int = 0
+    worker_peak_rss_kb: int = 0
+    peak_rss_kb: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    args: dict[str, Any] = field(default_factory=dict)
+
+    def add_child(
+        self, user_s: float, sys_s: float, max_rss_kb: int, worker_peak_rss_kb: int = 0
+    ) -> None:
+        self.child_user_s += user_s
+        self.child_sys_s += sys_s
+        self.child_peak_rss_kb = max(self.child_peak_rss_kb, max_rss_kb)
+        self.worker_peak_rss_kb = max(self.worker_peak_rss_kb, worker_peak_rss_kb)
+
+
+_TOTALS = (
+    "duration_s",
+    "user_s",
+    "sys_s",
+    "child_user_s",
+    "child_sys_s",
+    "input_bytes",
+    "output_bytes",
+)
+_PEAKS = ("peak_rss_kb", "child_peak_rss_kb", "worker_peak_rss_kb")
+
+
+class Telemetry:
+    """Collects the spans of one job; thread-safe."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", input_bytes: int = 0) -> Iterator[Span]:
+        thread = threading.current_thread()
+        span = Span(
+            name=name,
+            category=category,
+            started_at=time.time(),
+            thread=thread.name,
+            tid=threading.get_native_id(),
+            input_bytes=input_bytes,
+        )
+        usage_before = resource.getrusage(_THREAD_USAGE)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration_s = time.perf_counter() - start
+            usage_after = resource.getrusage(_THREAD_USAGE)
+            span.user_s = usage_after.ru_utime - usage_before.ru_utime
+            span.sys_s = usage_after.ru_stime - usage_before.ru_stime
+            span.peak_rss_kb = maxrss_kb(resource.getrusage(resource.RUSAGE_SELF))
+            with self._lock:
+                self.spans.append(span)
+
+    def wall_s(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def summary(self, categories: Iterable[str] = ("stage", "step")) -> dict[str, dict[str, Any]]:
+        """Spans of ``categories`` aggregated by name, in order of first start.
+
+        Steps are nested inside a stage, so their time is part of the stage's.
+        """
+        wanted = set(categories)
+        with self._lock:
+            spans = sorted(
+                (span for span in self.spans if span.category in wanted),
+                key=lambda span: span.started_at,
+            )
+        stages: dict[str, dict[str, Any]] = {}
+        for span in spans:
+            entry = stages.setdefault(
+                span.name,
+                {"category": span.category, "count": 0, **{key: 0 for key in _TOTALS + _PEAKS}},
+            )
+            entry["count"] += 1
+            for key in _TOTALS:
+                entry[key] += getattr(span, key)
+            for key in _PEAKS:
+                entry[key] = max(entry[key], getattr(span, key))
+        for entry in stages.values():
+            for key in _TOTALS:
+                if isinstance(entry[key], float):
+                    entry[key] = round(entry[key], 6)
+        return stages
+
+    def trace_events(self, pid: int, label: str) -> list[dict[str, Any]]:
+        """Chrome trace-event records for this job: one process, a track per thread."""
+        with self._lock:
+            spans = list(self.spans)
+        events: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}}
+        ]
+        for tid, thread in sorted({(span.tid, span.thread) for span in spans}):
+            events.append(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+            )
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round(span.started_at * 1e6),
+                    "dur": round(span.duration_s * 1e6),
+                    "pid": pid,
+                    "tid": span.tid,
+                    "args": {
+                        "user_s": round(span.user_s, 6),
+                        "sys_s": round(span.sys_s, 6),
+                        "child_user_s": round(span.child_user_s, 6),
+                        "child_sys_s": round(span.child_sys_s, 6),
+                        "child_peak_rss_kb": span.child_peak_rss_kb,
+                        "worker_peak_rss_kb": span.worker_peak_rss_kb,
+                        "peak_rss_kb": span.peak_rss_kb,
+                        "input_bytes": span.input_bytes,
+                        "output_bytes": span.output_bytes,
+                        **span.args,
+                    },
+                }
+            )
+        return events
+
+
+class TraceRecorder:
+    """Gathers the telemetry of every job in a process into one Chrome trace."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._jobs = 0
+
+    def add(self, telemetry: Telemetry, label: str) -> None:
+        with self._lock:
+            self._jobs += 1
+            self._events.extend(telemetry.trace_events(self._jobs, label))
+
+    def write(self, path: Path) -> None:
+        """Write a trace loadable by chrome://tracing and Perfetto."""
+        with self._lock:
+            payload = {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload), encoding="utf-8")
@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .entry import run_entry
+from .profiling import PROFILE_ENV, profile_to
+from .telemetry import maxrss_kb
+
+
+ORCHESTRATOR_ROOT = Path(__file__).resolve().parents[1]
+
+
+@lru_cache(maxsize=None)
+def _env_for(extra_pythonpath: tuple[str, ...]) -> dict[str, str]:
+    env = os.environ.copy()
+    if not extra_pythonpath:
+        return env
+    existing = env.get("PYTHONPATH", "")
+    joined = ":".join(extra_pythonpath)
+    env["PYTHONPATH"] = f"{joined}:{existing}" if existing else joined
+    return env
+
+
+def build_env(extra_pythonpath: Iterable[Path] | None = None) -> dict[str, str]:
+    """Return the child environment for ``extra_pythonpath``.
+
+    Environments are built once per distinct path list and shared, so callers
+    must treat the result as read-only.
+    """
+    return _env_for(tuple(str(path) for path in extra_pythonpath or ()))
+
+
+TAIL_BYTES = 16 * 1024
+
+
+def _tail(handle: Any, limit: int = TAIL_BYTES) -> str:
+    """Return at most the last ``limit`` bytes written to binary ``handle``."""
+    handle.flush()
+    handle.seek(0, os.SEEK_END)
+    size = handle.tell()
+    handle.seek(max(0, size - limit))
+    text = handle.read().decode("utf-8", errors="replace")
+    return f"...{text}" if size > limit else text
+
+
+class _OutputSink:
+    """Destinations for a stage's stdout and stderr.
+
+    Streams named by path are written straight to disk and never held in
+    memory; a stream without a path goes to a temporary file whose contents
+    are handed back by :meth:`captured`. Error messages only ever read a
+    bounded tail of either.
+    """
+
+    def __init__(self, stdout_path: Path | None, stderr_path: Path | None) -> None:
+        self.paths = (stdout_path, stderr_path)
+
+    def __enter__(self) -> "_OutputSink":
+        self.files = []
+        for path in self.paths:
+            if path is None:
+                self.files.append(tempfile.TemporaryFile(mode="w+b"))
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self.files.append(path.open("w+b"))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for handle in self.files:
+            handle.close()
+
+    def captured(self) -> tuple[str, str]:
+        outputs = []
+        for path, handle in zip(self.paths, self.files):
+            if path is not None:
+                outputs.append("")
+                continue
+            handle.flush()
+            handle.seek(0)
+            outputs.append(handle.read().decode("utf-8", errors="replace"))
+        return outputs[0], outputs[1]
+
+    def failure_details(self) -> str:
+        stdout, stderr = (_tail(handle) for handle in self.files)
+        return stderr.strip() or stdout.strip() or "No subprocess output captured."
+
+
+def _run_with_usage(
+    command: list[str],
+    cwd: Path,
+    extra_pythonpath: list[Path] | None,
+    stdout_path: Path | None,
+    stderr_path: Path | None,
+    extra_env: dict[str, str] | None = None,
+) -> tuple[subprocess.CompletedProcess[str], Any]:
+    env = build_env(extra_pythonpath)
+    if extra_env:
+        env = {**env, **extra_env}
+    with _OutputSink(stdout_path, stderr_path) as sink:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=sink.files[0],
+            stderr=sink.files[1],
+            env=env,
+        )
+        usage = None
+        if hasattr(os, "wait4"):
+            # Reaping the child ourselves yields its own rusage, which stays
+            # correct while other stages' children run concurrently.
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"Command failed in {cwd}: {' '.join(command)}\n{sink.failure_details()}"
+            )
+        stdout, stderr = sink.captured()
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr), usage
+
+
+def run_command(
+    command: list[str],
+    cwd: Path,
+    extra_pythonpath: list[Path] | None = None,
+    stdout_path: Path | None = None,
+    stderr_path: Path | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """Run ``command``, streaming stdout/stderr to the given paths when set.
+
+    Streams without a path are captured and returned on the result. A
+    failure raises ``RuntimeError`` carrying the tail of the output.
+    """
+    return _run_with_usage(command, cwd, extra_pythonpath, stdout_path, stderr_path)[0]
+
+
+@dataclass(frozen=True)
+class EntryPoint:
+    """A service entry point that either backend can execute.
+
+    Exactly one of ``module`` (run like ``python -m``) or ``script`` (a path,
+    relative to ``cwd``) must be set. With ``profile`` set, the call runs
+    under cProfile and dumps its stats there.
+    """
+
+    cwd: Path
+    args: tuple[str, ...]
+    module: str | None = None
+    script: str | None = None
+    pythonpath: tuple[Path, ...] = ()
+    profile: Path | None = None
+
+    def describe(self) -> str:
+        target = f"-m {self.module}" if self.module else str(self.script)
+        return " ".join([target, *self.args])
+
+
+@dataclass(frozen=True)
+class EntryResult:
+    """Outcome of one entry point call.
+
+    ``stdout`` and ``stderr`` are empty for streams that were written to a
+    file instead of being captured. ``user_s``/``sys_s`` are the CPU time the
+    call used and ``max_rss_kb`` the peak RSS of the process that ran it.
+    A warm worker outlives its calls, so the peak of one call cannot be told
+    apart from earlier ones: warm calls leave ``max_rss_kb`` at 0 and report
+    the worker's lifetime high-water mark as ``worker_peak_rss_kb``.
+    """
+
+    stdout: str
+    stderr: str
+    backend: str
+    wall_s: float
+    startup_s: float
+    work_s: float
+    user_s: float = 0.0
+    sys_s: float = 0.0
+    max_rss_kb: int = 0
+    worker_peak_rss_kb: int = 0
+
+    def timing(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "wall_s": round(self.wall_s, 6),
+            "startup_s": round(self.startup_s, 6),
+            "work_s": round(self.work_s, 6),
+            "user_s": round(self.user_s, 6),
+            "sys_s": round(self.sys_s, 6),
+            "max_rss_kb": self.max_rss_kb,
+            "worker_peak_rss_kb": self.worker_peak_rss_kb,
+        }
+
+
+class SubprocessBackend:
+    """Runs each entry point in a fresh interpreter via ``orchestrator.entry``."""
+
+    name = "subprocess"
+
+    def run(
+        self,
+        entry: EntryPoint,
+        stdout_path: Path | None = None,
+        stderr_path: Path | None = None,
+    ) -> EntryResult:
+        with tempfile.TemporaryDirectory(prefix="entry-") as tmp:
+            args_path = Path(tmp) / "args.json"
+            timing_path = Path(tmp) / "timing.json"
+            args_path.write_text(json.dumps(list(entry.args)), encoding="utf-8")
+            target = ["--module", entry.module] if entry.module else ["--script", str(entry.script)]
+            command = [
+                sys.executable,
+                "-m",
+                "orchestrator.entry",
+                *target,
+                "--args-file",
+                str(args_path),
+                "--timing-file",
+                str(timing_path),
+            ]
+            launched = time.time()
+            completed, usage = _run_with_usage(
+                command,
+                entry.cwd,
+                [*entry.pythonpath, ORCHESTRATOR_ROOT],
+                stdout_path,
+                stderr_path,
+                {PROFILE_ENV: str(entry.profile)} if entry.profile else None,
+            )
+            wall = time.time() - launched
+            try:
+                marks = json.loads(timing_path.read_text(encoding="utf-8"))
+                startup = max(0.0, marks["started"] - launched)
+                work = max(0.0, marks["finished"] - marks["started"])
+            except (OSError, ValueError, KeyError):
+                startup, work = 0.0, wall
+        return EntryResult(
+            stdout=completed.stdout,
+            stderr=completed.stderr,
+            backend=self.name,
+            wall_s=wall,
+            startup_s=startup,
+            work_s=work,
+            user_s=usage.ru_utime if usage else 0.0,
+            sys_s=usage.ru_stime if usage else 0.0,
+            max_rss_kb=maxrss_kb(usage) if usage else 0,
+        )
+
+    def close(self) -> None:
+        pass
+
+
+def _warm_worker_init(preload: tuple[str, ...], search_path: tuple[str, ...]) -> None:
+    # With the forkserver start method these are already imported in the
+    # server process; under spawn this is where the interpreter gets warmed.
+    for path in search_path:
+        if path not in sys.path:
+            sys.path.append(path)
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError as exc:
+            # Calls into the module still fall back to a subprocess.
+            print(f"warm worker {os.getpid()}: cannot preload {module}: {exc}", file=sys.stderr)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+@contextmanager
+def _redirected_fds(sink: _OutputSink) -> Iterator[None]:
+    """Point file descriptors 1 and 2 at ``sink`` for the duration.
+
+    Redirecting at the descriptor level also captures output from C
+    extensions and from processes the entry point spawns itself.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    os.dup2(sink.files[0].fileno(), 1)
+    os.dup2(sink.files[1].fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved:
+            os.close(fd)
+
+
+def _call_entry(
+    entry: EntryPoint, stdout_path: Path | None = None, stderr_path: Path | None = None
+) -> dict[str, Any]:
+    """Run ``entry`` inside a warm worker and report how it went."""
+    saved_cwd = os.getcwd()
+    saved_path = list(sys.path)
+    saved_argv = list(sys.argv)
+    top_level = (entry.module or "").split(".")[0]
+    returncode = 0
+    fallback = False
+    # Workers run one call at a time, so CPU time deltas belong to this
+    # entry; RUSAGE_CHILDREN covers tools the entry point spawns (e.g.
+    # ffmpeg). ru_maxrss is a high-water mark with no delta, so the RSS
+    # reported is the worker's peak over every call it has run.
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.time()
+    with _OutputSink(stdout_path, stderr_path) as sink:
+        with _redirected_fds(sink):
+            try:
+                os.chdir(entry.cwd)
+                sys.path[:0] = [str(entry.cwd), *(str(path) for path in entry.pythonpath)]
+                script = str(entry.cwd / entry.script) if entry.script else None
+                with warnings.catch_warnings():
+                    # A warm interpreter may already hold the entry module in
+                    # sys.modules; runpy warns before re-executing it as __main__.
+                    warnings.filterwarnings("ignore", category=RuntimeWarning, module="runpy")
+                    with profile_to(entry.profile):
+                        run_entry(entry.module, script, list(entry.args))
+            except SystemExit as exc:
+                if exc.code is None or exc.code == 0:
+                    returncode = 0
+                elif isinstance(exc.code, int):
+                    returncode = exc.code
+                else:
+                    print(exc.code, file=sys.stderr)
+                    returncode = 1
+            except ImportError as exc:
+                missing = exc.__cause__ if isinstance(exc.__cause__, ImportError) else exc
+                if missing.name and top_level and missing.name.split(".")[0] == top_level:
+                    fallback = True
+                traceback.print_exc()
+                returncode = 1
+            except BaseException:
+                traceback.print_exc()
+                returncode = 1
+            finally:
+                os.chdir(saved_cwd)
+                sys.path[:] = saved_path
+                sys.argv[:] = saved_argv
+        finished = time.time()
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        if returncode != 0:
+            stdout, stderr = "", sink.failure_details()
+        else:
+            stdout, stderr = sink.captured()
+    return {
+        "returncode": returncode,
+        "fallback": fallback,
+        "stdout": stdout,
+        "stderr": stderr,
+        "started": started,
+        "finished": finished,
+        "user_s": (self_after.ru_utime - self_before.ru_utime)
+        + (children_after.ru_utime - children_before.ru_utime),
+        "sys_s": (self_after.ru_stime - self_before.ru_stime)
+        + (children_after.ru_stime - children_before.ru_stime),
+        "worker_peak_rss_kb": max(maxrss_kb(self_after), maxrss_kb(children_after)),
+    }
+
+
+class WarmWorkerBackend:
+    """Runs entry points as function calls inside long-lived worker processes.
+
+    Workers are forked from a forkserver that has ``preload`` imported, so
+    each call skips interpreter startup and the service's own imports.
+    ``preload`` should name packages rather than CLI modules, which may parse
+    arguments at import time; ``search_path`` is added to the workers'
+    ``sys.path`` to find them. Entry points whose module cannot be imported
+    in the workers, or calls made after the pool has broken, run through
+    ``fallback`` instead.
+    """
+
+    name = "warm"
+
+    def __init__(
+        self,
+        workers: int,
+        preload: Iterable[str] = (),
+        search_path: Iterable[Path] = (),
+        fallback: SubprocessBackend | None = None,
+    ) -> None:
+        self.fallback = fallback or SubprocessBackend()
+        search = tuple(str(path) for path in search_path)
+        preload = tuple(preload)
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["orchestrator.workers", *preload])
+        else:
+            context = multiprocessing.get_context("spawn")
+        self._pool: ProcessPoolExecutor | None = ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            mp_context=context,
+            initializer=_warm_worker_init,
+            initargs=(preload, search),
+        )
+        # A forkserver takes the sys.path of the process that starts it, and
+        # needs the search path to import ``preload``; lend it ours only
+        # while the workers start.
+        saved_path = list(sys.path)
+        sys.path.extend(path for path in search if path not in saved_path)
+        # Start every worker now so the first stage does not pay for it.
+        try:
+            for future in [self._pool.submit(_ping) for _ in range(max(1, workers))]:
+                future.result()
+        except BrokenProcessPool:
+            self._pool.shutdown()
+            self._pool = None
+        finally:
+            sys.path[:] = saved_path
+
+    def run(
+        self,
+        entry: EntryPoint,
+        stdout_path: Path | None = None,
+        stderr_path: Path | None = None,
+    ) -> EntryResult:
+        if self._pool is None:
+            return self.fallback.run(entry, stdout_path, stderr_path)
+        submitted = time.time()
+        try:
+            outcome = self._pool.submit(_call_entry, entry, stdout_path, stderr_path).result()
+        except BrokenProcessPool:
+            self._pool = None
+            return self.fallback.run(entry, stdout_path, stderr_path)
+        if outcome["fallback"]:
+            return self.fallback.run(entry, stdout_path, stderr_path)
+        if outcome["returncode"] != 0:
+            raise RuntimeError(
+                f"Command failed in {entry.cwd}: {entry.describe()}\n{outcome['stderr']}"
+            )
+        return EntryResult(
+            stdout=outcome["stdout"],
+            stderr=outcome["stderr"],
+            backend=self.name,
+            wall_s=time.time() - submitted,
+            startup_s=max(0.0, outcome["started"] - submitted),
+            work_s=max(0.0, outcome["finished"] - outcome["started"]),
+            user_s=outcome["user_s"],
+            sys_s=outcome["sys_s"],
+            worker_peak_rss_kb=outcome["worker_peak_rss_kb"],
+        )
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -3,220 +3,389 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import shutil
-import subprocess
 import sys
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-
-REPO_ROOT = Path(__file__).resolve().parent
-SERVICES_DIR = REPO_ROOT / "services"
-ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
-
-
-def _ensure_paths() -> None:
-    if str(ENGINE_CONTRACTS_SRC) not in sys.path:
-        sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
-
-    planner_src = SERVICES_DIR / "montage-planner" / "src"
-    if str(planner_src) not in sys.path:
-        sys.path.insert(0, str(planner_src))
-
-
-def _build_env(extra_pythonpath: list[Path] | None = None) -> dict[str, str]:
-    env = os.environ.copy()
-    if not extra_pythonpath:
-        return env
-    existing = env.get("PYTHONPATH", "")
-    joined = ":".join(str(path) for path in extra_pythonpath)
-    env["PYTHONPATH"] = f"{joined}:{existing}" if existing else joined
-    return env
-
-
-def _run_command(
-    command: list[str], cwd: Path, extra_pythonpath: list[Path] | None = None
-) -> subprocess.CompletedProcess[str]:
-    try:
-        return subprocess.run(
-            command,
-            cwd=cwd,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=_build_env(extra_pythonpath),
+from orchestrator import ArtifactCache, PipelineContext, PipelineJob, run_job
+from orchestrator.batch import load_jobs, run_batch
+from orchestrator.cache import DEFAULT_MAX_BYTES, default_cache_dir
+from orchestrator.pipeline import (
+    REPO_ROOT,
+    WARM_PRELOAD,
+    WARM_SEARCH_PATH,
+    write_json,
+)
+from orchestrator.scheduler import ResourcePool, detect_memory_mb
+from orchestrator.segments import SEGMENT_SECONDS
+from orchestrator.server import PipelineServer
+from orchestrator.telemetry import TraceRecorder
+from orchestrator.workers import SubprocessBackend, WarmWorkerBackend
+
+
+def _build_parser(serve: bool = False) -> argparse.ArgumentParser:
+    """The command line for one run or batch, or with ``serve`` for the server."""
+    if serve:
+        parser = argparse.ArgumentParser(
+            prog="run_pipeline.py serve",
+            description="Run montage jobs submitted over a local HTTP API.",
         )
-    except subprocess.CalledProcessError as exc:
-        stderr = exc.stderr.strip() if exc.stderr else ""
-        stdout = exc.stdout.strip() if exc.stdout else ""
-        details = stderr or stdout or "No subprocess output captured."
-        raise RuntimeError(
-            f"Command failed in {cwd}: {' '.join(command)}\n{details}"
-        ) from exc
-
-
-def _build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Run all four montage phases in one command.")
-    parser.add_argument("--clips", nargs="+", required=True, help="Input clip file paths.")
-    parser.add_argument("--music", required=True, help="Input music file path.")
+        _add_serve_arguments(parser)
+    else:
+        parser = argparse.ArgumentParser(
+            description="Run all four montage phases in one command."
+        )
+        parser.add_argument("--clips", nargs="+", help="Input clip file paths.")
+        parser.add_argument("--music", help="Input music file path.")
+        parser.add_argument(
+            "--jobs",
+            help=(
+                "JSON-lines file of jobs to run as one batch instead of --clips/--music. "
+                'Each line holds "clips", "music", "run_dir" and optionally "output" '
+                'and "planner_compat_mode".'
+            ),
+        )
+        parser.add_argument(
+            "--run-dir",
+            default=str(
+                REPO_ROOT / "runs" / datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            ),
+            help="Output run directory.",
+        )
+        parser.add_argument(
+            "--output",
+            default="final.mp4",
+            help="Final rendered output filename (inside run-dir unless absolute).",
+        )
+    parser.add_argument(
+        "--planner-compat-mode",
+        action="store_true",
+        help="Enable planner compatibility mode for legacy contracts.",
+    )
     parser.add_argument(
-        "--run-dir",
-        default=str(REPO_ROOT / "runs" / datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")),
-        help="Output run directory.",
+        "--cache-dir",
+        default=str(default_cache_dir()),
+        help="Persistent analysis cache directory.",
     )
     parser.add_argument(
-        "--output",
-        default="final.mp4",
-        help="Final rendered output filename (inside run-dir unless absolute).",
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size.",
     )
     parser.add_argument(
-        "--planner-compat-mode",
+        "--no-cache",
         action="store_true",
-        help="Enable planner compatibility mode for legacy contracts.",
+        help="Always run the analyzers instead of reusing cached results.",
+    )
+    parser.add_argument(
+        "--clip-workers",
+        type=int,
+        default=1,
+        help="Split clip analysis into this many analyzer processes running in parallel.",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["subprocess", "warm"],
+        default="subprocess",
+        help=(
+            "How service stages run: a fresh interpreter per stage, or function calls "
+            "in pre-warmed worker processes (falls back to subprocess when unavailable)."
+        ),
+    )
+    parser.add_argument(
+        "--warm-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of pre-warmed worker processes for --executor warm.",
+    )
+    parser.add_argument(
+        "--warm-preload",
+        nargs="*",
+        default=WARM_PRELOAD,
+        help="Modules imported once into every warm worker.",
+    )
+    parser.add_argument(
+        "--music-sidecar",
+        action="store_true",
+        help="Also write music-analysis.columns, a memory-mappable copy of the beat data.",
+    )
+    parser.add_argument(
+        "--artifact-codec",
+        choices=["json", "gzip", "lzma"],
+        default="json",
+        help=(
+            "Encoding of clip-analysis and music-analysis artifacts: compact JSON, or JSON "
+            "compressed with gzip (.gz) or xz (.xz). Readers detect the encoding."
+        ),
+    )
+    parser.add_argument(
+        "--render-chunks",
+        type=int,
+        default=1,
+        help=(
+            "Split the timeline into this many song-time chunks on entry boundaries, "
+            "render them in parallel and join them with ffmpeg."
+        ),
+    )
+    parser.add_argument(
+        "--incremental-render",
+        action="store_true",
+        help=(
+            "Render the timeline in segments kept in render-segments/ of the run directory "
+            "and re-render only the segments whose entries changed since the last render "
+            "there; --render-chunks bounds how many render at once."
+        ),
+    )
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=SEGMENT_SECONDS,
+        help="Song time per segment for --incremental-render.",
     )
+    parser.add_argument(
+        "--full-hash",
+        action="store_true",
+        help=(
+            "Identify cached inputs by a SHA-256 of the whole file instead of sampled blocks."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Write cProfile stats of in-process steps and service calls to profiles/ in the "
+            "run directory and summarize them in the manifest."
+        ),
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="CPU slots shared by all stages of a --jobs batch or the server.",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=detect_memory_mb() * 3 // 4,
+        help="Memory budget shared by all stages of a --jobs batch or the server.",
+    )
+    if not serve:
+        parser.add_argument(
+            "--batch-summary",
+            help=(
+                "Where to write the --jobs summary "
+                "(default: batch-summary.json next to the jobs file)."
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Reuse the artifacts of stages whose inputs, arguments and service versions are "
+                "unchanged since the last run into the same --run-dir."
+            ),
+        )
+        parser.add_argument(
+            "--preview",
+            action="store_true",
+            help=(
+                "Render a quick low-resolution preview.mp4 from cached proxies of the clips "
+                "instead of the final output, reusing analysis and the timeline of earlier "
+                "runs into the same --run-dir. Run again without it for the full render."
+            ),
+        )
+        parser.add_argument(
+            "--trace",
+            help=(
+                "Write a Chrome trace-event file of every stage "
+                "(open in chrome://tracing or Perfetto)."
+            ),
+        )
     return parser
 
 
-def _write_json(path: Path, payload: Any) -> None:
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+def _add_serve_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument(
+        "--spool-dir",
+        default=str(REPO_ROOT / "runs" / "server"),
+        help="Where queued job records and default run directories are kept.",
+    )
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        default=2,
+        help="Jobs run at once; their stages still share --max-workers CPU slots.",
+    )
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=64,
+        help="Waiting jobs beyond which submissions are refused with HTTP 429.",
+    )
+    parser.add_argument(
+        "--keep-finished",
+        type=int,
+        default=1000,
+        help="Succeeded/failed job records kept in the spool; older ones are deleted.",
+    )
+    parser.add_argument(
+        "--stage-limit",
+        action="append",
+        default=[],
+        metavar="STAGE=N",
+        help="At most N concurrent calls of STAGE across jobs, e.g. render=1 (repeatable).",
+    )
 
 
-def _stage_clips_for_render(
-    clip_paths: list[Path], run_dir: Path
-) -> tuple[dict[str, str], list[dict[str, str]]]:
-    clips_dir = run_dir / "clips"
-    clips_dir.mkdir(parents=True, exist_ok=True)
+def _parse_stage_limits(
+    parser: argparse.ArgumentParser, values: list[str]
+) -> dict[str, int]:
+    limits: dict[str, int] = {}
+    for value in values:
+        stage, _, limit = value.partition("=")
+        if not limit.isdigit() or int(limit) < 1:
+            parser.error(f"--stage-limit expects STAGE=N with N >= 1, got {value!r}.")
+        limits[stage] = int(limit)
+    return limits
+
+
+def _build_backend(args: argparse.Namespace) -> SubprocessBackend | WarmWorkerBackend:
+    if args.executor == "warm":
+        return WarmWorkerBackend(
+            workers=args.warm_workers,
+            preload=args.warm_preload,
+            search_path=WARM_SEARCH_PATH,
+        )
+    return SubprocessBackend()
 
-    file_name_counts: dict[str, int] = {}
-    remap: dict[str, str] = {}
-    artifacts: list[dict[str, str]] = []
 
-    duplicate_names = {path.name for path in clip_paths if sum(1 for p in clip_paths if p.name == path.name) > 1}
-    if duplicate_names:
-        duplicates = ", ".join(sorted(duplicate_names))
-        raise ValueError(
-            f"Duplicate clip filenames are not supported by current planner contract: {duplicates}"
+def _build_context(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, **options: Any
+) -> PipelineContext:
+    """Build the pipeline context from the shared options; invalid ones exit via ``parser``."""
+    backend = _build_backend(args)
+    try:
+        return PipelineContext(
+            backend,
+            clip_workers=args.clip_workers,
+            music_sidecar=args.music_sidecar,
+            artifact_codec=args.artifact_codec,
+            render_chunks=args.render_chunks,
+            incremental_render=args.incremental_render,
+            segment_seconds=args.segment_seconds,
+            profile=args.profile,
+            full_hash=args.full_hash,
+            **options,
         )
+    except ValueError as exc:
+        # Warm workers are already running; do not leave them behind.
+        backend.close()
+        parser.error(str(exc))
+
+
+def serve(argv: list[str]) -> int:
+    parser = _build_parser(serve=True)
+    args = parser.parse_args(argv)
+    cache = None
+    if not args.no_cache:
+        cache = ArtifactCache(Path(args.cache_dir).expanduser(), args.cache_max_mb * 1024 * 1024)
+    context = _build_context(
+        parser,
+        args,
+        cache=cache,
+        resources=ResourcePool(args.max_workers, args.memory_budget_mb),
+        stage_limits=_parse_stage_limits(parser, args.stage_limit),
+    )
+    server = PipelineServer(
+        context,
+        Path(args.spool_dir).expanduser().resolve(),
+        host=args.host,
+        port=args.port,
+        job_workers=args.job_workers,
+        max_queued=args.max_queued,
+        keep_finished=args.keep_finished,
+    )
+    server.start()
+    host, port = server.address
+    print(f"Serving on http://{host}:{port} (spool {server.spool_dir})", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        context.close()
+    return 0
 
-    for clip_path in clip_paths:
-        stem = clip_path.stem
-        suffix = clip_path.suffix
-        occurrence = file_name_counts.get(clip_path.name, 0)
-        file_name_counts[clip_path.name] = occurrence + 1
-        if occurrence == 0:
-            staged_name = clip_path.name
-        else:
-            staged_name = f"{stem}_{occurrence}{suffix}"
-
-        staged_path = clips_dir / staged_name
-        if staged_path.exists():
-            staged_path.unlink()
 
-        try:
-            staged_path.symlink_to(clip_path)
-            staged_type = "symlink"
-        except OSError:
-            shutil.copy2(clip_path, staged_path)
-            staged_type = "copy"
-
-        remap[clip_path.name] = f"clips/{staged_name}"
-        artifacts.append(
-            {
-                "source": str(clip_path),
-                "staged": str(staged_path),
-                "staged_type": staged_type,
-            }
-        )
+def main() -> int:
+    if sys.argv[1:2] == ["serve"]:
+        return serve(sys.argv[2:])
+    parser = _build_parser()
+    args = parser.parse_args()
+    if not args.jobs and not (args.clips and args.music):
+        parser.error("--clips and --music are required unless --jobs is given.")
 
-    return remap, artifacts
+    cache = None
+    if not args.no_cache:
+        cache = ArtifactCache(Path(args.cache_dir).expanduser(), args.cache_max_mb * 1024 * 1024)
 
+    trace = TraceRecorder() if args.trace else None
 
-def main() -> int:
-    args = _build_parser().parse_args()
-    _ensure_paths()
-
-    from engine_contracts.validators import (
-        validate_clip_analysis_payload,
-        validate_music_analysis_payload,
-        validate_timeline_payload,
-    )
-    from montage_planner import MontagePlanner
-
-    clip_paths = [Path(clip).expanduser().resolve() for clip in args.clips]
-    music_path = Path(args.music).expanduser().resolve()
-    run_dir = Path(args.run_dir).resolve()
-    run_dir.mkdir(parents=True, exist_ok=True)
-
-    clip_analysis_path = run_dir / "clip-analysis.json"
-    music_analysis_path = run_dir / "music-analysis.json"
-    timeline_path = run_dir / "timeline.json"
-    manifest_path = run_dir / "run-manifest.json"
-    final_output = Path(args.output)
-    if not final_output.is_absolute():
-        final_output = run_dir / final_output
-
-    clip_analyzer_cwd = SERVICES_DIR / "val-content-engine"
-    clip_command = [
-        sys.executable,
-        "-m",
-        "val_content_engine.cli",
-        *(str(path) for path in clip_paths),
-        "--output",
-        str(clip_analysis_path),
-    ]
-    _run_command(
-        clip_command,
-        cwd=clip_analyzer_cwd,
-        extra_pythonpath=[clip_analyzer_cwd / "src", ENGINE_CONTRACTS_SRC],
-    )
-
-    clip_payload = json.loads(clip_analysis_path.read_text(encoding="utf-8"))
-    validate_clip_analysis_payload(clip_payload, strict=False)
-
-    music_cwd = SERVICES_DIR / "music-analyzer"
-    music_command = [sys.executable, "main.py", "--song", str(music_path)]
-    music_result = _run_command(music_command, cwd=music_cwd)
-    music_payload = json.loads(music_result.stdout)
-    _write_json(music_analysis_path, music_payload)
-    validate_music_analysis_payload(music_payload, strict=False)
-
-    planner = MontagePlanner(compat_mode=args.planner_compat_mode)
-    timeline_payload = planner.build_timeline(clips=clip_payload, music_data=music_payload)
-    clip_remap, staged_clip_artifacts = _stage_clips_for_render(clip_paths, run_dir)
-    for entry in timeline_payload.get("timeline", []):
-        clip_id = entry.get("clip_id")
-        if clip_id in clip_remap:
-            entry["clip_id"] = clip_remap[clip_id]
-    _write_json(timeline_path, timeline_payload)
-    validate_timeline_payload(timeline_payload, strict=True)
-
-    render_cwd = SERVICES_DIR / "render-engine"
-    render_command = [
-        sys.executable,
-        "-m",
-        "render_engine.cli",
-        "--timeline",
-        str(timeline_path),
-        "--music",
-        str(music_path),
-        "--output",
-        str(final_output),
-    ]
-    _run_command(render_command, cwd=render_cwd, extra_pythonpath=[ENGINE_CONTRACTS_SRC])
-
-    manifest = {
-        "run_started_at": datetime.now(timezone.utc).isoformat(),
-        "artifacts": {
-            "clip_analysis": str(clip_analysis_path),
-            "music_analysis": str(music_analysis_path),
-            "timeline": str(timeline_path),
-            "final_output": str(final_output),
-            "staged_clips": staged_clip_artifacts,
-        },
-        "planner_compat_mode": bool(args.planner_compat_mode),
-    }
-    _write_json(manifest_path, manifest)
+    if args.jobs:
+        jobs_path = Path(args.jobs).expanduser()
+        try:
+            jobs = load_jobs(jobs_path, planner_compat_mode=args.planner_compat_mode)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        resources = ResourcePool(args.max_workers, args.memory_budget_mb)
+        context = _build_context(
+            parser,
+            args,
+            cache=cache,
+            resources=resources,
+            trace=trace,
+            resume=args.resume,
+            preview=args.preview,
+        )
+        try:
+            # Twice as many jobs as CPU slots are in flight so one job's analysis
+            # can overlap another's render; the resource pool bounds actual work.
+            summary = run_batch(jobs, context, max_parallel_jobs=2 * resources.cpu_slots)
+        finally:
+            context.close()
+            if trace is not None:
+                trace.write(Path(args.trace).expanduser())
+        summary_path = (
+            Path(args.batch_summary).expanduser()
+            if args.batch_summary
+            else jobs_path.resolve().parent / "batch-summary.json"
+        )
+        write_json(summary_path, summary)
+        print(json.dumps(summary, indent=2))
+        return 0 if summary["failed"] == 0 else 1
+
+    job = PipelineJob.create(
+        clips=args.clips,
+        music=args.music,
+        run_dir=args.run_dir,
+        output=args.output,
+        planner_compat_mode=args.planner_compat_mode,
+    )
+    context = _build_context(
+        parser, args, cache=cache, trace=trace, resume=args.resume, preview=args.preview
+    )
+    try:
+        manifest = run_job(job, context)
+    finally:
+        context.close()
+        if trace is not None:
+            trace.write(Path(args.trace).expanduser())
     print(json.dumps(manifest, indent=2))
     return 0
 
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LOADTEST_DIR = REPO_ROOT / "loadtest"
+if str(LOADTEST_DIR) not in sys.path:
+    sys.path.insert(0, str(LOADTEST_DIR))
+
+from run_loadtest import prepare_media, stub_env
+
+# Writes its last argument, like every ffmpeg command the orchestrator runs.
+FAKE_FFMPEG = """#!{python}
+import sys
+from pathlib import Path
+Path(sys.argv[-1]).write_bytes(b"\\0" * 512)
+"""
+
+
+class StubPipeline:
+    """Runs ``run_pipeline.py`` against the stub services and a fake ffmpeg.
+
+    Every run uses the same clips, song and ``run_dir``; call it with extra
+    command-line arguments and stub knobs, and it returns the manifest.
+    """
+
+    def __init__(self, tmp_path: Path, clips: int = 3) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        ffmpeg = bin_dir / "ffmpeg"
+        ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable), encoding="utf-8")
+        ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IXUSR)
+        self.path = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+        self.clips, self.song = prepare_media(tmp_path / "media", clips)
+        self.run_dir = tmp_path / "run"
+
+    def __call__(self, *args: str, **knobs: Any) -> dict[str, Any]:
+        env = stub_env({"SEGMENTS": 3, "OUTPUT_KB": 1, **knobs})
+        env["PATH"] = self.path
+        command = [
+            sys.executable,
+            str(REPO_ROOT / "run_pipeline.py"),
+            "--clips",
+            *map(str, self.clips),
+            "--music",
+            str(self.song),
+            "--run-dir",
+            str(self.run_dir),
+            "--no-cache",
+            *args,
+        ]
+        subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, capture_output=True)
+        return json.loads((self.run_dir / "run-manifest.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def stub_pipeline(tmp_path: Path) -> StubPipeline:
+    return StubPipeline(tmp_path)
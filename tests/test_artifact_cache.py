@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.cache import ArtifactCache
+
+
+def test_cache_round_trip_counts_hits_and_misses(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    key = ArtifactCache.key("digest", "clip.mp4", {"service": "val-content-engine"}, "2.0.0")
+
+    assert cache.get("clip_analysis", key) is None
+    cache.put("clip_analysis", key, {"clip_id": "clip.mp4", "duration": 10.0})
+    assert cache.get("clip_analysis", key) == {"clip_id": "clip.mp4", "duration": 10.0}
+    assert cache.stats() == {"clip_analysis": {"hits": 1, "misses": 1}}
+    assert key != ArtifactCache.key("digest", "clip.mp4", {"service": "val-content-engine"}, "3.0.0")
+
+
+def test_prune_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    payload = {"beats": [0.5] * 100}
+    for idx, name in enumerate(["old", "recent", "newest"]):
+        cache.put("music_analysis", ArtifactCache.key(name), payload)
+        entry = next(tmp_path.glob(f"*/*/{ArtifactCache.key(name)}.json"))
+        os.utime(entry, (1000 + idx, 1000 + idx))
+    entry_size = next(tmp_path.glob("*/*/*.json")).stat().st_size
+
+    cache.max_bytes = entry_size * 2
+    assert cache.prune() == entry_size
+    assert cache.get("music_analysis", ArtifactCache.key("old")) is None
+    assert cache.get("music_analysis", ArtifactCache.key("newest")) == payload
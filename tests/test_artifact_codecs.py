@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import (
+    CODECS,
+    artifact_path,
+    iter_clip_analysis,
+    open_artifact,
+    read_artifact,
+    write_artifact,
+)
+from engine_contracts.codecs import detect_codec
+
+
+CLIP_PAYLOAD = [
+    {
+        "schema_version": "2.0.0",
+        "clip_id": f"clip_{idx}.mp4",
+        "duration": 12.5,
+        "intensity_segments": [
+            {"start": 1.0, "end": 2.0, "intensity_score": 0.5, "spike_count": 1,
+             "cluster_density": 0.25}
+        ] * 20,
+    }
+    for idx in range(30)
+]
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_artifacts_round_trip_and_readers_detect_the_codec(codec: str, tmp_path: Path) -> None:
+    path = artifact_path(tmp_path / "clip-analysis.json", codec)
+
+    stats = write_artifact(path, CLIP_PAYLOAD, codec)
+
+    assert path.name == "clip-analysis.json" + {"json": "", "gzip": ".gz", "lzma": ".xz"}[codec]
+    assert stats.codec == codec and stats.bytes == path.stat().st_size
+    assert detect_codec(path.read_bytes()[:8]) == codec
+    assert read_artifact(path) == CLIP_PAYLOAD
+    with open_artifact(path) as handle:
+        assert handle.read(1) == "["
+    assert list(iter_clip_analysis(path, chunk_size=256)) == CLIP_PAYLOAD
+    assert os.listdir(tmp_path) == [path.name]
+
+
+def test_compact_json_is_smaller_than_indented_and_compression_smaller_still(
+    tmp_path: Path,
+) -> None:
+    sizes = {
+        "indented": write_artifact(tmp_path / "a.json", CLIP_PAYLOAD, "json", indent=2).bytes,
+        **{
+            codec: write_artifact(tmp_path / codec, CLIP_PAYLOAD, codec).bytes
+            for codec in CODECS
+        },
+    }
+
+    assert sizes["indented"] > sizes["json"] > sizes["gzip"]
+    assert sizes["json"] > sizes["lzma"]
+
+
+def test_failed_write_keeps_the_previous_artifact(tmp_path: Path) -> None:
+    path = tmp_path / "music-analysis.json"
+    write_artifact(path, {"song": "a.mp3"})
+
+    with pytest.raises(TypeError):
+        write_artifact(path, {"song": object()})
+    with pytest.raises(ValueError, match="zstd"):
+        write_artifact(path, {"song": "b.mp3"}, "zstd")
+
+    assert read_artifact(path) == {"song": "a.mp3"}
+    assert os.listdir(tmp_path) == [path.name]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.batch import load_jobs
+from orchestrator.pipeline import PipelineContext
+from orchestrator.scheduler import ResourcePool
+
+
+def test_load_jobs_resolves_paths_against_the_jobs_file(tmp_path: Path) -> None:
+    jobs_path = tmp_path / "jobs.jsonl"
+    jobs_path.write_text(
+        json.dumps({"clips": ["a.mp4"], "music": "/songs/song.mp3", "run_dir": "runs/one"})
+        + "\n\n"
+        + json.dumps(
+            {
+                "clips": ["b.mp4"],
+                "music": "song.mp3",
+                "run_dir": "runs/two",
+                "output": "/out/two.mp4",
+                "planner_compat_mode": True,
+            }
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    first, second = load_jobs(jobs_path)
+
+    assert first.clips == (tmp_path / "a.mp4",)
+    assert first.output == tmp_path / "runs" / "one" / "final.mp4"
+    assert not first.planner_compat_mode
+    assert second.music == tmp_path / "song.mp3"
+    assert second.output == Path("/out/two.mp4")
+    assert second.planner_compat_mode
+
+    jobs_path.write_text(json.dumps({"clips": ["a.mp4"], "music": "song.mp3"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="run_dir"):
+        load_jobs(jobs_path)
+
+    jobs_path.write_text(
+        json.dumps({"clips": ["a.mp4"], "music": "song.mp3", "run_dir": "runs/one"})
+        + "\n"
+        + json.dumps({"clips": ["b.mp4"], "music": "song.mp3", "run_dir": "./runs/one/"})
+        + "\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match=r"jobs.jsonl:2 run_dir .* line 1"):
+        load_jobs(jobs_path)
+
+
+def test_resource_pool_bounds_concurrent_memory() -> None:
+    pool = ResourcePool(cpu_slots=4, memory_mb=1000)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work() -> None:
+        nonlocal active, peak
+        with pool.acquire(cpu=1, memory_mb=600):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 1
+    assert pool.wait_stats()["acquisitions"] == 3
+    with pool.acquire(cpu=16, memory_mb=10_000) as waited:
+        assert waited >= 0.0
+
+
+def test_shared_results_are_computed_once_per_key() -> None:
+    context = PipelineContext()
+    calls: list[str] = []
+
+    def compute() -> dict:
+        calls.append("song.mp3")
+        time.sleep(0.02)
+        return {"song": "song.mp3"}
+
+    threads = [
+        threading.Thread(target=context.shared, args=(("music_analysis", "song.mp3"), compute))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["song.mp3"]
+    assert context.shared(("music_analysis", "song.mp3"), compute) == {"song": "song.mp3"}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import BeatGrid, MusicAnalysis, load_music_columns, write_music_columns
+from engine_contracts import models
+
+
+MUSIC_PAYLOAD = {
+    "schema_version": "2.0.0",
+    "song": "song.mp3",
+    "song_duration": 10.0,
+    "tempo": 120.0,
+    "beat_count": 9,
+    "beats": [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5],
+    "beat_strength": [
+        {"time": 0.5, "strength": 0.2},
+        {"time": 1.0, "strength": 0.4},
+        {"time": 1.5, "strength": 0.6},
+        {"time": 2.0, "strength": 1.0},
+    ],
+    "drop_sections": [
+        {"start": 6.0, "end": 8.0, "energy_score": 0.9},
+        {"start": 1.0, "end": 5.0, "energy_score": 0.5},
+        {"start": 2.0, "end": 3.0, "energy_score": 0.7},
+    ],
+}
+
+
+def test_music_analysis_builds_its_grid_once_and_answers_single_queries() -> None:
+    analysis = MusicAnalysis.from_dict(MUSIC_PAYLOAD)
+    grid = analysis.beat_grid
+
+    assert analysis.beat_grid is grid
+    assert grid.nearest_beat(1.2) == 1.0
+    assert grid.nearest_beat(1.25) == 1.0
+    assert grid.nearest_beat(-3.0) == 0.5
+    assert grid.nearest_beat(99.0) == 4.5
+    assert grid.next_beat(1.01) == 1.5
+    assert grid.next_downbeat(0.5) == 0.5
+    assert grid.next_downbeat(0.6) == 2.5
+    assert grid.next_downbeat(4.6) is None
+    assert grid.beats_between(1.0, 2.5) == [1.0, 1.5, 2.0]
+    assert grid.strength_at(1.7) == 0.6
+    assert grid.mean_strength(1.0, 2.01) == pytest.approx((0.4 + 0.6 + 1.0) / 3)
+    assert grid.mean_strength(5.0, 6.0) == 0.0
+    assert grid.in_drop(4.9) and not grid.in_drop(5.0) and grid.in_drop(6.0)
+    assert grid.drop_at(2.5).energy_score == 0.7
+    assert grid.drop_at(3.5).energy_score == 0.5
+    assert grid.drop_at(0.9) is None
+    assert BeatGrid([]).nearest_beat(1.0) is None
+
+
+def test_grid_over_columnar_analysis_matches_json_analysis(tmp_path: Path) -> None:
+    path = tmp_path / "music.columns"
+    write_music_columns(MUSIC_PAYLOAD, path)
+
+    mapped = load_music_columns(path).beat_grid
+    parsed = MusicAnalysis.from_dict(MUSIC_PAYLOAD).beat_grid
+
+    assert mapped.beats == parsed.beats
+    assert mapped.mean_strength(0.0, 10.0) == parsed.mean_strength(0.0, 10.0)
+    assert mapped.drop_sections == parsed.drop_sections
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_batch_queries_match_single_queries(numpy: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    if numpy and models._np is None:
+        pytest.skip("NumPy is not installed")
+    if not numpy:
+        monkeypatch.setattr(models, "_np", None)
+    grid = MusicAnalysis.from_dict(MUSIC_PAYLOAD).beat_grid
+    rng = random.Random(3)
+    times = [rng.uniform(-1.0, 11.0) for _ in range(200)] + [1.25, 5.0, 6.0]
+    ends = [time + rng.uniform(0.0, 2.0) for time in times]
+
+    assert list(grid.nearest_beats(times)) == [grid.nearest_beat(t) for t in times]
+    assert list(grid.mean_strengths(times, ends)) == pytest.approx(
+        [grid.mean_strength(s, e) for s, e in zip(times, ends)]
+    )
+    assert [bool(hit) for hit in grid.in_drops(times)] == [grid.in_drop(t) for t in times]
+    with pytest.raises(ValueError):
+        BeatGrid([]).nearest_beats([1.0])
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import SCHEMA_VERSION, ClipAnalysis
+from engine_contracts.streaming import iter_clip_analysis
+
+
+def _items(count: int) -> list[dict]:
+    return [
+        {
+            "schema_version": SCHEMA_VERSION,
+            "clip_id": f"clip{idx}.mp4",
+            "duration": 10.0 + idx,
+            "intensity_segments": [
+                {"start": 1.0, "end": 2.5, "intensity_score": 0.123456789, "spike_count": 12}
+            ]
+            * (idx % 4),
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 65536])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_items_round_trip_across_chunk_boundaries(chunk_size: int, indent: int | None) -> None:
+    items = _items(25)
+    text = json.dumps(items, indent=indent)
+
+    assert list(iter_clip_analysis(io.StringIO(text), chunk_size=chunk_size)) == items
+
+
+def test_reads_paths_and_yields_models(tmp_path: Path) -> None:
+    path = tmp_path / "clip-analysis.json"
+    path.write_text(json.dumps(_items(3)), encoding="utf-8")
+
+    models = list(iter_clip_analysis(path, as_model=True))
+
+    assert all(isinstance(model, ClipAnalysis) for model in models)
+    assert [model.clip_id for model in models] == ["clip0.mp4", "clip1.mp4", "clip2.mp4"]
+    assert list(iter_clip_analysis(io.StringIO(" [ ] "))) == []
+
+
+def test_validation_errors_name_the_item_and_follow_the_mode() -> None:
+    items = _items(3)
+    items[2]["schema_version"] = "0.0"
+    text = json.dumps(items)
+
+    stream = iter_clip_analysis(io.StringIO(text), chunk_size=8)
+    assert next(stream) == items[0]
+    assert next(stream) == items[1]
+    with pytest.raises(ValueError, match="item 2 schema_version"):
+        next(stream)
+
+    assert len(list(iter_clip_analysis(io.StringIO(text), strict=False))) == 3
+    with pytest.raises(ValueError, match="item 1 missing clip_id/clip alias"):
+        list(iter_clip_analysis(io.StringIO('[{"clip": "a"}, {"duration": 1}]'), strict=False))
+
+
+@pytest.mark.parametrize(
+    ("text", "message"),
+    [
+        ('{"clip": "a"}', "must be a list"),
+        ('[{"clip": "a"},', "item 1 is truncated"),
+        ('[{"clip": "a"}, {"clip": ', "item 1 is not valid JSON"),
+        ('[{"clip": "a"} {"clip": "b"}]', "item 0 is not followed"),
+        ('[{"clip": "a"}] []', "trailing data"),
+    ],
+)
+def test_malformed_input_is_reported(text: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        list(iter_clip_analysis(io.StringIO(text), strict=False, chunk_size=4))
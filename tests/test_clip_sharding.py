@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.pipeline import _match_clip_items, _shard
+
+
+def test_shards_are_contiguous_and_preserve_input_order() -> None:
+    paths = [Path(f"/clips/clip{idx}.mp4") for idx in range(7)]
+
+    batches = _shard(paths, 3)
+
+    assert [len(batch) for batch in batches] == [3, 2, 2]
+    assert [path for batch in batches for path in batch] == paths
+    assert _shard(paths[:2], 8) == [[paths[0]], [paths[1]]]
+
+
+def test_analyzer_items_are_matched_back_to_their_clips() -> None:
+    paths = [Path("/a/intro.mp4"), Path("/b/outro.mp4")]
+    items = [{"clip_id": "outro.mp4"}, {"clip": "intro.mp4"}]
+
+    assert _match_clip_items(paths, items) == [{"clip": "intro.mp4"}, {"clip_id": "outro.mp4"}]
+
+
+def test_unmatched_clips_only_take_unclaimed_items() -> None:
+    paths = [Path("/a/intro.mp4"), Path("/a/middle.mp4"), Path("/a/outro.mp4")]
+    items = [{"clip": "renamed.mp4"}, {"clip": "intro.mp4"}, {"clip": "middle.mp4"}]
+
+    # outro.mp4's own position holds middle.mp4's item; it gets the leftover.
+    assert _match_clip_items(paths, items) == [items[1], items[2], items[0]]
+
+
+def test_entry_reads_arguments_from_file(tmp_path: Path) -> None:
+    script = tmp_path / "tool.py"
+    script.write_text("import sys\nprint(len(sys.argv) - 1, sys.argv[-1])\n", encoding="utf-8")
+    args_file = tmp_path / "args.json"
+    args_file.write_text(json.dumps([f"clip{idx}.mp4" for idx in range(5000)]), encoding="utf-8")
+
+    result = subprocess.run(
+        [sys.executable, "-m", "orchestrator.entry", "--script", str(script), "--args-file", str(args_file)],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "5000 clip4999.mp4"
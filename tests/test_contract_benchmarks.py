@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BENCHMARKS_DIR = REPO_ROOT / "engine-contracts" / "benchmarks"
+if str(BENCHMARKS_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from bench_contracts import SCALES, build_operations, compare
+from generators import make_clip_analysis, make_music_analysis, make_timeline
+
+from engine_contracts.validators import (
+    validate_clip_analysis_payload,
+    validate_clip_analysis_schema,
+    validate_music_analysis_payload,
+    validate_music_analysis_schema,
+    validate_timeline_payload,
+    validate_timeline_schema,
+)
+
+
+def test_generated_payloads_match_their_modes() -> None:
+    clips = make_clip_analysis(5, 3)
+    music = make_music_analysis(120.0, 150.0)
+    timeline = make_timeline(20)
+
+    assert len(clips) == 5 and all(len(item["intensity_segments"]) == 3 for item in clips)
+    assert music["beat_count"] == len(music["beats"]) == 300
+    validate_clip_analysis_schema(clips)
+    validate_music_analysis_schema(music)
+    validate_timeline_schema(timeline)
+
+    for strict in (True, False):
+        validate_clip_analysis_payload(clips, strict=strict)
+        validate_music_analysis_payload(music, strict=strict)
+        validate_timeline_payload(timeline, strict=strict)
+    validate_clip_analysis_payload(make_clip_analysis(5, 3, legacy=True), strict=False)
+    validate_music_analysis_payload(make_music_analysis(120.0, 150.0, legacy=True), strict=False)
+    validate_timeline_payload(make_timeline(20, legacy=True), strict=False)
+    with pytest.raises(ValueError):
+        validate_clip_analysis_payload(make_clip_analysis(5, 3, legacy=True), strict=True)
+
+
+def test_smoke_operations_run() -> None:
+    for operation in build_operations(SCALES["smoke"]).values():
+        operation()
+
+
+def test_compare_flags_only_regressions_beyond_threshold_and_noise() -> None:
+    baseline = {
+        "slow": {"best_s": 0.100, "peak_kib": 1000.0},
+        "tiny": {"best_s": 0.0001, "peak_kib": 1.0},
+        "steady": {"best_s": 0.100, "peak_kib": 1000.0},
+    }
+    results = {
+        "slow": {"best_s": 0.150, "peak_kib": 2000.0},
+        "tiny": {"best_s": 0.0005, "peak_kib": 10.0},
+        "steady": {"best_s": 0.110, "peak_kib": 1100.0},
+        "new": {"best_s": 1.0, "peak_kib": 1.0},
+    }
+
+    regressions = compare(results, baseline, threshold=0.25)
+
+    assert [line.split()[:2] for line in regressions] == [["slow", "best_s:"], ["slow", "peak_kib:"]]
+    # A run on a machine twice as fast is scaled back up before comparing.
+    assert compare({"steady": {"best_s": 0.07, "peak_kib": 1000.0}}, baseline, 0.25, 2.0)
+    assert not compare({"steady": {"best_s": 0.05, "peak_kib": 1000.0}}, baseline, 0.25, 2.0)
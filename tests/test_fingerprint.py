@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.fingerprint import (
+    BLOCK_BYTES,
+    SAMPLE_BLOCKS,
+    FingerprintIndex,
+    Fingerprinter,
+    full_digest,
+    quick_id,
+    sampled_digest,
+    stat_key,
+)
+
+
+def _write(path: Path, size: int, seed: int = 0) -> Path:
+    path.write_bytes(bytes((idx * 7 + seed) % 251 for idx in range(size)))
+    return path
+
+
+def test_sampled_digest_follows_content_not_path(tmp_path: Path) -> None:
+    size = SAMPLE_BLOCKS * BLOCK_BYTES * 2
+    clip = _write(tmp_path / "clip.mp4", size)
+    copy = tmp_path / "copy.mp4"
+    shutil.copyfile(clip, copy)
+
+    assert sampled_digest(clip) == sampled_digest(copy)
+    assert quick_id(clip) != quick_id(copy)
+    assert full_digest(clip).startswith("sha256:")
+
+    # Rewrite the last block, which is always sampled.
+    with copy.open("r+b") as handle:
+        handle.seek(size - 10)
+        handle.write(b"x" * 10)
+    assert sampled_digest(clip) != sampled_digest(copy)
+
+    empty = tmp_path / "empty.mp4"
+    empty.write_bytes(b"")
+    assert sampled_digest(empty) != sampled_digest(_write(tmp_path / "one.mp4", 1))
+    assert full_digest(empty).startswith("sha256:")
+
+
+def test_fingerprints_are_memoized_by_stat_key_across_processes(tmp_path: Path) -> None:
+    clips = [_write(tmp_path / f"clip{idx}.mp4", 4096, seed=idx) for idx in range(4)]
+    index_path = tmp_path / "cache" / "fingerprints.json"
+
+    first = Fingerprinter(FingerprintIndex(index_path), workers=4)
+    digests = first.digests([*clips, clips[0]])
+    first.save()
+    assert digests[0] == digests[-1]
+    assert len(set(digests)) == 4
+    assert first.stats()["hashed"] == 4
+
+    second = Fingerprinter(FingerprintIndex(index_path))
+    assert second.digests(clips) == digests[:4]
+    assert second.stats() == {"memo_hits": 4, "hashed": 0, "hashed_bytes": 0}
+
+    # A new mtime is a new stat key, so the file is hashed again.
+    stat = clips[1].stat()
+    os.utime(clips[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert stat_key(clips[1]) != (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    assert second.digest(clips[1]) == digests[1]
+    assert second.stats()["hashed"] == 1
+
+    full = Fingerprinter(FingerprintIndex(index_path), full=True)
+    assert full.digest(clips[0]) == full_digest(clips[0]) != digests[0]
+
+
+def test_index_drops_oldest_entries_beyond_its_limit(tmp_path: Path) -> None:
+    clips = [_write(tmp_path / f"clip{idx}.mp4", 10, seed=idx) for idx in range(3)]
+    index = FingerprintIndex(tmp_path / "fingerprints.json", max_entries=2)
+    fingerprinter = Fingerprinter(index)
+    for clip in clips:
+        fingerprinter.digest(clip)
+    index.save()
+
+    reloaded = FingerprintIndex(tmp_path / "fingerprints.json")
+    assert reloaded.get(stat_key(clips[0]), "sampled") is None
+    assert reloaded.get(stat_key(clips[2]), "sampled") == sampled_digest(clips[2])
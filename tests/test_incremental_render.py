@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.segments import SegmentStore
+
+
+def test_segment_store_keeps_only_the_current_segments(tmp_path: Path) -> None:
+    store = SegmentStore(tmp_path / "segments")
+    assert store.load() == []
+    store.directory.mkdir()
+    for key in ("old", "kept"):
+        store.path(key).write_bytes(b"segment")
+    store.partial_path("crashed").write_bytes(b"half")
+
+    segments = [{"key": "kept", "song_offset": 0.0, "duration": 2.0, "entries": ["e"]}]
+    store.save(segments)
+    assert store.load() == segments
+    assert sorted(path.name for path in store.directory.iterdir()) == ["index.json", "kept.mp4"]
+
+    store.path("kept").unlink()
+    assert store.load() == []
+
+
+def test_rerender_reuses_segments_whose_entries_are_unchanged(stub_pipeline) -> None:
+    run_dir = stub_pipeline.run_dir
+
+    def run(song_seconds: int) -> dict:
+        manifest = stub_pipeline(
+            "--incremental-render",
+            "--segment-seconds",
+            "5",
+            "--render-chunks",
+            "2",
+            song_seconds=song_seconds,
+        )
+        return manifest["execution"]
+
+    first = run(30)
+    assert first["incremental_render"]["reused_segments"] == 0
+    assert first["incremental_render"]["segments"] > 1
+    assert (run_dir / "final.mp4").exists()
+
+    same = run(30)["incremental_render"]
+    assert same["rendered_segments"] == 0
+    assert same["reused_fraction"] == 1.0
+    assert same["changed_entries"] == 0
+
+    # A longer song extends the timeline; only the new tail is rendered.
+    longer = run(40)
+    info = longer["incremental_render"]
+    assert info["reused_segments"] == first["incremental_render"]["segments"]
+    assert 0 < info["rendered_segments"] < info["segments"]
+    assert 0.5 < info["reused_fraction"] < 1.0
+    assert [chunk["reused"] for chunk in longer["render_chunks"]] == [
+        *[True] * info["reused_segments"],
+        *[False] * info["rendered_segments"],
+    ]
+    media = [path for path in (run_dir / "render-segments").iterdir() if path.suffix == ".mp4"]
+    assert len(media) == info["segments"]
+
+
+@pytest.mark.parametrize(
+    ("option", "message"),
+    [
+        (["--render-chunks", "0"], "render_chunks must be >= 1."),
+        (["--segment-seconds", "0"], "segment_seconds must be > 0."),
+    ],
+)
+@pytest.mark.parametrize("mode", ["single", "jobs"])
+def test_invalid_render_options_are_usage_errors(
+    tmp_path: Path, option: list[str], message: str, mode: str
+) -> None:
+    jobs_path = tmp_path / "jobs.jsonl"
+    jobs_path.write_text(
+        '{"clips": ["a.mp4"], "music": "song.mp3", "run_dir": "run"}\n', encoding="utf-8"
+    )
+    target = (
+        ["--jobs", str(jobs_path)]
+        if mode == "jobs"
+        else ["--clips", "a.mp4", "--music", "song.mp3", "--run-dir", str(tmp_path / "run")]
+    )
+
+    result = subprocess.run(
+        [sys.executable, str(REPO_ROOT / "run_pipeline.py"), *target, "--no-cache", *option],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 2
+    assert f"error: {message}" in result.stderr
+    assert "Traceback" not in result.stderr
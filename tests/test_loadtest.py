@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LOADTEST_DIR = REPO_ROOT / "loadtest"
+if str(LOADTEST_DIR) not in sys.path:
+    sys.path.insert(0, str(LOADTEST_DIR))
+
+from run_loadtest import prepare_media, run_round, stub_env
+
+
+def test_pipeline_runs_end_to_end_against_the_stub_services(tmp_path: Path) -> None:
+    env = stub_env({"SEGMENTS": 3, "SONG_SECONDS": 30, "output_kb": 1, "BPM": None})
+    assert env["CONTENT_ENGINE_SERVICES_DIR"] == str(LOADTEST_DIR / "stub_services")
+    assert env["CONTENT_ENGINE_STUB_OUTPUT_KB"] == "1"
+    assert "CONTENT_ENGINE_STUB_BPM" not in env
+    clips, song = prepare_media(tmp_path / "media", 3)
+
+    summary = run_round(tmp_path, clips, song, runs=2, concurrency=2, env=env, pipeline_args=[])
+
+    assert summary["failed"] == 0
+    assert summary["clips"] == 3
+    assert summary["latency_s"]["p50"] > 0.0
+    assert summary["orchestrator_rss_mb"]["max"] > 0.0
+    final = tmp_path / "clips-3" / "run-0000" / "final.mp4"
+    assert final.stat().st_size == 1024
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import dataclasses
+import pickle
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import (
+    SCHEMA_VERSION,
+    ClipAnalysis,
+    IntensitySegment,
+    MusicAnalysis,
+    TimelinePlan,
+)
+from engine_contracts.model_compiler import contract_model
+
+
+CLIP = {
+    "schema_version": "2.0.0",
+    "clip_id": "a.mp4",
+    "duration": 12.5,
+    "intensity_segments": [
+        {
+            "start": 1,
+            "end": 3.5,
+            "intensity_score": 0.75,
+            "spike_count": 2,
+            "cluster_density": 0.5,
+            "ding_hit_count": 1,
+            "max_ding_confidence": 0.9,
+        },
+        {"start": 4.0, "end": 6.0, "intensity_score": 0.25},
+    ],
+}
+
+MUSIC = {
+    "song": "song.mp3",
+    "song_duration": 30.0,
+    "tempo": 120,
+    "beats": [0, 0.5, 1.0],
+    "beat_strength": [{"time": 0.0, "strength": 0.8}],
+    "drop_sections": [{"start": 8.0, "end": 12.0}],
+}
+
+TIMELINE = {
+    "timeline": [
+        {"clip_id": "a.mp4", "clip_start": 0, "clip_end": 2, "song_start": 0, "song_end": 2}
+    ],
+    "total_duration": 2,
+}
+
+
+def test_decode_converts_and_fills_defaults() -> None:
+    clip = ClipAnalysis.from_dict(CLIP)
+    first, second = clip.intensity_segments
+    assert isinstance(clip.intensity_segments, tuple)
+    assert first == IntensitySegment(1.0, 3.5, 0.75, 2, 0.5, 1, 0.9)
+    assert isinstance(first.start, float)
+    assert second == IntensitySegment(4.0, 6.0, 0.25, 0, 0.0, 0, 0.0)
+
+    music = MusicAnalysis.from_dict(MUSIC)
+    assert music.schema_version == SCHEMA_VERSION
+    assert music.beat_count == 3
+    assert music.beats == (0.0, 0.5, 1.0)
+    assert music.drop_sections[0].energy_score == 0.0
+    assert TimelinePlan.from_dict(TIMELINE).timeline[0].clip_end == 2.0
+
+    with pytest.raises(KeyError):
+        ClipAnalysis.from_dict({"clip_id": "a.mp4"})
+
+
+def test_encode_matches_asdict() -> None:
+    clip = ClipAnalysis.from_dict(CLIP)
+    encoded = clip.to_dict()
+    assert encoded == dataclasses.asdict(clip) | {
+        "intensity_segments": [dataclasses.asdict(seg) for seg in clip.intensity_segments]
+    }
+    assert list(encoded) == ["schema_version", "clip_id", "duration", "intensity_segments"]
+    assert ClipAnalysis.from_dict(encoded) == clip
+
+    music = MusicAnalysis.from_dict(MUSIC)
+    encoded = music.to_dict()
+    assert "_beat_grid" not in encoded
+    assert encoded["beats"] == [0.0, 0.5, 1.0]
+    assert encoded["drop_sections"] == [{"start": 8.0, "end": 12.0, "energy_score": 0.0}]
+    assert MusicAnalysis.from_dict(encoded) == music
+
+
+def test_bulk_helpers_round_trip() -> None:
+    clips = ClipAnalysis.from_dicts([CLIP, CLIP])
+    assert clips == [ClipAnalysis.from_dict(CLIP)] * 2
+    assert ClipAnalysis.to_dicts(clips) == [clip.to_dict() for clip in clips]
+    assert IntensitySegment.to_dicts(IntensitySegment.from_dicts([])) == []
+
+
+def test_models_are_slotted_and_keep_dataclass_behaviour() -> None:
+    music = MusicAnalysis.from_dict(MUSIC)
+    assert not hasattr(music, "__dict__")
+    assert not hasattr(music.beat_strength[0], "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        music.tempo = 90.0  # type: ignore[misc]
+
+    grid = music.beat_grid
+    assert music.beat_grid is grid
+    assert grid.nearest_beat(0.6) == 0.5
+    assert pickle.loads(pickle.dumps(music)) == music
+    assert dataclasses.replace(music, tempo=90.0).tempo == 90.0
+
+
+def test_unsupported_annotations_are_rejected() -> None:
+    with pytest.raises(TypeError, match="unsupported field annotation"):
+
+        @contract_model()
+        @dataclass(frozen=True, slots=True)
+        class Unsupported:
+            tags: dict[str, Any]
+
+    with pytest.raises(TypeError, match="slots=True"):
+
+        @contract_model()
+        @dataclass(frozen=True)
+        class Unslotted:
+            value: float
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import MusicAnalysis
+from engine_contracts.columnar import FloatColumn, load_music_columns, write_music_columns
+
+
+def _music_payload() -> dict:
+    beats = [round(0.4688 * idx + 0.1, 6) for idx in range(2000)]
+    return {
+        "schema_version": "2.0.0",
+        "song": "song.mp3",
+        "song_duration": 937.6,
+        "tempo": 128.00000000000003,
+        "beat_count": len(beats),
+        "beats": beats,
+        "beat_strength": [
+            {"time": beat, "strength": (idx % 7) / 7.0} for idx, beat in enumerate(beats)
+        ],
+        "drop_sections": [
+            {"start": 40.0, "end": 55.5, "energy_score": 0.9},
+            {"start": 300.25, "end": 330.0},
+        ],
+    }
+
+
+def test_columnar_sidecar_round_trips_losslessly(tmp_path: Path) -> None:
+    payload = _music_payload()
+    analysis = MusicAnalysis.from_dict(payload)
+    path = tmp_path / "music-analysis.columns"
+
+    write_music_columns(payload, path)
+    loaded = load_music_columns(path)
+
+    assert loaded.to_dict() == analysis.to_dict()
+    assert loaded == analysis
+    assert isinstance(loaded.beats, FloatColumn)
+    assert loaded.beats.buffer.format == "d"
+    assert loaded.beat_strength[3] == analysis.beat_strength[3]
+    assert loaded.drop_sections[1].energy_score == 0.0
+    assert list(loaded.beat_strength[10:12]) == list(analysis.beat_strength[10:12])
+
+
+def test_models_expose_the_columnar_format(tmp_path: Path) -> None:
+    analysis = MusicAnalysis.from_dict(_music_payload())
+    path = tmp_path / "song.columns"
+
+    analysis.to_columnar(path)
+
+    assert MusicAnalysis.from_columnar(path).beats[-1] == analysis.beats[-1]
+
+
+def test_load_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / "music-analysis.json"
+    path.write_text('{"song": "song.mp3"}', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="not a music columns file"):
+        load_music_columns(path)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.proxies import make_proxies, proxy_command, proxy_timeline
+
+
+def _fake_run(calls: list[str]):
+    def run(command: list[str], name: str) -> None:
+        calls.append(name)
+        Path(command[-1]).write_bytes(b"proxy")
+
+    return run
+
+
+def test_proxies_are_made_once_and_substituted_into_the_timeline(tmp_path: Path) -> None:
+    clips_dir = tmp_path / "clips"
+    clips_dir.mkdir()
+    staged = [clips_dir / "a-123.mp4", clips_dir / "b-456.mp4"]
+    for path in staged:
+        path.write_bytes(b"clip")
+    calls: list[str] = []
+
+    proxies = make_proxies([*staged, staged[0]], clips_dir / "proxies", _fake_run(calls))
+    assert sorted(calls) == ["a-123.360p", "b-456.360p"]
+    assert [clip.proxy.name for clip in proxies] == ["a-123.360p.mp4", "b-456.360p.mp4"]
+    assert not any(clip.reused for clip in proxies)
+
+    again = make_proxies(staged, clips_dir / "proxies", _fake_run(calls))
+    assert len(calls) == 2
+    assert all(clip.reused for clip in again)
+
+    timeline = {
+        "schema_version": "2.0.0",
+        "timeline": [
+            {"clip_id": "clips/b-456.mp4", "clip_start": 0.0},
+            {"clip_id": "/elsewhere/c.mp4", "clip_start": 1.0},
+        ],
+        "total_duration": 2.0,
+    }
+    rewritten = proxy_timeline(timeline, tmp_path, proxies)
+    assert [entry["clip_id"] for entry in rewritten["timeline"]] == [
+        "clips/proxies/b-456.360p.mp4",
+        "/elsewhere/c.mp4",
+    ]
+    assert timeline["timeline"][0]["clip_id"] == "clips/b-456.mp4"
+
+    command = proxy_command("ffmpeg", staged[0], tmp_path / "out.mp4", height=240)
+    assert command[command.index("-vf") + 1] == "scale=-2:'min(240,ih)'"
+    assert command[command.index("-preset") + 1] == "ultrafast"
+
+
+def test_preview_reuses_analysis_and_keeps_the_full_render_separate(stub_pipeline) -> None:
+    run_dir = stub_pipeline.run_dir
+
+    def run(*extra: str) -> dict:
+        return stub_pipeline(*extra, song_seconds=30)
+
+    first = run("--preview")
+    assert (run_dir / "preview.mp4").exists()
+    assert not (run_dir / "final.mp4").exists()
+    assert first["preview"]["time_to_preview_s"] > 0.0
+    assert len(first["preview"]["proxies"]) == 3
+    assert not any(clip["reused"] for clip in first["preview"]["proxies"])
+    assert "render" not in first["stage_fingerprints"]
+
+    full = run("--resume")
+    assert sorted(full["execution"]["skipped_stages"]) == ["clip_analysis", "music_analysis", "plan"]
+    assert (run_dir / "final.mp4").exists()
+    assert "preview" in full["stage_fingerprints"]
+
+    again = run("--preview")
+    assert "preview" in again["execution"]["skipped_stages"]
+    assert "render" in again["stage_fingerprints"]
+
+    (run_dir / "preview.mp4").unlink()
+    redone = run("--preview")
+    assert "preview" not in redone["execution"]["skipped_stages"]
+    assert all(clip["reused"] for clip in redone["preview"]["proxies"])
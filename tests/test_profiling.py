@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.profiling import RunProfiler, profile_to
+
+
+def _encode_many() -> None:
+    for idx in range(200):
+        json.dumps({"beats": list(range(idx))})
+
+
+def test_run_profiler_summarizes_stages_and_services(tmp_path: Path) -> None:
+    profiler = RunProfiler(tmp_path / "profiles")
+    with profiler.step("plan"):
+        _encode_many()
+    with profiler.step("plan"):
+        _encode_many()
+    with profile_to(profiler.service_path("render")):
+        _encode_many()
+    profiler.service_path("music_analysis")  # a call that never ran leaves no file
+
+    summary = profiler.write(limit=5)
+
+    assert (tmp_path / "profiles" / "plan.prof").exists()
+    assert set(summary["stages"]) == {"plan"}
+    assert set(summary["services"]) == {"render"}
+    assert summary["services"]["render"]["file"] == "service.render.prof"
+    top = summary["stages"]["plan"]["top"]
+    assert len(top) == 5
+    assert top[0]["cumtime_s"] >= top[-1]["cumtime_s"]
+    encode = next(row for row in top if "_encode_many" in row["function"])
+    assert encode["calls"] == 2
+
+
+def test_disabled_profiler_is_a_no_op(tmp_path: Path) -> None:
+    profiler = RunProfiler(None)
+    with profiler.step("plan"):
+        _encode_many()
+
+    assert profiler.service_path("render") is None
+    assert profiler.write() == {"enabled": False}
+    assert not any(tmp_path.iterdir())
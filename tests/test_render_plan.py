@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import (
+    BeatGrid,
+    DecodeSchedule,
+    TimelineEntry,
+    TimelineIndex,
+    TimelinePlan,
+    segment_timeline,
+    split_timeline,
+)
+
+
+def _plan(entries: list[tuple[str, float, float, float, float]]) -> TimelinePlan:
+    return TimelinePlan(
+        schema_version="2.0.0",
+        timeline=tuple(TimelineEntry(*entry) for entry in entries),
+        total_duration=max((entry[4] for entry in entries), default=0.0),
+    )
+
+
+PLAN = _plan(
+    [
+        ("a.mp4", 10.0, 12.0, 0.0, 2.0),
+        ("b.mp4", 0.0, 1.0, 2.0, 3.0),
+        ("a.mp4", 0.0, 2.0, 3.0, 5.0),
+        ("a.mp4", 11.0, 14.0, 5.0, 8.0),
+        ("b.mp4", 5.0, 6.0, 8.0, 9.0),
+        ("a.mp4", 2.0, 3.0, 9.0, 10.0),
+    ]
+)
+
+
+def test_point_queries_use_half_open_song_ranges() -> None:
+    index = TimelineIndex.from_plan(PLAN)
+
+    assert index.covering(0.0) == [0]
+    assert index.covering(2.0) == [1]
+    assert index.covering(9.99) == [5]
+    assert index.covering(10.0) == []
+    assert index.entry_at(4.0) == PLAN.timeline[2]
+    assert index.entry_at(-1.0) is None
+    assert index.overlapping(1.5, 5.0) == [0, 1, 2]
+    assert index.overlapping(5.0, 5.0) == []
+
+
+def test_queries_match_a_linear_scan_on_overlapping_entries() -> None:
+    rng = random.Random(7)
+    entries = []
+    for idx in range(300):
+        start = rng.random() * 100.0
+        entries.append((f"c{idx % 5}", 0.0, 1.0, start, start + rng.random() * 15.0))
+    index = TimelineIndex(_plan(entries).timeline)
+
+    def scan(start: float, end: float) -> list[int]:
+        hits = [idx for idx, e in enumerate(entries) if e[3] < end and e[4] > start]
+        return sorted(hits, key=lambda idx: (entries[idx][3], idx))
+
+    for _ in range(200):
+        start = rng.random() * 120.0 - 10.0
+        end = start + rng.random() * 10.0
+        assert index.overlapping(start, end) == scan(start, end)
+        assert index.covering(start) == [
+            idx for idx in scan(start, float("inf")) if entries[idx][3] <= start
+        ]
+
+
+def test_decode_schedule_merges_overlapping_and_adjacent_source_ranges() -> None:
+    schedule = DecodeSchedule.from_plan(PLAN)
+
+    assert [(s.clip_id, s.clip_start, s.clip_end, s.entries) for s in schedule] == [
+        ("a.mp4", 0.0, 3.0, (2, 5)),
+        ("a.mp4", 10.0, 14.0, (0, 3)),
+        ("b.mp4", 0.0, 1.0, (1,)),
+        ("b.mp4", 5.0, 6.0, (4,)),
+    ]
+    assert schedule.span_of() == {2: 0, 5: 0, 0: 1, 3: 1, 1: 2, 4: 3}
+    payload = schedule.to_dict()
+    assert (payload["clips"], payload["cuts"], payload["decode_spans"]) == (2, 6, 4)
+
+    bridged = DecodeSchedule.from_plan(PLAN, max_gap=8.0)
+    assert [(s.clip_id, s.entries) for s in bridged] == [
+        ("a.mp4", (2, 5, 0, 3)),
+        ("b.mp4", (1, 4)),
+    ]
+    with pytest.raises(ValueError):
+        DecodeSchedule.from_plan(PLAN, max_gap=-1.0)
+
+
+def _sequential_plan(lengths: list[float]) -> TimelinePlan:
+    entries, cursor = [], 0.0
+    for idx, length in enumerate(lengths):
+        entries.append((f"c{idx}.mp4", 1.0, 1.0 + length, cursor, cursor + length))
+        cursor += length
+    return _plan(entries)
+
+
+def test_split_timeline_cuts_on_entry_boundaries_and_rebases_song_time() -> None:
+    plan = _sequential_plan([1.1, 1.1, 1.1, 1.1, 1.1, 1.1])
+
+    chunks = split_timeline(plan, 3)
+
+    assert [chunk.song_offset for chunk in chunks] == pytest.approx([0.0, 2.2, 4.4])
+    assert [chunk.entries for chunk in chunks] == [(0, 1), (2, 3), (4, 5)]
+    second = chunks[1].plan.timeline
+    assert (second[0].song_start, second[1].song_end) == (0.0, 2.2)
+    assert second[0].clip_start == plan.timeline[2].clip_start
+    assert sum(chunk.plan.total_duration for chunk in chunks) == pytest.approx(6.6)
+    assert chunks[-1].song_end == pytest.approx(plan.total_duration)
+    assert [idx for chunk in chunks for idx in chunk.entries] == list(range(6))
+
+
+def test_split_timeline_never_cuts_inside_an_entry_and_prefers_beats() -> None:
+    # The second entry runs past the third's start, so 2.0 is no boundary.
+    overlapping = _plan(
+        [
+            ("a.mp4", 0.0, 1.0, 0.0, 1.0),
+            ("b.mp4", 0.0, 2.0, 1.0, 3.0),
+            ("c.mp4", 0.0, 1.0, 2.0, 4.0),
+            ("d.mp4", 0.0, 1.0, 4.0, 5.0),
+        ]
+    )
+    assert [chunk.song_offset for chunk in split_timeline(overlapping, 8)] == [0.0, 1.0, 4.0]
+    assert len(split_timeline(_sequential_plan([3.0]), 4)) == 1
+
+    plan = _sequential_plan([0.6] * 12)
+    assert split_timeline(plan, 2)[1].song_offset == pytest.approx(3.6)
+    on_beat = split_timeline(plan, 2, BeatGrid([0.0, 3.0, 6.0]))
+    assert on_beat[1].song_offset == pytest.approx(3.0)
+    # A beat further than a quarter chunk from the target does not pull the cut.
+    assert split_timeline(plan, 2, BeatGrid([1.2]))[1].song_offset == pytest.approx(3.6)
+    with pytest.raises(ValueError):
+        split_timeline(plan, 0)
+
+
+def test_segment_timeline_keeps_earlier_segments_that_still_fit() -> None:
+    plan = _sequential_plan([1.0] * 12)
+    first = segment_timeline(plan, 4.0)
+    assert [chunk.song_offset for chunk in first] == [0.0, 4.0, 8.0]
+
+    # Splitting the second entry moves no boundary outside the first segment.
+    edited = _plan(
+        [
+            ("c0.mp4", 1.0, 2.0, 0.0, 1.0),
+            ("new.mp4", 0.0, 0.5, 1.0, 1.5),
+            ("new.mp4", 3.0, 3.5, 1.5, 2.0),
+            *[(f"c{idx}.mp4", 1.0, 2.0, float(idx), idx + 1.0) for idx in range(2, 14)],
+        ]
+    )
+    keep = [(chunk.song_offset, chunk.song_end) for chunk in first]
+    again = segment_timeline(edited, 4.0, keep)
+    assert [chunk.song_offset for chunk in again] == [0.0, 4.0, 8.0, 12.0]
+    assert [len(chunk.entries) for chunk in again] == [5, 4, 4, 2]
+    assert again[1].plan == first[1].plan
+
+    # Kept ranges whose ends are no longer boundaries are split afresh.
+    shifted = _sequential_plan([1.5] * 8)
+    assert [chunk.song_offset for chunk in segment_timeline(shifted, 4.0, keep)] == [
+        0.0,
+        4.5,
+        7.5,
+    ]
+    with pytest.raises(ValueError):
+        segment_timeline(plan, 0.0)
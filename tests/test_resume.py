@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.pipeline import (
+    STAGE_UPSTREAM,
+    PipelineContext,
+    PipelineJob,
+    _stage_fingerprints,
+    ensure_paths,
+)
+from orchestrator.resume import ResumeState
+
+
+def _job(tmp_path: Path, **overrides) -> PipelineJob:
+    for name in ("a.mp4", "b.mp4", "song.mp3"):
+        if not (tmp_path / name).exists():
+            (tmp_path / name).write_bytes(name.encode())
+    options = {"clips": ["a.mp4", "b.mp4"], "music": "song.mp3", "run_dir": "run"}
+    options.update(overrides)
+    return PipelineJob.create(**options, base_dir=tmp_path)
+
+
+def _changed(before: dict[str, str], after: dict[str, str]) -> set[str]:
+    return {stage for stage in before if before[stage] != after[stage]}
+
+
+def _fingerprints(job: PipelineJob, **options) -> dict[str, str]:
+    return _stage_fingerprints(job, PipelineContext(**options))
+
+
+def test_fingerprints_change_only_downstream_of_what_changed(tmp_path: Path) -> None:
+    ensure_paths()
+    base = _fingerprints(_job(tmp_path))
+
+    assert _fingerprints(_job(tmp_path)) == base
+    assert _changed(base, _fingerprints(_job(tmp_path, planner_compat_mode=True))) == {
+        "plan",
+        "render",
+        "preview",
+    }
+    assert _changed(base, _fingerprints(_job(tmp_path, output="other.mp4"))) == {
+        "render"
+    }
+
+    for options in (
+        {"render_chunks": 4},
+        {"incremental_render": True},
+        {"incremental_render": True, "segment_seconds": 10.0},
+    ):
+        assert _changed(base, _fingerprints(_job(tmp_path), **options)) == {"render"}
+    incremental = _fingerprints(_job(tmp_path), incremental_render=True)
+    assert _fingerprints(_job(tmp_path), incremental_render=True, render_chunks=4) == incremental
+    assert _changed(
+        incremental, _fingerprints(_job(tmp_path), incremental_render=True, segment_seconds=10.0)
+    ) == {"render"}
+
+    song = tmp_path / "song.mp3"
+    os.utime(song, ns=(song.stat().st_atime_ns, song.stat().st_mtime_ns + 1_000_000_000))
+    assert _changed(base, _fingerprints(_job(tmp_path))) == {
+        "music_analysis",
+        "plan",
+        "render",
+        "preview",
+    }
+
+
+def test_resume_state_skips_only_unchanged_stages_with_artifacts(tmp_path: Path) -> None:
+    artifact = tmp_path / "timeline.json"
+    artifact.write_text("{}", encoding="utf-8")
+    fingerprints = {"clip_analysis": "c", "music_analysis": "m2", "plan": "p", "render": "r"}
+    previous = {"clip_analysis": "c", "music_analysis": "m1", "plan": "p", "render": "r"}
+    state = ResumeState(fingerprints, STAGE_UPSTREAM, previous)
+
+    assert state.can_skip("clip_analysis", [artifact])
+    assert not state.can_skip("clip_analysis", [tmp_path / "missing.json"])
+    assert not state.can_skip("music_analysis", [artifact])
+    state.finished("clip_analysis", skipped=True)
+    state.finished("music_analysis", skipped=False)
+
+    # music_analysis ran again, so plan does too even though its fingerprint matches.
+    assert not state.can_skip("plan", [artifact])
+    state.finished("plan", skipped=False)
+    assert not state.can_skip("render", [artifact])
+    assert state.skipped == ["clip_analysis"]
+    assert set(state.completed) == {"clip_analysis", "music_analysis", "plan"}
+    assert not ResumeState(fingerprints, STAGE_UPSTREAM).can_skip("clip_analysis", [artifact])
+
+
+def test_carry_over_keeps_fingerprints_of_stages_not_run_unless_upstream_ran() -> None:
+    fingerprints = {"clip_analysis": "c", "music_analysis": "m", "plan": "p", "render": "r"}
+    previous = {**fingerprints, "preview": "v"}
+
+    state = ResumeState(fingerprints, STAGE_UPSTREAM, previous)
+    state.finished("plan", skipped=True)
+    state.carry_over(["preview"])
+    assert state.completed["preview"] == "v"
+
+    state = ResumeState(fingerprints, STAGE_UPSTREAM, previous)
+    state.finished("plan", skipped=False)
+    state.carry_over(["preview"])
+    assert "preview" not in state.completed
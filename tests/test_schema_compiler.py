@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import SCHEMA_VERSION
+from engine_contracts.schema_compiler import SchemaValidationError, compile_schema
+from engine_contracts.validators import (
+    schema_errors,
+    timeline_schema,
+    validate_clip_analysis_schema,
+    validate_music_analysis_schema,
+    validate_timeline_schema,
+)
+
+
+def _timeline(entries: list[dict]) -> dict:
+    return {"schema_version": SCHEMA_VERSION, "total_duration": 4.0, "timeline": entries}
+
+
+def _entry(**overrides) -> dict:
+    entry = {"clip_id": "a.mp4", "clip_start": 0.0, "clip_end": 2, "song_start": 0.0, "song_end": 2.0}
+    entry.update(overrides)
+    return entry
+
+
+def test_valid_payloads_pass() -> None:
+    validate_timeline_schema(_timeline([_entry(), _entry(song_start=2.0, song_end=4.0)]))
+    validate_music_analysis_schema(
+        {
+            "schema_version": SCHEMA_VERSION,
+            "song": "song.mp3",
+            "song_duration": 90.0,
+            "tempo": 120.0,
+            "beat_count": 2,
+            "beats": [0.5, 1],
+            "beat_strength": [{"time": 0.5, "strength": 0.9}],
+            "drop_sections": [{"start": 10.0, "end": 20.0}],
+        }
+    )
+    validate_clip_analysis_schema(
+        [
+            {
+                "schema_version": SCHEMA_VERSION,
+                "clip_id": "a.mp4",
+                "duration": 5.0,
+                "intensity_segments": [
+                    {"start": 0, "end": 1.0, "intensity_score": 0.4, "spike_count": 2.0, "cluster_density": 0.1}
+                ],
+            }
+        ]
+    )
+
+
+def test_errors_carry_json_paths_and_full_types() -> None:
+    payload = _timeline([_entry(), _entry(clip_id=7, clip_end=True), _entry(song_end=None)])
+    del payload["timeline"][0]["song_start"]
+
+    errors = [str(error) for error in schema_errors("timeline", payload)]
+
+    assert errors == [
+        "$.timeline[0]: missing required property song_start",
+        "$.timeline[1].clip_id: expected string, got int",
+        "$.timeline[1].clip_end: expected number, got bool",
+        "$.timeline[2].song_end: expected number, got NoneType",
+    ]
+
+
+def test_error_count_is_capped_and_raised_as_value_error() -> None:
+    payload = _timeline([_entry(clip_start="0") for _ in range(50)])
+
+    assert len(schema_errors("timeline", payload, max_errors=3)) == 3
+    with pytest.raises(ValueError, match=r"\$\.timeline\[0\]\.clip_start") as excinfo:
+        validate_timeline_schema(payload, max_errors=5)
+    assert isinstance(excinfo.value, SchemaValidationError)
+    assert len(excinfo.value.errors) == 5
+
+
+def test_integer_rejects_fractional_numbers() -> None:
+    payload = {"schema_version": SCHEMA_VERSION, "beat_count": 2.5}
+
+    messages = [str(error) for error in schema_errors("music_analysis", payload)]
+
+    assert "$.beat_count: expected integer, got float" in messages
+
+
+def test_schema_documents_are_copies() -> None:
+    timeline_schema()["required"].append("mutated")
+
+    assert "mutated" not in timeline_schema()["required"]
+
+
+def test_unsupported_keywords_are_rejected_at_compile_time() -> None:
+    with pytest.raises(ValueError, match="minimum"):
+        compile_schema({"type": "number", "minimum": 0})
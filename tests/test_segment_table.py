@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENGINE_CONTRACTS_SRC = REPO_ROOT / "engine-contracts" / "src"
+if str(ENGINE_CONTRACTS_SRC) not in sys.path:
+    sys.path.insert(0, str(ENGINE_CONTRACTS_SRC))
+
+from engine_contracts import models
+from engine_contracts.models import ClipAnalysis, SegmentTable
+
+
+CLIP_PAYLOADS = [
+    {
+        "schema_version": "2.0.0",
+        "clip_id": "a.mp4",
+        "duration": 30.0,
+        "intensity_segments": [
+            {"start": 1.0, "end": 3.0, "intensity_score": 0.4, "spike_count": 1, "cluster_density": 0.2},
+            {"start": 10.0, "end": 16.0, "intensity_score": 0.9, "spike_count": 4,
+             "cluster_density": 0.5, "ding_hit_count": 2, "max_ding_confidence": 0.8},
+        ],
+    },
+    {
+        "schema_version": "2.0.0",
+        "clip_id": "b.mp4",
+        "duration": 20.0,
+        "intensity_segments": [
+            {"start": 2.0, "end": 2.5, "intensity_score": 0.9, "spike_count": 2, "cluster_density": 0.9},
+            {"start": 5.0, "end": 4.0, "intensity_score": 0.1, "spike_count": 0, "cluster_density": 0.0},
+        ],
+    },
+]
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(models, "_np", None)
+    return request.param
+
+
+def test_table_matches_object_model(backend: str) -> None:
+    table = SegmentTable.from_payloads(CLIP_PAYLOADS)
+    analyses = [ClipAnalysis.from_dict(item) for item in CLIP_PAYLOADS]
+
+    expected = tuple(seg for analysis in analyses for seg in analysis.intensity_segments)
+    assert len(table) == 4
+    assert table.to_segments() == expected
+    assert SegmentTable.from_clip_analyses(analyses).to_segments() == expected
+    assert list(table.lengths()) == [seg.length for seg in expected]
+    assert table.segment_clip_ids() == ["a.mp4", "a.mp4", "b.mp4", "b.mp4"]
+
+
+def test_filters_sorting_and_top_k(backend: str) -> None:
+    table = SegmentTable.from_payloads(CLIP_PAYLOADS)
+
+    long_intense = table.where(min_intensity=0.3, min_length=1.0, overlapping=(12.0, 40.0))
+    assert [seg.start for seg in long_intense.to_segments()] == [10.0]
+    assert len(table.where(clip_id="b.mp4")) == 2
+    assert len(table.where(clip_id="missing.mp4")) == 0
+
+    by_density = table.sort_by("cluster_density")
+    assert list(by_density.column("cluster_density")) == [0.9, 0.5, 0.2, 0.0]
+
+    # Ties on intensity keep input order.
+    top = table.top_k("intensity_score", 2)
+    assert top.segment_clip_ids() == ["a.mp4", "b.mp4"]
+    assert [seg.start for seg in top.to_segments()] == [10.0, 2.0]
+    assert len(table.top_k("ding_hit_count", 0)) == 0
+    assert len(table.top_k("ding_hit_count", 10)) == 4
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.cache import ArtifactCache
+from orchestrator.pipeline import PipelineContext, PipelineJob, write_json
+from orchestrator.server import JobSpool, PipelineServer, QueueFull, RunDirBusy
+
+
+def _request(url: str, payload: Any = None) -> tuple[int, dict[str, str], Any]:
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method="GET" if data is None else "POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), json.loads(exc.read())
+
+
+def _wait_for(url: str, status: str) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        _, _, record = _request(url)
+        if record["status"] == status:
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"{url} never reached {status}: {record}")
+
+
+def _fake_runner(job: PipelineJob, context: PipelineContext) -> dict:
+    job.run_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"status": "succeeded", "clips": [str(clip) for clip in job.clips]}
+    write_json(job.run_dir / "run-manifest.json", manifest)
+    return manifest
+
+
+def test_submit_poll_and_fetch_manifest(tmp_path: Path) -> None:
+    server = PipelineServer(
+        PipelineContext(),
+        tmp_path / "spool",
+        port=0,
+        base_dir=tmp_path,
+        warm_planners=False,
+        runner=_fake_runner,
+    )
+    server.start()
+    base = "http://%s:%d" % server.address
+    try:
+        status, headers, record = _request(
+            f"{base}/jobs", {"clips": ["a.mp4"], "music": "song.mp3"}
+        )
+        assert status == 202
+        assert headers["Location"] == f"/jobs/{record['id']}"
+        assert record["run_dir"] == str(tmp_path / "spool" / "runs" / record["id"])
+
+        done = _wait_for(f"{base}/jobs/{record['id']}", "succeeded")
+        assert done["output"] == str(Path(record["run_dir"]) / "final.mp4")
+        assert _request(f"{base}/jobs/{record['id']}/manifest")[2]["clips"] == [
+            str(tmp_path / "a.mp4")
+        ]
+
+        assert _request(f"{base}/jobs", {"clips": [], "music": "song.mp3"})[0] == 400
+        assert _request(f"{base}/jobs/missing")[0] == 404
+        assert _request(f"{base}/health")[2]["jobs"]["succeeded"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_full_queue_is_refused_with_retry_after(tmp_path: Path) -> None:
+    release = threading.Event()
+
+    def blocked_runner(job: PipelineJob, context: PipelineContext) -> dict:
+        release.wait(5)
+        return _fake_runner(job, context)
+
+    server = PipelineServer(
+        PipelineContext(),
+        tmp_path / "spool",
+        port=0,
+        job_workers=1,
+        max_queued=1,
+        base_dir=tmp_path,
+        warm_planners=False,
+        runner=blocked_runner,
+    )
+    server.start()
+    base = "http://%s:%d" % server.address
+    job = {"clips": ["a.mp4"], "music": "song.mp3"}
+    try:
+        first = _request(f"{base}/jobs", job)[2]
+        _wait_for(f"{base}/jobs/{first['id']}", "running")
+        assert _request(f"{base}/jobs", job)[0] == 202
+        status, headers, body = _request(f"{base}/jobs", job)
+        assert status == 429
+        assert int(headers["Retry-After"]) >= 1
+        assert "queued" in body["error"]
+        status, _, body = _request(f"{base}/jobs", dict(job, run_dir=first["run_dir"] + "/"))
+        assert status == 409
+        assert first["id"] in body["error"]
+    finally:
+        release.set()
+        server.shutdown()
+
+
+def test_cache_is_pruned_after_each_job(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1000)
+
+    def caching_runner(job: PipelineJob, context: PipelineContext) -> dict:
+        context.cache.put("clip_analysis", ArtifactCache.key(str(job.run_dir)), "x" * 600)
+        return _fake_runner(job, context)
+
+    server = PipelineServer(
+        PipelineContext(cache=cache),
+        tmp_path / "spool",
+        port=0,
+        job_workers=1,
+        base_dir=tmp_path,
+        warm_planners=False,
+        runner=caching_runner,
+    )
+    server.start()
+    base = "http://%s:%d" % server.address
+    try:
+        for _ in range(3):
+            record = _request(f"{base}/jobs", {"clips": ["a.mp4"], "music": "song.mp3"})[2]
+            _wait_for(f"{base}/jobs/{record['id']}", "succeeded")
+            entries = list((tmp_path / "cache").glob("*/*/*.json"))
+            assert sum(path.stat().st_size for path in entries) <= 1000
+    finally:
+        server.shutdown()
+
+
+def test_spool_requeues_unfinished_jobs_in_submission_order(tmp_path: Path) -> None:
+    spool = JobSpool(tmp_path, max_queued=2)
+    first = spool.submit({"n": 1})
+    second = spool.submit({"n": 2})
+    with pytest.raises(QueueFull):
+        spool.submit({"n": 3})
+    assert spool.take()["id"] == first["id"]
+
+    reopened = JobSpool(tmp_path, max_queued=2)
+    assert reopened.get(first["id"])["status"] == "queued"
+    assert reopened.get(first["id"])["recovered"]
+    assert [reopened.take()["id"], reopened.take()["id"]] == [first["id"], second["id"]]
+    reopened.finish(first["id"], status="succeeded")
+    assert JobSpool(tmp_path, max_queued=2).counts()["succeeded"] == 1
+
+
+
+def test_spool_keeps_only_the_newest_finished_records(tmp_path: Path) -> None:
+    spool = JobSpool(tmp_path, max_queued=8, keep_finished=2)
+    ids = [spool.submit({"n": n})["id"] for n in range(4)]
+    for _ in range(3):
+        record = spool.take()
+        spool.finish(record["id"], status="succeeded")
+
+    assert [record["id"] for record in spool.list()] == ids[1:]
+    assert not (tmp_path / "jobs" / f"{ids[0]}.json").exists()
+    assert JobSpool(tmp_path, max_queued=8, keep_finished=1).counts() == {
+        "queued": 1,
+        "running": 0,
+        "succeeded": 1,
+        "failed": 0,
+    }
+    assert sorted(path.stem for path in (tmp_path / "jobs").glob("*.json")) == ids[2:]
+
+
+def test_spool_refuses_a_run_dir_in_use(tmp_path: Path) -> None:
+    spool = JobSpool(tmp_path, max_queued=8)
+    run_dir = tmp_path / "run"
+    first = spool.submit({"n": 1}, run_dir)
+    with pytest.raises(RunDirBusy):
+        spool.submit({"n": 2}, run_dir)
+    spool.take()
+    with pytest.raises(RunDirBusy):
+        spool.submit({"n": 2}, run_dir)
+    spool.finish(first["id"], status="succeeded")
+    assert spool.submit({"n": 2}, run_dir)["status"] == "queued"
+
+
+def test_stage_limits_bound_concurrent_calls() -> None:
+    context = PipelineContext(stage_limits={"render": 1})
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work() -> None:
+        nonlocal active, peak
+        with context.reserve("render") as waited:
+            assert waited >= 0.0
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 1
+    with pytest.raises(ValueError, match="stage_limits"):
+        PipelineContext(stage_limits={"mastering": 1})
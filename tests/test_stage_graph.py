@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.graph import Stage, StageGraph
+
+
+def test_independent_stages_start_together_and_dependents_wait() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    order: list[str] = []
+
+    def analysis(name: str):
+        def run(_: dict) -> dict:
+            barrier.wait()
+            order.append(name)
+            return {name: name.upper()}
+
+        return run
+
+    def plan(inputs: dict) -> dict:
+        order.append("plan")
+        return {"timeline": (inputs["clips"], inputs["music"])}
+
+    graph = StageGraph(
+        [
+            Stage("plan", plan, inputs=("clips", "music"), outputs=("timeline",)),
+            Stage("clips", analysis("clips"), outputs=("clips",)),
+            Stage("music", analysis("music"), outputs=("music",)),
+        ]
+    )
+    results = graph.run()
+
+    assert results["timeline"] == ("CLIPS", "MUSIC")
+    assert order[-1] == "plan"
+
+
+def test_unknown_inputs_and_cycles_are_rejected() -> None:
+    missing = StageGraph([Stage("render", lambda _: {}, inputs=("timeline",))])
+    with pytest.raises(ValueError, match="timeline"):
+        missing.run()
+
+    cycle = StageGraph(
+        [
+            Stage("a", lambda _: {"x": 1}, inputs=("y",), outputs=("x",)),
+            Stage("b", lambda _: {"y": 1}, inputs=("x",), outputs=("y",)),
+        ]
+    )
+    with pytest.raises(ValueError, match="cycle"):
+        cycle.run()
+
+
+def test_failure_stops_downstream_stages() -> None:
+    ran: list[str] = []
+
+    def fail(_: dict) -> dict:
+        raise RuntimeError("analyzer crashed")
+
+    graph = StageGraph(
+        [
+            Stage("clips", fail, outputs=("clips",)),
+            Stage("plan", lambda _: ran.append("plan") or {}, inputs=("clips",)),
+        ]
+    )
+    with pytest.raises(RuntimeError, match="analyzer crashed"):
+        graph.run()
+    assert ran == []
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.pipeline import _planner_clip_items
+from orchestrator.staging import stage_clips, staged_name
+
+
+def _clips(tmp_path: Path) -> list[Path]:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = tmp_path / "a" / "clip.mp4"
+    second = tmp_path / "b" / "clip.mp4"
+    first.write_bytes(b"first clip")
+    second.write_bytes(b"second clip, longer")
+    return [first, second, first]
+
+
+def test_same_basename_clips_get_distinct_names_and_duplicates_stage_once(tmp_path: Path) -> None:
+    clips = _clips(tmp_path)
+
+    staged = stage_clips(clips, tmp_path / "run" / "clips")
+
+    assert [clip.source for clip in staged] == clips
+    assert staged[0].staged != staged[1].staged
+    assert staged[0].staged == staged[2].staged
+    assert staged[0].name.startswith("clip-") and staged[0].name.endswith(".mp4")
+    assert [clip.strategy for clip in staged] == ["symlink"] * 3
+    assert [clip.reused for clip in staged] == [False, False, True]
+    assert sorted(os.listdir(tmp_path / "run" / "clips")) == sorted(
+        {staged_name(clip) for clip in clips}
+    )
+
+
+def test_strategies_fall_back_in_order_and_report_copied_bytes(tmp_path: Path) -> None:
+    clips = _clips(tmp_path)[:2]
+
+    staged = stage_clips(clips, tmp_path / "clips", strategies=("reflink", "copy"))
+
+    for clip in staged:
+        assert clip.strategy in ("reflink", "copy")
+        assert clip.staged.read_bytes() == clip.source.read_bytes()
+        assert clip.bytes_copied == (clip.source.stat().st_size if clip.strategy == "copy" else 0)
+        assert not clip.staged.is_symlink()
+    assert not [name for name in os.listdir(tmp_path / "clips") if name.endswith(".tmp")]
+
+    hardlinked = stage_clips(clips, tmp_path / "links", strategies=("hardlink", "copy"))
+    assert [clip.strategy for clip in hardlinked] == ["hardlink", "hardlink"]
+    assert os.path.samefile(hardlinked[0].staged, clips[0])
+
+
+def test_restaging_reuses_existing_files_and_rejects_unknown_strategies(tmp_path: Path) -> None:
+    clips = _clips(tmp_path)[:2]
+    stage_clips(clips, tmp_path / "clips", strategies=("copy",))
+
+    again = stage_clips(clips, tmp_path / "clips")
+
+    assert [(clip.strategy, clip.reused, clip.bytes_copied) for clip in again] == [
+        ("copy", True, 0),
+        ("copy", True, 0),
+    ]
+    with pytest.raises(ValueError, match="teleport"):
+        stage_clips(clips, tmp_path / "clips", strategies=("teleport",))
+
+
+def test_planner_items_are_renamed_to_staged_ids_without_mutating_input() -> None:
+    items = [{"clip_id": "clip.mp4", "duration": 1.0}, {"clip": "clip.mp4"}]
+
+    renamed = _planner_clip_items(items, ["clip-1.mp4", "clip-2.mp4"])
+
+    assert renamed == [{"clip_id": "clip-1.mp4", "duration": 1.0}, {"clip": "clip-2.mp4"}]
+    assert items[0]["clip_id"] == "clip.mp4"
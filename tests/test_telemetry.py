@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.telemetry import Telemetry, TraceRecorder, file_bytes
+
+
+def test_spans_aggregate_by_name_and_skip_service_calls(tmp_path: Path) -> None:
+    artifact = tmp_path / "artifact.json"
+    artifact.write_text("x" * 100, encoding="utf-8")
+    telemetry = Telemetry()
+
+    with telemetry.span("clip_analysis", input_bytes=10) as stage:
+        for _ in range(2):
+            with telemetry.span("validate", "step"):
+                sum(range(10000))
+        with telemetry.span("clip_analysis-0", "service") as service:
+            service.add_child(0.5, 0.25, 2048)
+        stage.add_child(0.5, 0.25, 2048)
+        stage.add_child(0.0, 0.0, 0, worker_peak_rss_kb=4096)
+        stage.output_bytes = file_bytes([artifact, tmp_path / "missing", None])
+
+    summary = telemetry.summary()
+
+    assert list(summary) == ["clip_analysis", "validate"]
+    assert summary["clip_analysis"]["input_bytes"] == 10
+    assert summary["clip_analysis"]["output_bytes"] == 100
+    assert summary["clip_analysis"]["child_user_s"] == 0.5
+    assert summary["clip_analysis"]["child_peak_rss_kb"] == 2048
+    assert summary["clip_analysis"]["worker_peak_rss_kb"] == 4096
+    assert summary["clip_analysis"]["peak_rss_kb"] > 0
+    assert summary["validate"]["count"] == 2
+    assert summary["clip_analysis"]["duration_s"] >= summary["validate"]["duration_s"]
+
+
+def test_trace_holds_one_process_per_job(tmp_path: Path) -> None:
+    recorder = TraceRecorder()
+    for label in ("runs/a", "runs/b"):
+        telemetry = Telemetry()
+        with telemetry.span("render"):
+            pass
+        recorder.add(telemetry, label)
+    path = tmp_path / "trace.json"
+
+    recorder.write(path)
+
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    processes = {event["pid"]: event["args"]["name"] for event in events if event["name"] == "process_name"}
+    spans = [event for event in events if event["ph"] == "X"]
+    assert processes == {1: "runs/a", 2: "runs/b"}
+    assert [span["pid"] for span in spans] == [1, 2]
+    assert all(span["dur"] >= 0 and span["ts"] > 0 and "tid" in span for span in spans)
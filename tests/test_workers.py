@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from orchestrator.workers import (
+    TAIL_BYTES,
+    EntryPoint,
+    SubprocessBackend,
+    WarmWorkerBackend,
+    _warm_worker_init,
+)
+
+
+@pytest.fixture(scope="module")
+def warm_backend():
+    backend = WarmWorkerBackend(workers=1)
+    yield backend
+    backend.close()
+
+
+def _write_service(tmp_path: Path) -> Path:
+    (tmp_path / "main.py").write_text(
+        "import sys\n"
+        "if sys.argv[1:] == ['--fail']:\n"
+        "    print('analysis failed', file=sys.stderr)\n"
+        "    raise SystemExit(3)\n"
+        "print('beats:' + ','.join(sys.argv[1:]))\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("backend_name", ["subprocess", "warm"])
+def test_backends_capture_stdout_and_report_timing(
+    tmp_path: Path, warm_backend: WarmWorkerBackend, backend_name: str
+) -> None:
+    backend = warm_backend if backend_name == "warm" else SubprocessBackend()
+    entry = EntryPoint(cwd=_write_service(tmp_path), script="main.py", args=("0.5", "1.0"))
+
+    result = backend.run(entry)
+
+    assert result.stdout.strip() == "beats:0.5,1.0"
+    assert result.backend == backend_name
+    assert result.wall_s >= result.work_s >= 0.0
+    assert result.user_s + result.sys_s > 0.0
+    if backend_name == "warm":
+        assert result.max_rss_kb == 0
+        assert result.worker_peak_rss_kb > 0
+    else:
+        assert result.max_rss_kb > 0
+        assert result.worker_peak_rss_kb == 0
+
+    with pytest.raises(RuntimeError, match="analysis failed"):
+        backend.run(EntryPoint(cwd=tmp_path, script="main.py", args=("--fail",)))
+
+
+def test_warm_workers_get_the_search_path_without_changing_ours(tmp_path: Path) -> None:
+    package = tmp_path / "lib" / "warm_search_pkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    (package / "cli.py").write_text("print('from search path')\n", encoding="utf-8")
+    saved_path = list(sys.path)
+
+    backend = WarmWorkerBackend(
+        workers=1, preload=("warm_search_pkg",), search_path=[tmp_path / "lib"]
+    )
+    try:
+        assert sys.path == saved_path
+        result = backend.run(EntryPoint(cwd=tmp_path, module="warm_search_pkg.cli", args=()))
+        assert result.backend == "warm"
+        assert result.stdout.strip() == "from search path"
+    finally:
+        backend.close()
+
+
+def test_default_preload_imports_cleanly_in_warm_workers(tmp_path: Path) -> None:
+    from orchestrator.pipeline import WARM_PRELOAD, WARM_SEARCH_PATH
+
+    (tmp_path / "loaded.py").write_text(
+        "import sys\n"
+        "print(','.join(name for name in sys.argv[1:] if name in sys.modules))\n",
+        encoding="utf-8",
+    )
+    backend = WarmWorkerBackend(workers=1, preload=WARM_PRELOAD, search_path=WARM_SEARCH_PATH)
+    try:
+        result = backend.run(EntryPoint(cwd=tmp_path, script="loaded.py", args=tuple(WARM_PRELOAD)))
+    finally:
+        backend.close()
+    assert result.stdout.strip().split(",") == WARM_PRELOAD
+
+    # A fresh interpreter, so nothing this test process imported hides a
+    # missing search path entry.
+    init = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from orchestrator.pipeline import WARM_PRELOAD, WARM_SEARCH_PATH\n"
+            "from orchestrator.workers import _warm_worker_init\n"
+            "_warm_worker_init(tuple(WARM_PRELOAD), tuple(map(str, WARM_SEARCH_PATH)))\n",
+        ],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert init.stderr == ""
+
+
+def test_warm_worker_init_reports_failed_preloads(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "path", list(sys.path))
+
+    _warm_worker_init(("no_such_preload",), ("/nonexistent/search",))
+
+    assert sys.path[-1] == "/nonexistent/search"
+    assert "cannot preload no_such_preload" in capsys.readouterr().err
+
+
+def test_subprocess_entry_does_not_import_the_pipeline(tmp_path: Path) -> None:
+    (tmp_path / "modules.py").write_text(
+        "import sys\n"
+        "print(sorted(name for name in sys.modules if name.startswith('orchestrator')))\n",
+        encoding="utf-8",
+    )
+
+    result = SubprocessBackend().run(EntryPoint(cwd=tmp_path, script="modules.py", args=()))
+
+    assert result.stderr == ""
+    assert result.stdout.strip() == str(["orchestrator", "orchestrator.profiling"])
+
+
+def test_warm_backend_falls_back_when_entry_module_is_missing(
+    tmp_path: Path, warm_backend: WarmWorkerBackend
+) -> None:
+    entry = EntryPoint(cwd=tmp_path, module="missing_service.cli", args=())
+
+    # The subprocess fallback reports the orchestrator.entry command it ran.
+    with pytest.raises(RuntimeError, match="orchestrator.entry --module missing_service.cli"):
+        warm_backend.run(entry)
+
+
+@pytest.mark.parametrize("backend_name", ["subprocess", "warm"])
+def test_streamed_output_goes_to_files_and_errors_keep_a_bounded_tail(
+    tmp_path: Path, warm_backend: WarmWorkerBackend, backend_name: str
+) -> None:
+    backend = warm_backend if backend_name == "warm" else SubprocessBackend()
+    (tmp_path / "noisy.py").write_text(
+        "import sys\n"
+        "print('{\"beats\": [0.5]}')\n"
+        "if sys.argv[1:] == ['--fail']:\n"
+        "    sys.stderr.write('x' * 100_000 + 'decoder crashed')\n"
+        "    raise SystemExit(1)\n",
+        encoding="utf-8",
+    )
+    stdout_path = tmp_path / "out" / "music-analysis.json"
+    stderr_path = tmp_path / "out" / "music.stderr.log"
+
+    result = backend.run(
+        EntryPoint(cwd=tmp_path, script="noisy.py", args=()), stdout_path, stderr_path
+    )
+
+    assert result.stdout == ""
+    assert stdout_path.read_text(encoding="utf-8").strip() == '{"beats": [0.5]}'
+
+    with pytest.raises(RuntimeError) as excinfo:
+        backend.run(
+            EntryPoint(cwd=tmp_path, script="noisy.py", args=("--fail",)),
+            stdout_path,
+            stderr_path,
+        )
+    message = str(excinfo.value)
+    assert message.endswith("decoder crashed")
+    assert len(message) < TAIL_BYTES + 1024
+    assert stderr_path.stat().st_size > 100_000
+
+
+@pytest.mark.parametrize("backend_name", ["subprocess", "warm"])
+def test_backends_profile_entry_points_on_request(
+    tmp_path: Path, warm_backend: WarmWorkerBackend, backend_name: str
+) -> None:
+    backend = warm_backend if backend_name == "warm" else SubprocessBackend()
+    profile = tmp_path / "profiles" / f"{backend_name}.prof"
+    entry = EntryPoint(cwd=_write_service(tmp_path), script="main.py", args=("1",), profile=profile)
+
+    assert backend.run(entry).stdout.strip() == "beats:1"
+    assert profile.stat().st_size > 0